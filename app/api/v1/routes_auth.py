@@ -1,11 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import timedelta
+from typing import Optional
 
 from app.core.config import settings
-from app.core.security import verify_password, create_access_token, get_password_hash, decode_access_token
-from app.db.deps import get_db, get_current_user
+from app.core.security import (
+    create_access_token,
+    decode_access_token,
+    password_hasher,
+    password_needs_rehash,
+    PasswordHasherBusy,
+)
+from app.db.deps import get_async_db, get_current_user, UserPrincipal
 from app.schemas.user import UserCreate, UserResponse
 from app.models.user import User
 
@@ -14,22 +22,31 @@ router = APIRouter()
 # OAuth2 scheme for token authentication
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl = "api/v1/auth/login")
 
+
+def _get_user_by_email(db: Session, email: str) -> Optional[User]:
+    return db.query(User).filter(User.email == email).first()
+
+
 @router.post("/register", response_model=UserResponse, status_code = status.HTTP_201_CREATED)
-def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Register a new user.
     """
     # Check if user with the same email already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = await db.run_sync(_get_user_by_email, user_data.email)
     if existing_user:
         raise HTTPException(
             status_code = status.HTTP_400_BAD_REQUEST,
             detail = "Email already registered"
         )
     
-    # Hash the password
-    hashed_password = get_password_hash(user_data.password)
+    # Hash the password in the password hashing pool
+    hashed_password = await password_hasher.hash(user_data.password)
 
+    return await db.run_sync(_create_user, user_data, hashed_password)
+
+
+def _create_user(db: Session, user_data: UserCreate, hashed_password: str) -> User:
     # Create new user
     new_user = User(
         email = user_data.email,
@@ -46,17 +63,17 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
     return new_user
 
 @router.post("/login")
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
     """
     Login and get access token.
     
     """
     
     # Find user by email
-    user = db.query(User).filter(User.email == form_data.username).first()
+    user = await db.run_sync(_get_user_by_email, form_data.username)
 
     #Verify user exists and password is correct
-    if not user or not verify_password(form_data.password, user.password_hash):
+    if not user or not await password_hasher.verify(form_data.password, user.password_hash):
         raise HTTPException(
             status_code = status.HTTP_401_UNAUTHORIZED,
             detail = "Invalid email or password",
@@ -69,6 +86,14 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
             status_code = status.HTTP_400_BAD_REQUEST,
             detail = "Inactive user"
         )
+
+    # Upgrade the hash if BCRYPT_ROUNDS changed since it was created
+    if password_needs_rehash(user.password_hash):
+        try:
+            new_hash = await password_hasher.hash(form_data.password)
+            await db.run_sync(_update_password_hash, user.id, new_hash)
+        except PasswordHasherBusy:
+            pass  # Retried on the next login
     
     # Create access token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -81,12 +106,20 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
         "token_type": "bearer"
     }
 
+
+def _update_password_hash(db: Session, user_id: int, password_hash: str):
+    db.query(User).filter(User.id == user_id).update(
+        {User.password_hash: password_hash}, synchronize_session=False
+    )
+    db.commit()
+
+
 @router.get("/me", response_model=UserResponse)
-def get_me(current_user: User = Depends(get_current_user)):
+async def get_me(current_user: UserPrincipal = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
     """
     Get current authenticated user information.
     """
-    return current_user
+    return await db.run_sync(lambda session: session.get(User, current_user.id))
     
     # Extract user_id from payload
     user_id: str = payload.get("sub")
@@ -1,12 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from datetime import datetime
+from typing import List, Optional, Tuple
 
-from app.db.deps import get_db, get_current_user
-from app.models.user import User, UserRole
-from app.models.ticket import Ticket
+from app.core.pagination import NEXT_CURSOR_HEADER, decode_cursor, paginate_keyset
+from app.db.deps import get_read_db, get_write_db, get_current_user, UserPrincipal
 from app.models.comment import Comment
 from app.services.metrics_service import metrics_service
+from app.services.ticket_access import can_manage_comment, can_view_ticket, ticket_access_cache
 from app.schemas.comment import (
     CommentCreate,
     CommentUpdate, 
@@ -15,15 +17,18 @@ from app.schemas.comment import (
 
 router = APIRouter(prefix = "/tickets", tags = ["Comments"])
 
+# Tamaño de página al paginar sin `limit` (cursor o latest)
+DEFAULT_COMMENT_PAGE_SIZE = 50
+
 # ============================================
 # CREAR COMENTARIO EN UN TICKET
 # ============================================
 @router.post("/{ticket_id}/comments", response_model = CommentResponse, status_code = status.HTTP_201_CREATED)
-def create_comment(
+async def create_comment(
     ticket_id: int,
     comment_data: CommentCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_write_db),
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Crear un comentario en un ticket.
@@ -33,32 +38,24 @@ def create_comment(
     - AGENT: puede comentar en tickets asignados a él o sin asignar
     - ADMIN: puede comentar en cualquier ticket.
     """
-    # Verificar que el ticket exista    
-    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
+    return await db.run_sync(_create_comment, ticket_id, comment_data, current_user)
+
+
+def _create_comment(db: Session, ticket_id: int, comment_data: CommentCreate, current_user: UserPrincipal):
+    # Verificar que el ticket exista (proyección cacheada, sin leer la fila)
+    ticket = ticket_access_cache.get(db, ticket_id)
     if not ticket:
         raise HTTPException(
             status_code = status.HTTP_404_NOT_FOUND, 
             detail = "Ticket no encontrado"
         )
 
-    # Verificar permisos según rol
-    if current_user.role == UserRole.USER:
-        # USER solo puede comentar en sus propios tickets
-        if ticket.creator_id != current_user.id:
-            raise HTTPException(
-                status_code = status.HTTP_403_FORBIDDEN,
-                detail = "No tienes permiso para comentar en este ticket"
-            )
-    
-    elif current_user.role == UserRole.AGENT:
-        # AGENT puede comentar en tickets asignados a él o sin asignar
-        if ticket.assigned_agent_id and ticket.assigned_agent_id != current_user.id:
-            raise HTTPException(
-                status_code = status.HTTP_403_FORBIDDEN,
-                detail = "No tienes permiso para comentar en este ticket"
-            )
-        
-    # ADMIN puede comentar en cualquier ticket (no hay restricción)
+    # Verificar permisos según rol (mismos que para ver el ticket)
+    if not can_view_ticket(current_user, ticket):
+        raise HTTPException(
+            status_code = status.HTTP_403_FORBIDDEN,
+            detail = "No tienes permiso para comentar en este ticket"
+        )
 
     # Crear el comentario
     new_comment = Comment(
@@ -68,33 +65,85 @@ def create_comment(
     )
 
     db.add(new_comment)
-    db.commit()
-    db.refresh(new_comment)
 
-    # Registrar métrica
+    # Registrar métrica (outbox, en la misma transacción)
     metrics_service.record_comment_created(
         ticket_id=ticket_id,
-        author_id=current_user.id
+        author_id=current_user.id,
+        db=db
     )
 
+    db.commit()
+    db.refresh(new_comment)
+
     return new_comment
 
 # ============================================
 # LISTAR COMENTARIOS DE UN TICKET
 # ============================================
 @router.get("/{ticket_id}/comments", response_model = List[CommentResponse])
-def list_comments(
+async def list_comments(
     ticket_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    response: Response,
+    limit: Optional[int] = Query(None, ge = 1, le = 200),
+    since: Optional[str] = None,
+    before: Optional[str] = None,
+    latest: bool = False,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
-    Obtener todos los comentarios de un ticket.
+    Obtener los comentarios de un ticket, del más antiguo al más nuevo.
 
     Se verifica que el usuario tenga acceso al ticket.
+
+    Sin `limit`, `since`, `before` ni `latest` se devuelven todos los
+    comentarios (comportamiento original). Si no, se pagina por cursor sobre
+    (created_at, id), con páginas de `limit` o DEFAULT_COMMENT_PAGE_SIZE:
+    - solo limit: los primeros comentarios
+    - latest: los últimos (el punto de entrada para recorrer hacia atrás)
+    - since: los siguientes al cursor (también sirve para pedir solo los nuevos)
+    - before: los anteriores al cursor
+    El cursor para seguir en la misma dirección se devuelve en el header
+    X-Next-Cursor; se omite al llegar al final. Cada página es un rango del
+    índice (ticket_id, created_at, id), sin importar cuántos comentarios
+    tenga el ticket.
     """
-    # Verificar que el ticket existe    
-    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
+    if (since is not None) + (before is not None) + latest > 1:
+        raise HTTPException(
+            status_code = status.HTTP_400_BAD_REQUEST,
+            detail = "Usar solo uno de since, before o latest"
+        )
+    position = None
+    cursor = since if since is not None else before
+    if cursor is not None:
+        position = decode_cursor(cursor)
+        if position is None:
+            raise HTTPException(
+                status_code = status.HTTP_400_BAD_REQUEST,
+                detail = "Cursor inválido"
+            )
+    if cursor is not None or latest:
+        limit = limit or DEFAULT_COMMENT_PAGE_SIZE
+
+    comments, next_cursor = await db.run_sync(
+        _list_comments, ticket_id, current_user, position, limit, before is not None or latest
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return comments
+
+
+def _list_comments(
+    db: Session,
+    ticket_id: int,
+    current_user: UserPrincipal,
+    position: Optional[Tuple[datetime, int]],
+    limit: Optional[int],
+    backwards: bool,
+):
+    # Verificar que el ticket existe
+    ticket = ticket_access_cache.get(db, ticket_id)
     if not ticket:
         raise HTTPException(
             status_code = status.HTTP_404_NOT_FOUND, 
@@ -102,43 +151,41 @@ def list_comments(
         )
 
     # Verificar permisos (mismo que get_ticket)
-    if current_user.role == UserRole.USER:
-        if ticket.creator_id != current_user.id:
-            raise HTTPException(
-                status_code = status.HTTP_403_FORBIDDEN,
-                detail = "No tienes permiso para ver comentarios en este ticket"
-            )
-    
-    elif current_user.role == UserRole.AGENT:
-        if ticket.assigned_agent_id and ticket.assigned_agent_id != current_user.id:
-            raise HTTPException(
-                status_code = status.HTTP_403_FORBIDDEN,
-                detail = "No tienes permiso para ver comentarios en este ticket"
-            )
-        
-    # Obtener comentarios ordenados por fecha
-    comments = db.query(Comment).filter(
-        Comment.ticket_id == ticket_id
-        ).order_by(Comment.created_at.asc()).all()
-    
-    return comments
+    if not can_view_ticket(current_user, ticket):
+        raise HTTPException(
+            status_code = status.HTTP_403_FORBIDDEN,
+            detail = "No tienes permiso para ver comentarios en este ticket"
+        )
+
+    # Página ordenada por fecha; hacia atrás se lee descendente y se invierte
+    query = db.query(Comment).filter(Comment.ticket_id == ticket_id)
+    comments, next_cursor = paginate_keyset(
+        query, Comment.created_at, Comment.id, position, limit, descending = backwards
+    )
+    if backwards:
+        comments.reverse()
+    return comments, next_cursor
 
 # ============================================
 # ACTUALIZAR COMENTARIO
 # ============================================
 @router.put("/{ticket_id}/comments/{comment_id}", response_model = CommentResponse)
-def update_comment(
+async def update_comment(
     ticket_id: int,
     comment_id: int,
     comment_data: CommentUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_write_db),
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Actualizar un comentario existente.
 
     Solo el autor del comentario o un ADMIN pueden actualizarlo.
     """
+    return await db.run_sync(_update_comment, ticket_id, comment_id, comment_data, current_user)
+
+
+def _update_comment(db: Session, ticket_id: int, comment_id: int, comment_data: CommentUpdate, current_user: UserPrincipal):
     # Verificar que el comentario exista
     comment = db.query(Comment).filter(
         Comment.id == comment_id,
@@ -152,7 +199,7 @@ def update_comment(
         )
     
     # Verificar permisos: solo el autor o ADMIN pueden editar
-    if comment.author_id != current_user.id and current_user.role != UserRole.ADMIN:
+    if not can_manage_comment(current_user, comment.author_id):
         raise HTTPException(
             status_code = status.HTTP_403_FORBIDDEN,
             detail = "No tienes permiso para actualizar este comentario"
@@ -169,17 +216,21 @@ def update_comment(
 # ELIMINAR COMENTARIO
 # ============================================
 @router.delete("/{ticket_id}/comments/{comment_id}", status_code = status.HTTP_204_NO_CONTENT)
-def delete_comment(
+async def delete_comment(
     ticket_id: int,
     comment_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_write_db),
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Eliminar un comentario existente.
 
     Solo el autor del comentario o un ADMIN pueden eliminarlo.
     """
+    return await db.run_sync(_delete_comment, ticket_id, comment_id, current_user)
+
+
+def _delete_comment(db: Session, ticket_id: int, comment_id: int, current_user: UserPrincipal):
     # Verificar que el comentario existe y pertenece al ticket.
     comment = db.query(Comment).filter(
         Comment.id == comment_id,
@@ -193,7 +244,7 @@ def delete_comment(
         )
     
     # Verificar permisos: solo el autor o ADMIN pueden eliminar
-    if comment.author_id != current_user.id and current_user.role != UserRole.ADMIN:
+    if not can_manage_comment(current_user, comment.author_id):
         raise HTTPException(
             status_code = status.HTTP_403_FORBIDDEN,
             detail = "No tienes permiso para eliminar este comentario"
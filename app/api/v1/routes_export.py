@@ -0,0 +1,90 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from typing import AsyncContextManager, Callable, List, Optional
+from datetime import datetime
+
+from app.db.deps import get_read_session_factory, get_current_user, UserPrincipal
+from app.models.ticket import Ticket, TicketStatus, TicketPriority
+from app.models.comment import Comment
+from app.schemas.ticket import TicketResponse
+from app.schemas.comment import CommentResponse
+from app.services.export_service import MEDIA_TYPES, stream_rows
+from app.services.ticket_access import visible_tickets_filter
+from app.services.ticket_import_service import FileFormat
+
+router = APIRouter(prefix = "/export", tags = ["Export"])
+
+TICKET_EXPORT_FIELDS = list(TicketResponse.model_fields)
+COMMENT_EXPORT_FIELDS = list(CommentResponse.model_fields)
+
+
+def _export_response(open_session, statement, fields: List[str], name: str, fmt: FileFormat, compress: bool) -> StreamingResponse:
+    headers = {"Content-Disposition": f'attachment; filename="{name}.{fmt.value}"'}
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        stream_rows(open_session, statement, fields, fmt, compress),
+        media_type = MEDIA_TYPES[fmt],
+        headers = headers
+    )
+
+# ============================================
+# EXPORTAR TICKETS
+# ============================================
+@router.get("/tickets")
+async def export_tickets(
+    fmt: FileFormat = Query(FileFormat.NDJSON, alias = "format"),
+    compress: bool = Query(False, alias = "gzip"),
+    ticket_status: Optional[TicketStatus] = Query(None, alias = "status"),
+    priority: Optional[TicketPriority] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    open_session: Callable[[], AsyncContextManager] = Depends(get_read_session_factory),
+    current_user: UserPrincipal = Depends(get_current_user),
+):
+    """
+    Exportar en streaming (NDJSON o CSV) todos los tickets que el usuario
+    puede ver, ordenados por id. Con `gzip=true` el body va comprimido
+    (Content-Encoding: gzip).
+    """
+    statement = select(*[getattr(Ticket, field) for field in TICKET_EXPORT_FIELDS]).order_by(Ticket.id)
+
+    visible = visible_tickets_filter(current_user)
+    if visible is not None:
+        statement = statement.where(visible)
+    if ticket_status is not None:
+        statement = statement.where(Ticket.status == ticket_status)
+    if priority is not None:
+        statement = statement.where(Ticket.priority == priority)
+    if created_from is not None:
+        statement = statement.where(Ticket.created_at >= created_from)
+    if created_to is not None:
+        statement = statement.where(Ticket.created_at < created_to)
+
+    return _export_response(open_session, statement, TICKET_EXPORT_FIELDS, "tickets", fmt, compress)
+
+# ============================================
+# EXPORTAR COMENTARIOS
+# ============================================
+@router.get("/comments")
+async def export_comments(
+    fmt: FileFormat = Query(FileFormat.NDJSON, alias = "format"),
+    compress: bool = Query(False, alias = "gzip"),
+    ticket_id: Optional[int] = None,
+    open_session: Callable[[], AsyncContextManager] = Depends(get_read_session_factory),
+    current_user: UserPrincipal = Depends(get_current_user),
+):
+    """
+    Exportar en streaming los comentarios de los tickets que el usuario
+    puede ver (mismas reglas que el listado de comentarios), por id.
+    """
+    statement = select(*[getattr(Comment, field) for field in COMMENT_EXPORT_FIELDS]).order_by(Comment.id)
+
+    visible = visible_tickets_filter(current_user)
+    if visible is not None:
+        statement = statement.join(Ticket, Ticket.id == Comment.ticket_id).where(visible)
+    if ticket_id is not None:
+        statement = statement.where(Comment.ticket_id == ticket_id)
+
+    return _export_response(open_session, statement, COMMENT_EXPORT_FIELDS, "comments", fmt, compress)
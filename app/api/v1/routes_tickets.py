@@ -1,98 +1,306 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile, status
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
 from datetime import datetime, timezone
+from sqlalchemy import func, update
 from app.services.metrics_service import metrics_service
+from app.services.ticket_stats_service import TicketSnapshot, ticket_stats_service
+from app.services.analytics_service import resolution_seconds_expr
+from app.services.ticket_access import (
+    TicketAccess,
+    can_edit_ticket,
+    can_view_ticket,
+    ticket_access_cache,
+    visible_tickets_filter
+)
+from app.services.search_service import ticket_search_service
+from app.services.duplicate_service import duplicate_detector
+from app.core.config import settings
+from app.services.analytics_cache import analytics_cache
+from app.services.ticket_import_service import FileFormat, ImportResult, ticket_import_service
 
-from app.db.deps import get_db, get_current_user
+from app.core.pagination import NEXT_CURSOR_HEADER, decode_cursor, paginate_keyset
+from app.db.deps import get_read_db, get_write_db, get_current_user, UserPrincipal
 from app.models.user import User, UserRole
-from app.models.ticket import Ticket, TicketStatus
+from app.models.ticket import Ticket, TicketStatus, TicketPriority
+from app.models.comment import Comment
+from app.models.ticket_daily_stats import UNASSIGNED_AGENT_ID
+from app.schemas.comment import CommentDetail
+from app.schemas.user import UserSummary
 from app.schemas.ticket import (
     TicketCreate,
     TicketUpdate,
     TicketAssign,
+    TicketBulkUpdate,
     TicketResponse,
+    TicketDetailResponse,
     TicketListResponse,
+    TicketImportResponse,
+    TicketSearchResult,
 )
 
 router = APIRouter(prefix = "/tickets", tags = ["Tickets"])
 
+# Columnas que necesita TicketListResponse; el listado las selecciona como
+# tuplas para no cargar description ni hidratar entidades Ticket
+TICKET_LIST_FIELDS = list(TicketListResponse.model_fields)
+TICKET_LIST_COLUMNS = [getattr(Ticket, field) for field in TICKET_LIST_FIELDS]
+
+# Tamaño de página al seguir un cursor sin `limit`
+DEFAULT_TICKET_PAGE_SIZE = 50
+
+# Relaciones que se pueden pedir en el detalle con ?include=
+TICKET_INCLUDES = ("comments", "creator", "agent")
+
 # ============================================
 # CREAR TICKET
 # ============================================
 @router.post("/", response_model = TicketResponse, status_code = status.HTTP_201_CREATED)
-def create_ticket(
+async def create_ticket(
     ticket_data: TicketCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_write_db),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
     """
     Crear un nuevo ticket.
     Cualquier usuario autenticado puede crear tickets.
+    Si se parece a un ticket abierto reciente, duplicate_of_id apunta a él.
     """
+    return await db.run_sync(_create_ticket, ticket_data, current_user)
+
+
+def _create_ticket(db: Session, ticket_data: TicketCreate, current_user: UserPrincipal):
+    # Detección de duplicados: enlazar al ticket abierto original probable
+    signature = duplicate = None
+    if settings.DUPLICATE_DETECTION_ENABLED:
+        signature = duplicate_detector.signature(ticket_data.title, ticket_data.description)
+        duplicate = duplicate_detector.find(db, signature)
+
     new_ticket = Ticket(
         title = ticket_data.title,
         description = ticket_data.description,
         priority = ticket_data.priority,
         creator_id = current_user.id,
+        duplicate_of_id = duplicate.ticket_id if duplicate else None,
     )
     db.add(new_ticket)
-    db.commit()
-    db.refresh(new_ticket)
-        # Registrar métrica
+    db.flush()
+
+    # Actualizar rollup de analytics
+    stats_after = ticket_stats_service.snapshot(new_ticket)
+    ticket_stats_service.apply(db, None, stats_after)
+
+    # Registrar métrica (outbox, en la misma transacción)
     metrics_service.record_ticket_created(
         ticket_id=new_ticket.id,
         creator_id=current_user.id,
-        priority=new_ticket.priority.value
+        priority=new_ticket.priority.value,
+        db=db
     )
+
+    db.commit()
+    analytics_cache.invalidate_ticket_change(None, stats_after)
+    db.refresh(new_ticket)
+    if signature is not None and duplicate is None:
+        # Solo los originales entran al índice de duplicados
+        duplicate_detector.add(new_ticket.id, signature, new_ticket.created_at)
     return new_ticket
 
+# ============================================
+# IMPORTACIÓN MASIVA (NDJSON / CSV)
+# ============================================
+@router.post("/import", response_model = TicketImportResponse)
+async def import_tickets(
+    file: UploadFile = File(...),
+    fmt: Optional[FileFormat] = Query(None, alias = "format"),
+    db: AsyncSession = Depends(get_write_db),
+    current_user: UserPrincipal = Depends(get_current_user),
+):
+    """
+    Importar tickets desde un archivo NDJSON o CSV (columnas title,
+    description, priority). Solo ADMIN. El creador de los tickets es
+    quien importa.
+
+    El formato se toma de `format` o de la extensión del archivo. Cada
+    bloque de filas se valida en el threadpool y se carga en su propia
+    transacción; las filas inválidas se devuelven con su número de línea
+    y no detienen la importación.
+    """
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code = status.HTTP_403_FORBIDDEN,
+            detail = "Solo admins pueden importar tickets"
+        )
+
+    fmt = fmt or FileFormat.from_filename(file.filename)
+    if fmt is None:
+        raise HTTPException(
+            status_code = status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail = "Formato no soportado: usar .ndjson o .csv"
+        )
+
+    result = ImportResult(ticket_import_service.max_errors)
+    rows = ticket_import_service.read_rows(file.file, fmt)
+    while (chunk := await run_in_threadpool(ticket_import_service.next_chunk, rows)) is not None:
+        await db.run_sync(ticket_import_service.apply_chunk, chunk, current_user.id, result)
+
+    return result.summary()
+
 # ============================================
 # LISTAR TICKETS (con permisos por rol)
 # ============================================
 @router.get("/", response_model = List[TicketListResponse])
-def list_tickets(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+async def list_tickets(
+    response: Response,
+    limit: Optional[int] = Query(None, ge = 1, le = 200),
+    cursor: Optional[str] = None,
+    ticket_status: Optional[TicketStatus] = Query(None, alias = "status"),
+    priority: Optional[TicketPriority] = None,
+    assigned_agent_id: Optional[int] = None,
+    creator_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
     """
     Listar tickets según el rol del usuario:
     - USER: solo sus propios tickets
     - AGENT: tickets asignados a él + sin asignar
     - ADMIN: todos los tickets
+
+    Orden del más reciente al más antiguo. Sin `limit` ni `cursor` se
+    devuelven todos los tickets visibles (comportamiento original, que se
+    mantiene solo por compatibilidad: los clientes deben pasar a `limit`). Con
+    `limit` (o un `cursor`, con páginas de DEFAULT_TICKET_PAGE_SIZE) se
+    pagina por cursor sobre (created_at, id): el cursor de la siguiente
+    página se devuelve en el header X-Next-Cursor y se omite en la última.
     """
-    if current_user.role == UserRole.ADMIN:
-        tickets = db.query(Ticket).all()
-    
-    elif current_user.role == UserRole.AGENT:
-        # Agent ve: tickets asignados a él + sin asignar
-        tickets = db.query(Ticket).filter(
-            (Ticket.assigned_agent_id == current_user.id) |
-            (Ticket.assigned_agent_id == None)
-        ).all()
-
-    else: # USER
-        # User solo ve sus propios tickets
-        tickets = db.query(Ticket).filter(
-            Ticket.creator_id == current_user.id
-            ).all()
-    
-    return tickets
+    position = None
+    if cursor is not None:
+        position = decode_cursor(cursor)
+        if position is None:
+            raise HTTPException(
+                status_code = status.HTTP_400_BAD_REQUEST,
+                detail = "Cursor inválido"
+            )
+        limit = limit or DEFAULT_TICKET_PAGE_SIZE
+    # limit=None lee la tabla visible completa en una sola respuesta y sin
+    # X-Next-Cursor (no hay página siguiente). Existe solo para no romper a
+    # los clientes anteriores a la paginación; no usarlo en clientes nuevos.
+
+    rows, next_cursor = await db.run_sync(
+        _list_tickets,
+        current_user,
+        position,
+        limit,
+        ticket_status = ticket_status,
+        priority = priority,
+        assigned_agent_id = assigned_agent_id,
+        creator_id = creator_id,
+        created_from = created_from,
+        created_to = created_to
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+    return [dict(zip(TICKET_LIST_FIELDS, row)) for row in rows]
+
+
+def _list_tickets(
+    db: Session,
+    current_user: UserPrincipal,
+    position: Optional[Tuple[datetime, int]],
+    limit: Optional[int],
+    ticket_status: Optional[TicketStatus] = None,
+    priority: Optional[TicketPriority] = None,
+    assigned_agent_id: Optional[int] = None,
+    creator_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+):
+    query = db.query(*TICKET_LIST_COLUMNS)
+
+    # Visibilidad por rol (USER: propios, AGENT: asignados + sin asignar)
+    visible = visible_tickets_filter(current_user)
+    if visible is not None:
+        query = query.filter(visible)
+
+    # Filtros opcionales (se aplican en SQL)
+    if ticket_status is not None:
+        query = query.filter(Ticket.status == ticket_status)
+    if priority is not None:
+        query = query.filter(Ticket.priority == priority)
+    if assigned_agent_id is not None:
+        query = query.filter(Ticket.assigned_agent_id == assigned_agent_id)
+    if creator_id is not None:
+        query = query.filter(Ticket.creator_id == creator_id)
+    if created_from is not None:
+        query = query.filter(Ticket.created_at >= created_from)
+    if created_to is not None:
+        query = query.filter(Ticket.created_at < created_to)
+
+    return paginate_keyset(query, Ticket.created_at, Ticket.id, position, limit)
+
+# ============================================
+# BÚSQUEDA FULL-TEXT
+# ============================================
+@router.get("/search", response_model = List[TicketSearchResult])
+async def search_tickets(
+    q: str = Query(..., min_length = 1, max_length = 200),
+    limit: int = Query(20, ge = 1, le = 100),
+    offset: int = Query(0, ge = 0, le = 1000),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: UserPrincipal = Depends(get_current_user),
+):
+    """
+    Buscar tickets por título, descripción y comentarios, ordenados por
+    relevancia. Acepta la sintaxis de websearch_to_tsquery en PostgreSQL
+    ("frase exacta", OR, -excluir). Mismas reglas de visibilidad que el
+    listado.
+    """
+    return await db.run_sync(ticket_search_service.search, q, current_user, limit, offset)
 
 # ============================================
 # VER DETALLE DE UN TICKET
 # ============================================
-@router.get("/{ticket_id}", response_model = TicketResponse)
-def get_ticket(
+@router.get("/{ticket_id}", response_model = TicketDetailResponse)
+async def get_ticket(
     ticket_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    include: Optional[str] = Query(None, description = "Relaciones a incluir, separadas por coma: comments, creator, agent"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
     """
     Obtener los detalles de un ticket específico.
     Verifica permisos según rol.
+
+    Con `include` se embeben el creador, el agente asignado y/o los
+    comentarios con su autor, para armar la vista de detalle en un solo
+    request: son como máximo dos consultas sin importar cuántos comentarios
+    tenga el ticket.
     """
-    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()                        
+    relations = {name.strip() for name in include.split(",") if name.strip()} if include else set()
+    unknown = relations - set(TICKET_INCLUDES)
+    if unknown:
+        raise HTTPException(
+            status_code = status.HTTP_400_BAD_REQUEST,
+            detail = f"include inválido: {', '.join(sorted(unknown))}. Valores posibles: {', '.join(TICKET_INCLUDES)}"
+        )
+    return await db.run_sync(_get_ticket, ticket_id, current_user, relations)
+
+
+def _get_ticket(db: Session, ticket_id: int, current_user: UserPrincipal, relations: Set[str]):
+    # Usuarios en la misma consulta del ticket (LEFT OUTER JOIN)
+    query = db.query(Ticket)
+    if "creator" in relations:
+        query = query.options(joinedload(Ticket.creator))
+    if "agent" in relations:
+        query = query.options(joinedload(Ticket.assigned_agent))
+    ticket = query.filter(Ticket.id == ticket_id).first()
 
     if not ticket:
         raise HTTPException(
@@ -100,40 +308,54 @@ def get_ticket(
             detail = "Ticket no encontrado"
         )
 
-    # Verificar permisos
-    if current_user.role == UserRole.USER and ticket.creator_id != current_user.id:
-        # Un USER solo puede ver sus propios tickets
-        if ticket.creator_id != current_user.id:
-            raise HTTPException(
-                status_code = status.HTTP_403_FORBIDDEN, 
-                detail = "No tienes permiso para ver este ticket")
+    # Verificar permisos (USER: propios; AGENT: asignados a él o sin asignar)
+    if not can_view_ticket(current_user, ticket):
+        raise HTTPException(
+            status_code = status.HTTP_403_FORBIDDEN, 
+            detail = "No tienes permiso para ver este ticket")
 
-    elif current_user.role == UserRole.AGENT:
-        # Un AGENT solo puede ver tickets asignados a él o sin asignar
-        if ticket.assigned_agent_id and ticket.assigned_agent_id != current_user.id:
-            raise HTTPException(
-                status_code = status.HTTP_403_FORBIDDEN, 
-                detail = "No tienes permiso para ver este ticket")
-        
     # ADMIN puede ver cualquier ticket (no hay restricción)
-    return ticket
+    # Se arma el dict explícitamente: validar el modelo leería las
+    # relaciones no pedidas con lazy loading
+    detail = TicketResponse.model_validate(ticket).model_dump()
+    if "creator" in relations:
+        detail["creator"] = UserSummary.model_validate(ticket.creator)
+    if "agent" in relations and ticket.assigned_agent is not None:
+        detail["assigned_agent"] = UserSummary.model_validate(ticket.assigned_agent)
+    if "comments" in relations:
+        # Una sola consulta con los autores, en el orden del índice (ticket_id, created_at, id)
+        comments = (
+            db.query(Comment)
+            .options(joinedload(Comment.author))
+            .filter(Comment.ticket_id == ticket.id)
+            .order_by(Comment.created_at.asc(), Comment.id.asc())
+            .all()
+        )
+        detail["comments"] = [CommentDetail.model_validate(comment) for comment in comments]
+    return detail
 
 # ============================================
 # ACTUALIZAR TICKET
 # ============================================
 @router.put("/{ticket_id}", response_model = TicketResponse)
-def update_ticket(
+async def update_ticket(
     ticket_id: int,
     ticket_data: TicketUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_write_db),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
     """
     Actualizar un ticket.
     - USER: solo puede actualizar título y descripción de sus propios tickets
     - AGENT: puede actualizar cualquier campo
     """
-    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
+    return await db.run_sync(_update_ticket, ticket_id, ticket_data, current_user)
+
+
+def _update_ticket(db: Session, ticket_id: int, ticket_data: TicketUpdate, current_user: UserPrincipal):
+    # FOR UPDATE: el snapshot "antes" del rollup no puede quedar viejo por
+    # otra escritura concurrente sobre el mismo ticket
+    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).with_for_update().first()
 
     if not ticket:
         raise HTTPException(
@@ -144,7 +366,7 @@ def update_ticket(
     # Verificar permisos
     if current_user.role == UserRole.USER:
         # USER solo puede editar sus propios tickets
-        if ticket.creator_id != current_user.id:
+        if not can_edit_ticket(current_user, ticket):
             raise HTTPException(
                 status_code = status.HTTP_403_FORBIDDEN, 
                 detail = "No tienes permiso para actualizar este ticket"
@@ -155,7 +377,9 @@ def update_ticket(
                 status_code = status.HTTP_403_FORBIDDEN, 
                 detail = "No tienes permiso para actualizar ese campo"
                 )
-        
+
+    stats_before = ticket_stats_service.snapshot(ticket)
+
     # Actualizar campos (solo los que se enviaron)
     if ticket_data.title is not None:
         ticket.title = ticket_data.title
@@ -171,7 +395,8 @@ def update_ticket(
             ticket_id=ticket.id,
             old_status=old_status,
             new_status=ticket_data.status.value,
-            user_id=current_user.id
+            user_id=current_user.id,
+            db=db
         )
         
         # Si se marca como resuelto, calcular tiempo y registrar métrica
@@ -188,12 +413,18 @@ def update_ticket(
             metrics_service.record_ticket_resolved(
                 ticket_id=ticket.id,
                 agent_id=ticket.assigned_agent_id,
-                resolution_time_seconds=resolution_time
+                resolution_time_seconds=resolution_time,
+                db=db
             )
     if ticket_data.assigned_agent_id is not None:
         ticket.assigned_agent_id = ticket_data.assigned_agent_id
 
+    # Actualizar rollup de analytics
+    stats_after = ticket_stats_service.snapshot(ticket)
+    ticket_stats_service.apply(db, stats_before, stats_after)
+
     db.commit()
+    analytics_cache.invalidate_ticket_change(stats_before, stats_after)
     db.refresh(ticket)
 
     return ticket
@@ -202,16 +433,20 @@ def update_ticket(
 # ASIGNAR AGENTE (endpoint específico)
 # ============================================
 @router.patch("/{ticket_id}/assign", response_model = TicketResponse)
-def assign_ticket(
+async def assign_ticket(
     ticket_id: int,
     assignment: TicketAssign,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_write_db),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
     """
     Asignar un agente a un ticket.
     Solo ADMIN y AGENT pueden asignar tickets.
     """
+    return await db.run_sync(_assign_ticket, ticket_id, assignment, current_user)
+
+
+def _assign_ticket(db: Session, ticket_id: int, assignment: TicketAssign, current_user: UserPrincipal):
     # Solo admin y agent pueden asignar
     if current_user.role == UserRole.USER:
         raise HTTPException(
@@ -219,7 +454,7 @@ def assign_ticket(
             detail = "Solo admins y agents pueden asignar tickets"
         )
 
-    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
+    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).with_for_update().first()
 
     if not ticket:
         raise HTTPException(
@@ -241,44 +476,202 @@ def assign_ticket(
             detail = "El usuario asignado debe ser un agente o admin"
         )
 
+    stats_before = ticket_stats_service.snapshot(ticket)
     ticket.assigned_agent_id = assignment.assigned_agent_id
 
     # Registrar métrica de asignación
     metrics_service.record_ticket_assigned(
         ticket_id=ticket.id,
         agent_id=assignment.assigned_agent_id,
-        assigned_by_id=current_user.id
+        assigned_by_id=current_user.id,
+        db=db
     )
 
     # Cambiar estado a IN_PROGRESS si está OPEN
     if ticket.status == TicketStatus.OPEN:
         ticket.status = TicketStatus.IN_PROGRESS
 
+    # Actualizar rollup de analytics
+    stats_after = ticket_stats_service.snapshot(ticket)
+    ticket_stats_service.apply(db, stats_before, stats_after)
+
     db.commit()
+    analytics_cache.invalidate_ticket_change(stats_before, stats_after)
     db.refresh(ticket)
 
     return ticket
 
+# ============================================
+# CAMBIOS EN BLOQUE (estado / asignación)
+# ============================================
+@router.patch("/bulk", response_model = List[TicketListResponse])
+async def bulk_update_tickets(
+    bulk: TicketBulkUpdate,
+    db: AsyncSession = Depends(get_write_db),
+    current_user: UserPrincipal = Depends(get_current_user),
+):
+    """
+    Cambiar estado y/o agente asignado de varios tickets en una transacción.
+    Solo ADMIN y AGENT, con las mismas reglas que update_ticket y
+    assign_ticket: el agente debe existir y ser agent o admin, asignar pasa
+    los tickets OPEN a IN_PROGRESS y el cambio de estado se aplica después
+    de la asignación. Si algún cambio es inválido no se aplica ninguno.
+    """
+    return await db.run_sync(_bulk_update_tickets, bulk, current_user)
+
+
+def _bulk_update_tickets(db: Session, bulk: TicketBulkUpdate, current_user: UserPrincipal):
+    if current_user.role == UserRole.USER:
+        raise HTTPException(
+            status_code = status.HTTP_403_FORBIDDEN,
+            detail = "Solo admins y agents pueden modificar tickets en bloque"
+        )
+
+    ticket_ids = [change.ticket_id for change in bulk.changes]
+    if len(set(ticket_ids)) != len(ticket_ids):
+        raise HTTPException(
+            status_code = status.HTTP_400_BAD_REQUEST,
+            detail = "Cada ticket puede aparecer una sola vez"
+        )
+    if any(change.status is None and change.assigned_agent_id is None for change in bulk.changes):
+        raise HTTPException(
+            status_code = status.HTTP_400_BAD_REQUEST,
+            detail = "Cada cambio debe indicar status o assigned_agent_id"
+        )
+
+    tickets = {
+        row.id: row
+        for row in db.query(
+            Ticket.id, Ticket.status, Ticket.priority, Ticket.creator_id, Ticket.assigned_agent_id,
+            Ticket.created_at, Ticket.resolved_at
+        ).filter(Ticket.id.in_(ticket_ids)).order_by(Ticket.id).with_for_update()
+    }
+    missing = sorted(set(ticket_ids) - tickets.keys())
+    if missing:
+        raise HTTPException(
+            status_code = status.HTTP_404_NOT_FOUND,
+            detail = f"Tickets no encontrados: {missing}"
+        )
+
+    # Verificar que los usuarios a asignar existen y son AGENT o ADMIN
+    agent_ids = {change.assigned_agent_id for change in bulk.changes if change.assigned_agent_id is not None}
+    agents = dict(db.query(User.id, User.role).filter(User.id.in_(agent_ids)).all()) if agent_ids else {}
+    if agent_ids - agents.keys():
+        raise HTTPException(
+            status_code = status.HTTP_404_NOT_FOUND,
+            detail = "Agente no encontrado"
+        )
+    if any(role not in (UserRole.AGENT, UserRole.ADMIN) for role in agents.values()):
+        raise HTTPException(
+            status_code = status.HTTP_400_BAD_REQUEST,
+            detail = "El usuario asignado debe ser un agente o admin"
+        )
+
+    # Estado final de cada ticket, agrupado para un UPDATE por combinación
+    groups: Dict[Tuple[TicketStatus, Optional[int]], List[int]] = defaultdict(list)
+    final_state = {}
+    events = []
+    newly_resolved = []
+    for change in bulk.changes:
+        ticket = tickets[change.ticket_id]
+        new_status = ticket.status
+        new_agent = ticket.assigned_agent_id
+
+        if change.assigned_agent_id is not None:
+            new_agent = change.assigned_agent_id
+            events.append(metrics_service.ticket_assigned_event(ticket.id, new_agent, current_user.id))
+            if new_status == TicketStatus.OPEN:
+                new_status = TicketStatus.IN_PROGRESS
+
+        if change.status is not None:
+            events.append(metrics_service.ticket_status_change_event(
+                ticket.id, new_status.value, change.status.value, current_user.id
+            ))
+            if change.status == TicketStatus.RESOLVED and not ticket.resolved_at:
+                newly_resolved.append(ticket.id)
+            new_status = change.status
+
+        groups[(new_status, new_agent)].append(ticket.id)
+        final_state[ticket.id] = (new_status, new_agent)
+
+    # UPDATE por grupo; al resolver, el tiempo de resolución sale del mismo UPDATE
+    resolution_seconds = {}
+    resolved_at = datetime.now(timezone.utc)
+    for (new_status, new_agent), ids in groups.items():
+        values = {"status": new_status, "assigned_agent_id": new_agent}
+        stmt = update(Ticket).where(Ticket.id.in_(ids)).execution_options(synchronize_session = False)
+        if new_status == TicketStatus.RESOLVED:
+            values["resolved_at"] = func.coalesce(Ticket.resolved_at, resolved_at)
+            stmt = stmt.values(**values).returning(Ticket.id, resolution_seconds_expr(db))
+            resolution_seconds.update(db.execute(stmt).all())
+        else:
+            db.execute(stmt.values(**values))
+
+    for ticket_id in newly_resolved:
+        events.append(metrics_service.ticket_resolved_event(
+            ticket_id, final_state[ticket_id][1], int(resolution_seconds[ticket_id])
+        ))
+
+    # Actualizar rollup de analytics con la diferencia agregada por clave
+    changes = []
+    deltas = defaultdict(int)
+    for ticket_id, (new_status, new_agent) in final_state.items():
+        stats_before = ticket_stats_service.snapshot(tickets[ticket_id])
+        seconds = None
+        if new_status == TicketStatus.RESOLVED:
+            # Los que ya estaban resueltos conservan su resolved_at y su aporte
+            seconds = stats_before.resolution_seconds
+            if seconds is None:
+                seconds = resolution_seconds[ticket_id]
+        stats_after = TicketSnapshot(
+            day = stats_before.day,
+            status = new_status,
+            priority = stats_before.priority,
+            agent_id = new_agent or UNASSIGNED_AGENT_ID,
+            resolution_seconds = seconds
+        )
+        if stats_before != stats_after:
+            deltas[stats_before] -= 1
+            deltas[stats_after] += 1
+            changes.append((stats_before, stats_after))
+    ticket_stats_service.apply_many(db, deltas)
+
+    # Métricas (outbox, una sola escritura en la misma transacción)
+    metrics_service.record_events(events, db=db)
+
+    db.commit()
+    analytics_cache.invalidate_ticket_changes(changes)
+    # Los UPDATE de Core no pasan por los eventos ORM del cache de permisos
+    for ticket_id, (_, new_agent) in final_state.items():
+        ticket_access_cache.put(TicketAccess(ticket_id, tickets[ticket_id].creator_id, new_agent))
+
+    rows = db.query(*TICKET_LIST_COLUMNS).filter(Ticket.id.in_(ticket_ids)).order_by(Ticket.id).all()
+    return [dict(zip(TICKET_LIST_FIELDS, row)) for row in rows]
+
 # ============================================
 # ELIMINAR TICKET (soft delete o real)
 # ============================================
 @router.delete("/{ticket_id}", status_code = status.HTTP_204_NO_CONTENT)
-def delete_ticket(
+async def delete_ticket(
     ticket_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_write_db),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
     """
     Eliminar un ticket.
     Solo ADMIN puede eliminar tickets.
     """
+    return await db.run_sync(_delete_ticket, ticket_id, current_user)
+
+
+def _delete_ticket(db: Session, ticket_id: int, current_user: UserPrincipal):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(
             status_code = status.HTTP_403_FORBIDDEN,
             detail = "Solo admins pueden eliminar tickets"
         )
 
-    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
+    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).with_for_update().first()
 
     if not ticket:
         raise HTTPException(
@@ -286,7 +679,12 @@ def delete_ticket(
             detail = "Ticket no encontrado"
         )
 
+    # Actualizar rollup de analytics
+    stats_before = ticket_stats_service.snapshot(ticket)
+    ticket_stats_service.apply(db, stats_before, None)
+
     db.delete(ticket)
     db.commit()
+    analytics_cache.invalidate_ticket_change(stats_before, None)
 
     return None
\ No newline at end of file
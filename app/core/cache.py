@@ -0,0 +1,210 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+from app.core.logging import get_logger
+
+logger = get_logger("cache")
+
+
+class TTLCache:
+    """
+    In-process cache with a per-entry TTL and LRU eviction.
+
+    Entries carry a set of tags so that writes can invalidate every entry
+    that depends on them without knowing the exact keys.
+    """
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # key -> (value, stored_at, expires_at, tags)
+        self._entries: "OrderedDict[str, Tuple[Any, float, float, frozenset]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """
+        Return (value, age in seconds) if the key is cached and fresh.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or now >= entry[2]:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0], now - entry[1]
+
+    def set(self, key: str, value: Any, tags: Iterable[str] = (), ttl: Optional[float] = None):
+        """
+        Store a value, evicting the least recently used entries if full.
+        `ttl` overrides the cache TTL for this entry.
+        """
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (value, now, expires_at, frozenset(tags))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str) -> bool:
+        """
+        Drop a single entry. Returns True if it was cached.
+        """
+        with self._lock:
+            dropped = self._entries.pop(key, None) is not None
+            if dropped:
+                self.invalidations += 1
+        return dropped
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        """
+        Drop every entry carrying any of the tags. Returns the number dropped.
+        """
+        tags = set(tags)
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if entry[3] & tags]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+        return len(stale)
+
+    def clear(self):
+        """
+        Drop every entry.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Cache counters.
+        """
+        with self._lock:
+            return {
+                "backend": "memory",
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+class RedisCache:
+    """
+    Cache backed by Redis (or any server speaking its protocol), shared by
+    every API instance.
+
+    Each entry is a hash with the value and the time it was stored, expired
+    by Redis after `ttl`. Tags are sets of keys so invalidation only touches
+    the entries that depend on them. Requires the optional `redis` package.
+    """
+    def __init__(self, url: str, ttl: float, prefix: str):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("The redis package is required for a Redis cache backend") from e
+
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self.ttl = ttl
+        self.prefix = prefix
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        """
+        Return (value, age in seconds) if the key is cached.
+        """
+        entry = self.client.hgetall(self._key(key))
+        with self._lock:
+            if not entry:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return entry["value"], max(time.time() - float(entry["stored_at"]), 0.0)
+
+    def set(self, key: str, value: str, tags: Iterable[str] = ()):
+        """
+        Store a value and register it under its tags.
+        """
+        ttl_ms = int(self.ttl * 1000)
+        pipe = self.client.pipeline()
+        pipe.hset(self._key(key), mapping={"value": value, "stored_at": time.time()})
+        pipe.pexpire(self._key(key), ttl_ms)
+        for tag in tags:
+            pipe.sadd(self._tag(tag), key)
+            pipe.pexpire(self._tag(tag), ttl_ms)
+        pipe.execute()
+
+    def delete(self, key: str) -> bool:
+        """
+        Drop a single entry. Returns True if it was cached.
+        """
+        dropped = bool(self.client.delete(self._key(key)))
+        if dropped:
+            with self._lock:
+                self.invalidations += 1
+        return dropped
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        """
+        Drop every entry registered under any of the tags.
+        """
+        tag_keys = [self._tag(tag) for tag in tags]
+        keys = self.client.sunion(tag_keys) if tag_keys else set()
+        pipe = self.client.pipeline()
+        for key in keys:
+            pipe.delete(self._key(key))
+        pipe.delete(*tag_keys)
+        dropped = sum(pipe.execute()[:len(keys)])
+        with self._lock:
+            self.invalidations += dropped
+        return dropped
+
+    def clear(self):
+        """
+        Drop every entry under this cache prefix.
+        """
+        for key in self.client.scan_iter(f"{self.prefix}:*"):
+            self.client.delete(key)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Cache counters of this process.
+        """
+        with self._lock:
+            return {
+                "backend": "redis",
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}:entry:{key}"
+
+    def _tag(self, tag: str) -> str:
+        return f"{self.prefix}:tag:{tag}"
+
+
+def build_cache(ttl: float, max_entries: int, redis_url: Optional[str] = None, prefix: str = "cache"):
+    """
+    Create a Redis cache if `redis_url` is set, an in-process one otherwise.
+    """
+    if redis_url:
+        logger.info(f"Using Redis cache backend for '{prefix}'")
+        return RedisCache(redis_url, ttl=ttl, prefix=prefix)
+    return TTLCache(ttl=ttl, max_entries=max_entries)
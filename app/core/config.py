@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -12,17 +12,80 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str
+    # Connection pool (per engine; the API has a sync and an async engine)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # -1 disables recycling
+    DB_POOL_PRE_PING: bool = True  # False: rely on recycle + invalidate on error
+    # Read replicas (JSON list of URLs) for read-only endpoints
+    DATABASE_REPLICA_URLS: List[str] = []
+    DB_REPLICA_BALANCING: str = "round_robin"  # round_robin | least_connections
+    DB_READ_YOUR_WRITES_SECONDS: float = 5.0  # Reads pinned to the primary after a write
     
     # InfluxDB
     INFLUXDB_URL: str
     INFLUXDB_TOKEN: str
     INFLUXDB_ORG: str
     INFLUXDB_BUCKET: str
+    # Background writer: batching and backpressure (drop_oldest | block | spill)
+    INFLUXDB_BATCH_SIZE: int = 500
+    INFLUXDB_FLUSH_INTERVAL_SECONDS: float = 1.0
+    INFLUXDB_QUEUE_SIZE: int = 10000
+    INFLUXDB_BACKPRESSURE: str = "drop_oldest"
+    INFLUXDB_BLOCK_TIMEOUT_SECONDS: float = 0.5
+    # On-disk spool used while InfluxDB is unreachable
+    INFLUXDB_SPOOL_DIR: str = "metrics_spool"
+    INFLUXDB_SPOOL_SEGMENT_BYTES: int = 8 * 1024 * 1024
+    INFLUXDB_SPOOL_MAX_SEGMENTS: int = 128
+    INFLUXDB_REPLAY_INTERVAL_SECONDS: float = 10.0
+    INFLUXDB_REPLAY_MAX_POINTS_PER_SECOND: float = 5000.0
+
+    # Metric outbox relay
+    OUTBOX_RELAY_ENABLED: bool = True
+    OUTBOX_BATCH_SIZE: int = 500
+    OUTBOX_POLL_INTERVAL_SECONDS: float = 1.0
+
+    # Analytics response cache (in-process unless a Redis URL is given)
+    ANALYTICS_CACHE_TTL_SECONDS: float = 30.0
+    ANALYTICS_CACHE_MAX_ENTRIES: int = 1024
+    ANALYTICS_CACHE_REDIS_URL: Optional[str] = None
+
+    # Authenticated user principal cache (id, role, is_active)
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 30.0
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+
+    # Ticket ownership cache for authorization (id, creator_id, assigned_agent_id);
+    # in-process unless a Redis URL is given
+    TICKET_ACCESS_CACHE_TTL_SECONDS: float = 30.0
+    TICKET_ACCESS_CACHE_MAX_ENTRIES: int = 50000
+    TICKET_ACCESS_CACHE_REDIS_URL: Optional[str] = None
+
+    # Bulk ticket import: rows per transaction and errors listed in the response
+    TICKET_IMPORT_CHUNK_SIZE: int = 5000
+    TICKET_IMPORT_MAX_ERRORS: int = 1000
+    # Duplicate detection at ticket creation (MinHash + LSH over recent open tickets)
+    DUPLICATE_DETECTION_ENABLED: bool = True
+    DUPLICATE_SIMILARITY_THRESHOLD: float = 0.8
+    DUPLICATE_WINDOW_SECONDS: float = 3600.0
+    DUPLICATE_INDEX_MAX_TICKETS: int = 50000
+    DUPLICATE_MINHASH_PERMUTATIONS: int = 32
+    DUPLICATE_LSH_BANDS: int = 8
+    DUPLICATE_REFRESH_BATCH: int = 200
+    # Streaming export: rows fetched from the server-side cursor per chunk
+    EXPORT_BATCH_SIZE: int = 1000
     
     # JWT
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Verified token cache size (0 disables it)
+    JWT_CACHE_MAX_ENTRIES: int = 10000
+
+    # Password hashing (bcrypt cost and dedicated process pool, 0 = threadpool)
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 64
     
     # CORS (optional)
     CORS_ORIGINS: list = ["*"]
@@ -0,0 +1,79 @@
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import func, tuple_
+from sqlalchemy.orm import Query
+
+# Header used to return the opaque cursor of the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """
+    Encode a (created_at, id) keyset position as an opaque URL-safe cursor.
+    """
+    raw = json.dumps({"c": created_at.isoformat(), "i": row_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[datetime, int]]:
+    """
+    Decode a cursor produced by encode_cursor.
+    Returns the (created_at, id) position if valid, None otherwise.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(data["c"]), int(data["i"])
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def _created_key(query: Query, value):
+    """
+    Expression used to order and compare the created_at part of the keyset.
+
+    SQLite stores DateTime as text, so '10:00:00' and '10:00:00.000000' would
+    not compare as equal; julianday() normalizes both sides there.
+    """
+    if query.session.get_bind().dialect.name == "sqlite":
+        return func.julianday(value)
+    return value
+
+
+def paginate_keyset(
+    query: Query,
+    created_column,
+    id_column,
+    position: Optional[Tuple[datetime, int]],
+    limit: Optional[int],
+    descending: bool = True,
+) -> Tuple[List, Optional[str]]:
+    """
+    Return one page of `query` ordered by (created_at, id), descending unless
+    `descending` is False, starting after `position`, plus the cursor of the
+    next page in the same direction (None on the last page). A None `limit`
+    returns every remaining row.
+
+    Rows must expose `created_at` and `id` (ORM entities or labeled columns).
+    """
+    created_key = _created_key(query, created_column)
+    if position is not None:
+        created_at, row_id = position
+        key, bound = tuple_(created_key, id_column), tuple_(_created_key(query, created_at), row_id)
+        query = query.filter(key < bound if descending else key > bound)
+
+    if descending:
+        query = query.order_by(created_key.desc(), id_column.desc())
+    else:
+        query = query.order_by(created_key.asc(), id_column.asc())
+    if limit is None:
+        return query.all(), None
+    rows = query.limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return rows, next_cursor
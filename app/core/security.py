@@ -1,11 +1,18 @@
+import asyncio
+import hashlib
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from app.core.cache import TTLCache
 from app.core.config import settings
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing context (BCRYPT_ROUNDS sets the cost per deployment)
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -22,6 +29,106 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """
+    True if the hash was made with a different scheme or cost than the
+    configured one.
+    """
+    return pwd_context.needs_update(hashed_password)
+
+
+class PasswordHasherBusy(Exception):
+    """
+    Raised when too many password hashes are already pending.
+    """
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a dedicated process pool so that hashing neither holds
+    the GIL of the API process nor occupies its threadpool.
+
+    At most `max_pending` operations may be queued or running; beyond that
+    PasswordHasherBusy is raised right away (the API answers 503) instead of
+    letting a login storm delay every other endpoint. With `workers=0` the
+    default threadpool is used instead of processes.
+    """
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def start(self):
+        """
+        Start the worker processes.
+        """
+        if self.workers > 0 and self._executor is None:
+            # spawn: forking a process with running threads is not safe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+
+    def shutdown(self):
+        """
+        Stop the worker processes.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def hash(self, password: str) -> str:
+        """
+        Hash a password off the event loop.
+        """
+        return await self._run(get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """
+        Verify a password off the event loop.
+        """
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordHasherBusy()
+            self.pending += 1
+        try:
+            if self.workers > 0:
+                self.start()
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            with self._lock:
+                self.pending -= 1
+                self.completed += 1
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Pool counters.
+        """
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "pending": self.pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+
+# Global password hasher instance
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Create a JWT access token.
@@ -37,13 +144,39 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
+# Recently verified tokens: SHA-256 of the token -> claims, until its `exp`
+token_cache = TTLCache(
+    ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    max_entries=settings.JWT_CACHE_MAX_ENTRIES,
+)
+
+
+def _verify_access_token(token: str) -> Optional[dict]:
+    try:
+        return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return None
+
+
 def decode_access_token(token: str) -> Optional[dict]:
     """
     Decode and verify a JWT token.
     Returns the payload if valid, None otherwise.
+
+    Tokens already verified are served from token_cache until they expire,
+    skipping the signature check. Only tokens with `exp` are cached.
     """
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
-    except JWTError:
-        return None
+    if settings.JWT_CACHE_MAX_ENTRIES <= 0:
+        return _verify_access_token(token)
+
+    digest = hashlib.sha256(token.encode()).hexdigest()
+    cached = token_cache.get(digest)
+    if cached is not None:
+        return dict(cached[0])
+
+    payload = _verify_access_token(token)
+    if payload is not None and isinstance(payload.get("exp"), (int, float)):
+        remaining = payload["exp"] - time.time()
+        if remaining > 0:
+            token_cache.set(digest, dict(payload), ttl=remaining)
+    return payload
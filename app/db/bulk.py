@@ -0,0 +1,68 @@
+import csv
+import enum
+import io
+from typing import List, Sequence
+from sqlalchemy import Table
+from sqlalchemy.orm import Session
+from sqlalchemy.util import await_only
+
+
+def _enum_names(rows: Sequence[tuple]) -> Sequence[Sequence]:
+    """
+    Replace enum members by their name, the way SQLAlchemy stores them.
+    Enum columns are detected once per batch, not per value.
+    """
+    enum_columns = [
+        index for index in range(len(rows[0]))
+        if isinstance(next((row[index] for row in rows if row[index] is not None), None), enum.Enum)
+    ]
+    if not enum_columns:
+        return rows
+
+    converted = []
+    for row in rows:
+        row = list(row)
+        for index in enum_columns:
+            if row[index] is not None:
+                row[index] = row[index].name
+        converted.append(row)
+    return converted
+
+
+def copy_rows(db: Session, table: Table, columns: List[str], rows: Sequence[tuple]):
+    """
+    Load rows with COPY ... FROM STDIN on the session's connection, so they
+    are part of its transaction. PostgreSQL only (psycopg2 or asyncpg).
+    """
+    rows = _enum_names(rows)
+    connection = db.connection().connection
+    driver = connection.driver_connection
+
+    if hasattr(driver, "copy_records_to_table"):
+        # asyncpg (AsyncSession.run_sync): wait for the coroutine from the greenlet
+        await_only(driver.copy_records_to_table(table.name, records=[tuple(row) for row in rows], columns=columns))
+        return
+
+    # csv writes other values with str(): datetimes come out as ISO 8601
+    # with a space separator, None as an empty (NULL) field
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    cursor = connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+
+def bulk_insert(db: Session, table: Table, columns: List[str], rows: Sequence[tuple]):
+    """
+    Insert many rows in one round trip: COPY on PostgreSQL, a Core
+    executemany INSERT on other databases.
+    """
+    if not rows:
+        return
+    if db.get_bind().dialect.name == "postgresql":
+        copy_rows(db, table, columns, rows)
+    else:
+        db.execute(table.insert(), [dict(zip(columns, row)) for row in rows])
@@ -1,18 +1,22 @@
-from typing import Generator
-from sqlalchemy.orm import Session
+from typing import AsyncContextManager, Callable, Generator
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.security import OAuth2PasswordBearer
-from app.db.session import get_db
+from app.db.session import get_db, get_async_db, primary
+from app.db.replicas import replica_router
 from app.db.influxdb import get_influx_db, InfluxDBConnection
 from app.core.security import decode_access_token
-from app.models.user import User
+from app.models.user import UserRole
+from app.services.principal_cache import principal_cache, UserPrincipal
 from fastapi import Depends, HTTPException, status
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl = "api/v1/auth/login")
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> UserPrincipal:
     """
     Get current authenticated user from JWT token.
     Used as dependency in protected endpoints.
+    Returns the cached principal (id, role, is_active), so most requests
+    don't query the users table.
     """
     # Decode JWT token
     payload = decode_access_token(token)
@@ -24,15 +28,17 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         )
     
     # Extract user_id from payload
-    user_id: int = payload.get("sub")
-    if user_id is None:
+    user_id: str = payload.get("sub")
+    if user_id is None or not str(user_id).isdigit():
         raise HTTPException(
             status_code = status.HTTP_401_UNAUTHORIZED,
             detail = "Could not validate credentials",
         )
     
-    # Get user from database
-    user = db.query(User).filter(User.id == user_id).first()
+    # Get user principal from cache or database
+    user = principal_cache.cached(int(user_id))
+    if user is None:
+        user = await db.run_sync(principal_cache.load, int(user_id))
     if user is None:
         raise HTTPException(
             status_code = status.HTTP_404_NOT_FOUND,
@@ -42,5 +48,58 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     return user
 
 
+async def get_current_admin(current_user: UserPrincipal = Depends(get_current_user)) -> UserPrincipal:
+    """
+    Current user, only if it is an active ADMIN.
+    Used to protect internal endpoints such as /metrics.
+    """
+    if current_user.role != UserRole.ADMIN or not current_user.is_active:
+        raise HTTPException(
+            status_code = status.HTTP_403_FORBIDDEN,
+            detail = "Admin privileges required",
+        )
+    return current_user
+
+
+async def get_read_db(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserPrincipal = Depends(get_current_user),
+):
+    """
+    Session for read-only endpoints: a replica chosen by replica_router,
+    or the primary session if there are no replicas or the user wrote recently.
+    """
+    replica = replica_router.choose(current_user.id)
+    if replica is None:
+        yield db
+    else:
+        async with replica.session() as replica_db:
+            yield replica_db
+
+
+async def get_write_db(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserPrincipal = Depends(get_current_user),
+) -> AsyncSession:
+    """
+    Primary session for endpoints that write. Pins the user's following
+    reads to the primary (read-your-writes).
+    """
+    replica_router.mark_write(current_user.id)
+    return db
+
+
+def get_read_session_factory(
+    current_user: UserPrincipal = Depends(get_current_user),
+) -> Callable[[], AsyncContextManager]:
+    """
+    Opener of a read-only session (replica or primary, same choice as
+    get_read_db) for streaming responses. Dependencies with yield are closed
+    before the response body is sent, so the stream opens its own session.
+    """
+    replica = replica_router.choose(current_user.id)
+    return (replica or primary).session
+
+
 # Export dependencies for easy import
-__all__ = ["get_db", "get_influx_db", "InfluxDBConnection", "get_current_user", "oauth2_scheme"]
+__all__ = ["get_db", "get_async_db", "get_read_db", "get_write_db", "get_read_session_factory", "get_influx_db", "InfluxDBConnection", "get_current_user", "get_current_admin", "oauth2_scheme", "UserPrincipal"]
@@ -1,66 +1,345 @@
+import enum
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
 from influxdb_client import InfluxDBClient, Point
 from influxdb_client.client.write_api import SYNCHRONOUS
 from app.core.config import settings
 from app.core.logging import get_logger
+from app.db.metrics_spool import MetricsSpool
 
 logger = get_logger("influxdb")
 
 
+class BackpressurePolicy(str, enum.Enum):
+    """
+    What the writer does with a new point when its queue is full.
+    """
+    DROP_OLDEST = "drop_oldest"  # Discard the oldest queued point
+    BLOCK = "block"  # Wait for space, up to INFLUXDB_BLOCK_TIMEOUT_SECONDS
+    SPILL = "spill"  # Append the point to the on-disk spool
+
+
+class InfluxDBWriter:
+    """
+    Background writer that batches points and sends them to InfluxDB
+    outside of the request thread.
+
+    Points are flushed when `batch_size` points are queued or every
+    `flush_interval` seconds, whichever comes first. Batches that fail, or
+    that are flushed while InfluxDB is marked unavailable, go to the spool
+    and are replayed later by InfluxDBConnection.
+    """
+    def __init__(
+        self,
+        write_batch: Callable[[List[Point]], None],
+        batch_size: int,
+        flush_interval: float,
+        max_queue_size: int,
+        policy: BackpressurePolicy,
+        block_timeout: float,
+        spool: MetricsSpool,
+    ):
+        self.write_batch = write_batch
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue_size = max_queue_size
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.spool = spool
+        # Cleared when a write fails, set again once the spool is replayed
+        self.available = threading.Event()
+        self.available.set()
+
+        self._queue = deque()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._closed = False
+        self._thread = None
+
+        self.queued = 0
+        self.written = 0
+        self.dropped = 0
+        self.spilled = 0
+        self.failed_batches = 0
+
+    def start(self):
+        """
+        Start the background flush thread.
+        """
+        self._thread = threading.Thread(target=self._run, name="influxdb-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, point: Point) -> bool:
+        """
+        Queue a point for writing. Never waits on InfluxDB itself; only the
+        BLOCK policy may wait for queue space.
+        Returns True if the point was accepted (queued or spilled).
+        """
+        overflow = None
+        with self._lock:
+            if self._closed:
+                self.dropped += 1
+                return False
+
+            if len(self._queue) >= self.max_queue_size:
+                if self.policy == BackpressurePolicy.BLOCK:
+                    has_space = self._not_full.wait_for(
+                        lambda: len(self._queue) < self.max_queue_size or self._closed,
+                        timeout=self.block_timeout
+                    )
+                    if not has_space or self._closed:
+                        self.dropped += 1
+                        return False
+                elif self.policy == BackpressurePolicy.SPILL:
+                    overflow = point
+                else:
+                    self._queue.popleft()
+                    self.dropped += 1
+
+            if overflow is None:
+                self._queue.append(point)
+                self.queued += 1
+                if len(self._queue) >= self.batch_size:
+                    self._not_empty.notify()
+
+        if overflow is not None:
+            return self._spill([overflow])
+        return True
+
+    def close(self, timeout: Optional[float] = None):
+        """
+        Stop accepting points, flush what is queued and wait for the thread.
+        """
+        with self._lock:
+            self._closed = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Writer counters.
+        """
+        with self._lock:
+            return {
+                "queued": self.queued,
+                "pending": len(self._queue),
+                "written": self.written,
+                "dropped": self.dropped,
+                "spilled": self.spilled,
+                "failed_batches": self.failed_batches,
+            }
+
+    def _run(self):
+        while True:
+            with self._lock:
+                self._not_empty.wait_for(
+                    lambda: len(self._queue) >= self.batch_size or self._closed,
+                    timeout=self.flush_interval
+                )
+                batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+                self._not_full.notify_all()
+                if not batch and self._closed:
+                    return
+
+            if batch:
+                self._flush(batch)
+
+    def _flush(self, batch: List[Point]):
+        if not self.available.is_set():
+            # Keep ordering behind what is already spooled
+            self._spill(batch)
+            return
+
+        try:
+            self.write_batch(batch)
+        except Exception as e:
+            logger.error(f"Failed to write batch of {len(batch)} points to InfluxDB, spooling: {e}")
+            self.available.clear()
+            with self._lock:
+                self.failed_batches += 1
+            self._spill(batch)
+            return
+
+        with self._lock:
+            self.written += len(batch)
+
+    def _spill(self, points: List[Point]) -> bool:
+        try:
+            self.spool.append([point.to_line_protocol() for point in points])
+        except OSError as e:
+            logger.error(f"Failed to spool {len(points)} points: {e}")
+            with self._lock:
+                self.dropped += len(points)
+            return False
+
+        with self._lock:
+            self.spilled += len(points)
+        return True
+
+
 class InfluxDBConnection:
     """
     InfluxDB connection manager.
+
+    Points always go through the background writer. While InfluxDB is
+    unreachable they are kept in the on-disk spool, and a replay thread
+    sends them back once the server answers to ping again.
     """
     def __init__(self):
         self.client = None
         self.write_api = None
         self.query_api = None
-        
+        self.writer = None
+        self.spool = None
+        self._replay_thread = None
+        self._stop_replay = threading.Event()
+
     def connect(self):
         """
-        Establish connection to InfluxDB.
+        Start the writer and the spool replay thread, then establish the
+        connection to InfluxDB. If the connection fails, points are spooled
+        until it recovers.
         """
+        self.spool = MetricsSpool(
+            directory=settings.INFLUXDB_SPOOL_DIR,
+            segment_max_bytes=settings.INFLUXDB_SPOOL_SEGMENT_BYTES,
+            max_segments=settings.INFLUXDB_SPOOL_MAX_SEGMENTS,
+        )
+        self.writer = InfluxDBWriter(
+            write_batch=self.write_records,
+            batch_size=settings.INFLUXDB_BATCH_SIZE,
+            flush_interval=settings.INFLUXDB_FLUSH_INTERVAL_SECONDS,
+            max_queue_size=settings.INFLUXDB_QUEUE_SIZE,
+            policy=BackpressurePolicy(settings.INFLUXDB_BACKPRESSURE),
+            block_timeout=settings.INFLUXDB_BLOCK_TIMEOUT_SECONDS,
+            spool=self.spool,
+        )
+        if not self.spool.is_empty():
+            # Points left over from a previous run are replayed first
+            self.writer.available.clear()
+        self.writer.start()
+
+        self._stop_replay.clear()
+        self._replay_thread = threading.Thread(target=self._replay_loop, name="influxdb-replay", daemon=True)
+        self._replay_thread.start()
+
         try:
-            self.client = InfluxDBClient(
-                url=settings.INFLUXDB_URL,
-                token=settings.INFLUXDB_TOKEN,
-                org=settings.INFLUXDB_ORG
-            )
-            self.write_api = self.client.write_api(write_options=SYNCHRONOUS)
-            self.query_api = self.client.query_api()
+            self._open_client()
             logger.info("Connected to InfluxDB successfully")
         except Exception as e:
             logger.error(f"Failed to connect to InfluxDB: {e}")
+            self.writer.available.clear()
             raise
-    
+
+    def _open_client(self):
+        self.client = InfluxDBClient(
+            url=settings.INFLUXDB_URL,
+            token=settings.INFLUXDB_TOKEN,
+            org=settings.INFLUXDB_ORG
+        )
+        # Only the background threads call the synchronous API
+        self.write_api = self.client.write_api(write_options=SYNCHRONOUS)
+        self.query_api = self.client.query_api()
+
     def close(self):
         """
-        Close InfluxDB connection.
+        Flush pending points and close InfluxDB connection.
         """
+        self._stop_replay.set()
+        if self.writer:
+            self.writer.close(timeout=settings.INFLUXDB_FLUSH_INTERVAL_SECONDS * 5)
+            self.writer = None
+        if self._replay_thread:
+            self._replay_thread.join(timeout=settings.INFLUXDB_FLUSH_INTERVAL_SECONDS * 5)
+            self._replay_thread = None
         if self.client:
             self.client.close()
+            self.client = None
             logger.info("InfluxDB connection closed")
-    
+
+    def write_records(self, records: list):
+        """
+        Synchronously write points or line protocol records.
+        Raises if InfluxDB is not reachable; only for background workers.
+        """
+        if self.write_api is None:
+            raise RuntimeError("InfluxDB client is not connected")
+        self.write_api.write(
+            bucket=settings.INFLUXDB_BUCKET,
+            org=settings.INFLUXDB_ORG,
+            record=records
+        )
+
+    def _replay_loop(self):
+        while not self._stop_replay.wait(settings.INFLUXDB_REPLAY_INTERVAL_SECONDS):
+            writer = self.writer
+            # The SPILL policy also spools overflow while InfluxDB is healthy
+            if writer is None or (writer.available.is_set() and self.spool.is_empty()):
+                continue
+            try:
+                self.replay_spool()
+            except Exception as e:
+                logger.error(f"Failed to replay metrics spool: {e}")
+
+    def replay_spool(self) -> int:
+        """
+        Replay the spool if InfluxDB answers to ping. Marks the writer as
+        available again once the spool is empty.
+        Returns the number of points replayed.
+        """
+        if self.client is None:
+            self._open_client()
+        if not self.client.ping():
+            return 0
+
+        replayed = self.spool.replay(
+            self.write_records,
+            batch_size=settings.INFLUXDB_BATCH_SIZE,
+            max_points_per_second=settings.INFLUXDB_REPLAY_MAX_POINTS_PER_SECOND,
+            stop_event=self._stop_replay,
+        )
+        if self.spool.is_empty() and self.writer is not None:
+            self.writer.available.set()
+        if replayed:
+            logger.info(f"Replayed {replayed} spooled points to InfluxDB")
+        return replayed
+
     def write_point(self, measurement: str, tags: dict, fields: dict):
         """
-        Write a data point to InfluxDB.
+        Queue a data point for the background writer.
+        The point is timestamped now, not when the batch is flushed.
         """
         try:
             point = Point(measurement)
-            
+
             for key, value in tags.items():
                 point = point.tag(key, value)
-            
+
             for key, value in fields.items():
                 point = point.field(key, value)
-            
-            self.write_api.write(
-                bucket=settings.INFLUXDB_BUCKET,
-                org=settings.INFLUXDB_ORG,
-                record=point
-            )
+
+            point = point.time(datetime.now(timezone.utc))
+
+            if self.writer is None:
+                raise RuntimeError("InfluxDB writer is not running")
+            self.writer.put(point)
         except Exception as e:
             logger.error(f"Failed to write to InfluxDB: {e}")
 
+    def stats(self) -> Dict[str, int]:
+        """
+        Background writer and spool counters (empty if not started).
+        """
+        stats = self.writer.stats() if self.writer else {}
+        if self.spool:
+            stats.update(self.spool.stats())
+        return stats
+
 
 # Global InfluxDB connection instance
 influx_db = InfluxDBConnection()
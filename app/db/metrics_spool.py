@@ -0,0 +1,166 @@
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from app.core.logging import get_logger
+
+logger = get_logger("metrics_spool")
+
+SEGMENT_SUFFIX = ".lp"
+OFFSET_SUFFIX = ".offset"
+
+
+class MetricsSpool:
+    """
+    Append-only on-disk spool of InfluxDB line protocol.
+
+    Points are appended to numbered segment files that rotate at
+    `segment_max_bytes`. Replay sends closed segments oldest first and
+    records its progress in a `.offset` file per segment, so an interrupted
+    replay resumes where it stopped. Every line carries its own timestamp,
+    so sending a line twice overwrites the same point in InfluxDB instead
+    of duplicating it.
+    """
+    def __init__(self, directory: str, segment_max_bytes: int, max_segments: int):
+        self.directory = Path(directory)
+        self.segment_max_bytes = segment_max_bytes
+        self.max_segments = max_segments
+        self._lock = threading.Lock()
+        self._replay_lock = threading.Lock()
+
+        self.appended = 0
+        self.replayed = 0
+        self.discarded_segments = 0
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        segments = self._segments()
+        self._active = self._sequence(segments[-1]) + 1 if segments else 0
+
+    def append(self, lines: List[str]) -> int:
+        """
+        Durably append line protocol records. Returns the number of lines stored.
+        """
+        if not lines:
+            return 0
+        data = "".join(line + "\n" for line in lines)
+        with self._lock:
+            path = self._segment_path(self._active)
+            if path.exists() and path.stat().st_size >= self.segment_max_bytes:
+                self._active += 1
+                path = self._segment_path(self._active)
+                self._enforce_max_segments()
+            with open(path, "a", encoding="utf-8") as segment:
+                segment.write(data)
+                segment.flush()
+                os.fsync(segment.fileno())
+            self.appended += len(lines)
+        return len(lines)
+
+    def is_empty(self) -> bool:
+        """
+        True if there is nothing left to replay.
+        """
+        return not self._segments()
+
+    def replay(
+        self,
+        write_lines: Callable[[List[str]], None],
+        batch_size: int,
+        max_points_per_second: float,
+        stop_event: Optional[threading.Event] = None,
+    ) -> int:
+        """
+        Send every spooled line through `write_lines`, at most
+        `max_points_per_second`, deleting segments once fully written.
+        Stops at the first write error; the next replay resumes from the
+        last recorded offset. Returns the number of lines sent.
+        """
+        sent = 0
+        with self._replay_lock:
+            with self._lock:
+                # Close the active segment so new appends don't race with replay
+                self._active += 1
+            for path in self._segments():
+                if self._sequence(path) >= self._active:
+                    break
+                done = self._read_offset(path)
+                try:
+                    with open(path, encoding="utf-8") as segment:
+                        lines = [line.rstrip("\n") for line in segment if line.strip()]
+                except FileNotFoundError:
+                    # Discarded by _enforce_max_segments meanwhile
+                    continue
+
+                while done < len(lines):
+                    if stop_event is not None and stop_event.is_set():
+                        return sent
+                    batch = lines[done:done + batch_size]
+                    started = time.monotonic()
+                    write_lines(batch)
+                    done += len(batch)
+                    sent += len(batch)
+                    self._write_offset(path, done)
+                    with self._lock:
+                        self.replayed += len(batch)
+
+                    # Rate limit so a recovering InfluxDB is not flooded
+                    min_duration = len(batch) / max_points_per_second
+                    elapsed = time.monotonic() - started
+                    if elapsed < min_duration:
+                        time.sleep(min_duration - elapsed)
+
+                self._remove(path)
+        return sent
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Spool counters and current size on disk.
+        """
+        segments = self._segments()
+        with self._lock:
+            return {
+                "spool_segments": len(segments),
+                "spool_bytes": sum(path.stat().st_size for path in segments if path.exists()),
+                "spool_appended": self.appended,
+                "spool_replayed": self.replayed,
+                "spool_discarded_segments": self.discarded_segments,
+            }
+
+    def _segments(self) -> List[Path]:
+        return sorted(self.directory.glob(f"*{SEGMENT_SUFFIX}"), key=self._sequence)
+
+    def _segment_path(self, sequence: int) -> Path:
+        return self.directory / f"{sequence:012d}{SEGMENT_SUFFIX}"
+
+    @staticmethod
+    def _sequence(path: Path) -> int:
+        return int(path.stem)
+
+    def _enforce_max_segments(self):
+        segments = self._segments()
+        while len(segments) >= self.max_segments:
+            oldest = segments.pop(0)
+            logger.warning(f"Metrics spool full, discarding segment {oldest.name}")
+            self._remove(oldest)
+            self.discarded_segments += 1
+
+    @staticmethod
+    def _offset_path(path: Path) -> Path:
+        return path.with_suffix(OFFSET_SUFFIX)
+
+    def _read_offset(self, path: Path) -> int:
+        try:
+            return int(self._offset_path(path).read_text())
+        except (OSError, ValueError):
+            return 0
+
+    def _write_offset(self, path: Path, done: int):
+        self._offset_path(path).write_text(str(done))
+
+    def _remove(self, path: Path):
+        for target in (path, self._offset_path(path)):
+            try:
+                target.unlink()
+            except FileNotFoundError:
+                pass
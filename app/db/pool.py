@@ -0,0 +1,116 @@
+import bisect
+import threading
+import time
+from typing import Dict, List, Optional, Type
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+# Upper bounds (milliseconds) of the pool wait histogram buckets
+WAIT_BUCKETS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000]
+
+
+class PoolWaitHistogram:
+    """
+    Histogram of the time spent waiting for a pooled connection.
+    Includes opening a new connection when the pool has to grow.
+    """
+    def __init__(self, buckets_ms: List[float] = WAIT_BUCKETS_MS):
+        self.buckets_ms = buckets_ms
+        self._counts = [0] * (len(buckets_ms) + 1)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+        self.timeouts = 0
+
+    def observe(self, seconds: float):
+        """
+        Record one checkout wait.
+        """
+        ms = seconds * 1000
+        with self._lock:
+            self._counts[bisect.bisect_left(self.buckets_ms, ms)] += 1
+            self.count += 1
+            self.sum_ms += ms
+            self.max_ms = max(self.max_ms, ms)
+
+    def observe_timeout(self):
+        """
+        Record a checkout that gave up after the pool timeout.
+        """
+        with self._lock:
+            self.timeouts += 1
+
+    def stats(self) -> Dict:
+        """
+        Cumulative bucket counts keyed by upper bound ("+Inf" for the rest).
+        """
+        with self._lock:
+            cumulative = 0
+            buckets = {}
+            for bound, count in zip(self.buckets_ms + ["+Inf"], self._counts):
+                cumulative += count
+                buckets[str(bound)] = cumulative
+            return {
+                "wait_ms_buckets": buckets,
+                "wait_count": self.count,
+                "wait_ms_sum": round(self.sum_ms, 3),
+                "wait_ms_max": round(self.max_ms, 3),
+                "wait_timeouts": self.timeouts,
+            }
+
+
+def instrumented(pool_class: Type[Pool]) -> Type[Pool]:
+    """
+    Subclass of `pool_class` that times every checkout into a
+    PoolWaitHistogram (available as `pool.wait_histogram`).
+    """
+    class InstrumentedPool(pool_class):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.wait_histogram = PoolWaitHistogram()
+
+        def recreate(self):
+            pool = super().recreate()
+            pool.wait_histogram = self.wait_histogram
+            return pool
+
+        def _do_get(self):
+            started = time.perf_counter()
+            try:
+                connection = super()._do_get()
+            except PoolTimeoutError:
+                self.wait_histogram.observe_timeout()
+                raise
+            self.wait_histogram.observe(time.perf_counter() - started)
+            return connection
+
+    InstrumentedPool.__name__ = f"Instrumented{pool_class.__name__}"
+    return InstrumentedPool
+
+
+InstrumentedQueuePool = instrumented(QueuePool)
+InstrumentedAsyncQueuePool = instrumented(AsyncAdaptedQueuePool)
+
+
+def pool_stats(engine: Optional[Engine]) -> Dict:
+    """
+    Gauges of the engine's pool plus its wait histogram, if instrumented.
+    """
+    if engine is None:
+        return {}
+    pool = engine.pool
+    stats = {"pool": pool.__class__.__name__}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            # QueuePool counts overflow from -pool_size until the pool is full
+            "overflow": max(pool.overflow(), 0),
+        })
+    histogram = getattr(pool, "wait_histogram", None)
+    if histogram is not None:
+        stats.update(histogram.stats())
+    return stats
@@ -0,0 +1,98 @@
+import enum
+import itertools
+import threading
+from typing import Dict, List, Optional
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db.pool import pool_stats
+from app.db.session import DatabaseNode
+
+
+class BalancingPolicy(str, enum.Enum):
+    """
+    How a read is assigned to a replica.
+    """
+    ROUND_ROBIN = "round_robin"
+    LEAST_CONNECTIONS = "least_connections"  # Fewest checked-out connections
+
+
+class ReplicaRouter:
+    """
+    Chooses the database that serves a read-only request.
+
+    Reads go to the replicas unless the same user made a write less than
+    `sticky_seconds` ago; those go to the primary so the user always sees
+    their own changes despite replication lag. Write timestamps are kept in
+    process, so stickiness holds as long as the client stays on one API
+    instance (or for deployments with a single one).
+    """
+    def __init__(self, replicas: List[DatabaseNode], policy: BalancingPolicy, sticky_seconds: float):
+        self.replicas = replicas
+        self.policy = policy
+        self.sticky_seconds = sticky_seconds
+        self._recent_writers = TTLCache(ttl=sticky_seconds, max_entries=100_000)
+        self._next = itertools.count()
+        self._lock = threading.Lock()
+
+        self.primary_reads = 0
+        self.sticky_reads = 0
+        self.replica_reads = [0] * len(replicas)
+
+    def mark_write(self, user_id: int):
+        """
+        Pin the user's reads to the primary for the next `sticky_seconds`.
+        """
+        if self.replicas and self.sticky_seconds > 0:
+            self._recent_writers.set(str(user_id), True)
+
+    def choose(self, user_id: Optional[int] = None) -> Optional[DatabaseNode]:
+        """
+        Replica for a read, or None if it must go to the primary.
+        """
+        if not self.replicas:
+            with self._lock:
+                self.primary_reads += 1
+            return None
+
+        if user_id is not None and self.sticky_seconds > 0 and self._recent_writers.get(str(user_id)) is not None:
+            with self._lock:
+                self.sticky_reads += 1
+            return None
+
+        with self._lock:
+            start = next(self._next)
+            order = [(start + i) % len(self.replicas) for i in range(len(self.replicas))]
+            if self.policy == BalancingPolicy.LEAST_CONNECTIONS:
+                # Ties keep the round-robin order
+                index = min(order, key=lambda i: self._checked_out(self.replicas[i]))
+            else:
+                index = order[0]
+            self.replica_reads[index] += 1
+        return self.replicas[index]
+
+    @staticmethod
+    def _checked_out(node: DatabaseNode) -> int:
+        return pool_stats(node.request_engine).get("checked_out", 0)
+
+    def stats(self) -> Dict:
+        """
+        Read routing counters and pool state of each replica.
+        """
+        with self._lock:
+            return {
+                "policy": self.policy.value,
+                "primary_reads": self.primary_reads,
+                "sticky_reads": self.sticky_reads,
+                "replicas": [
+                    {"reads": reads, **pool_stats(node.request_engine)}
+                    for node, reads in zip(self.replicas, self.replica_reads)
+                ],
+            }
+
+
+# Global router over the configured replicas
+replica_router = ReplicaRouter(
+    replicas=[DatabaseNode(url) for url in settings.DATABASE_REPLICA_URLS],
+    policy=BalancingPolicy(settings.DB_REPLICA_BALANCING),
+    sticky_seconds=settings.DB_READ_YOUR_WRITES_SECONDS,
+)
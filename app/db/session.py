@@ -1,17 +1,153 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, List, Optional, TypeVar
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Result, Row, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
 from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool
+
+logger = get_logger("db")
+
+T = TypeVar("T")
+
+
+def pool_options(url: str, asynchronous: bool = False) -> Dict:
+    """
+    Connection pool arguments for create_engine / create_async_engine.
+
+    With DB_POOL_PRE_PING=False connections are not pinged on checkout;
+    they are replaced after DB_POOL_RECYCLE_SECONDS and invalidated when a
+    query fails with a disconnect error. SQLite keeps SQLAlchemy's defaults.
+    """
+    options = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    if make_url(url).get_backend_name() == "sqlite":
+        return options
+    options.update({
+        "poolclass": InstrumentedAsyncQueuePool if asynchronous else InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+    })
+    return options
+
+
+def async_database_url(url: str) -> Optional[str]:
+    """
+    asyncpg URL for a PostgreSQL DATABASE_URL, None for other databases.
+    """
+    scheme, _, rest = url.partition("://")
+    if scheme.split("+")[0] in ("postgresql", "postgres"):
+        return f"postgresql+asyncpg://{rest}"
+    return None
+
+
+def _create_async_engine(url: str):
+    async_url = async_database_url(url)
+    if async_url is None:
+        return None
+    try:
+        return create_async_engine(async_url, echo=settings.DEBUG, **pool_options(async_url, asynchronous=True))
+    except ImportError as e:
+        logger.warning(f"asyncpg not available, using the sync engine for requests: {e}")
+        return None
+
+
+class SyncSessionRunner:
+    """
+    Runs functions on a sync Session with the same `run_sync` interface as
+    AsyncSession. Used when there is no async driver (SQLite in tests and
+    development); the function runs in the threadpool.
+    """
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    async def run_sync(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
+
+    async def stream(self, statement, **kwargs) -> "ThreadpoolResult":
+        """
+        Execute with stream_results, like AsyncSession.stream.
+        """
+        result = await run_in_threadpool(
+            self.sync_session.execute, statement.execution_options(stream_results=True), **kwargs
+        )
+        return ThreadpoolResult(result)
+
+
+class ThreadpoolResult:
+    """
+    Async iteration over a streamed sync Result; each fetch runs in the
+    threadpool. Mirrors the `partitions` method of AsyncResult.
+    """
+    def __init__(self, result: Result):
+        self.result = result
+
+    async def partitions(self, size: Optional[int] = None) -> AsyncIterator[List[Row]]:
+        partitions = self.result.partitions(size)
+        while (rows := await run_in_threadpool(next, partitions, None)) is not None:
+            yield rows
+
+
+class DatabaseNode:
+    """
+    Engines and session factories of one database server (the primary or
+    a read replica): a sync engine for scripts and workers, and an async
+    one (asyncpg) for the request path when available.
+    """
+    def __init__(self, url: str):
+        self.url = url
+        self.engine = create_engine(
+            url,
+            echo=settings.DEBUG,  # Log SQL queries in debug mode
+            **pool_options(url)
+        )
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self.async_engine = _create_async_engine(url)
+        self.AsyncSessionLocal = (
+            async_sessionmaker(self.async_engine, autoflush=False, expire_on_commit=False)
+            if self.async_engine is not None else None
+        )
+
+    @property
+    def request_engine(self):
+        """
+        Sync view of the engine that serves requests.
+        """
+        return self.async_engine.sync_engine if self.async_engine is not None else self.engine
+
+    @asynccontextmanager
+    async def session(self):
+        """
+        AsyncSession for this node, or a SyncSessionRunner without an async driver.
+        """
+        if self.AsyncSessionLocal is None:
+            db = self.SessionLocal()
+            try:
+                yield SyncSessionRunner(db)
+            finally:
+                await run_in_threadpool(db.close)
+        else:
+            async with self.AsyncSessionLocal() as db:
+                yield db
+
+
+# Primary database: every write goes here
+primary = DatabaseNode(settings.DATABASE_URL)
 
 # Create database engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,  # Verify connections before using
-    echo=settings.DEBUG  # Log SQL queries in debug mode
-)
+engine = primary.engine
 
 # Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = primary.SessionLocal
+
+# Async engine used by the request path (None on SQLite)
+async_engine = primary.async_engine
+AsyncSessionLocal = primary.AsyncSessionLocal
 
 # Base class for models
 Base = declarative_base()
@@ -27,3 +163,16 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """
+    Dependency to get an AsyncSession (asyncpg) on the primary for async
+    endpoints.
+
+    Endpoints run their queries with `await db.run_sync(fn, ...)`, which
+    calls `fn(session, ...)` without blocking the event loop. Without an
+    async driver it yields a SyncSessionRunner instead.
+    """
+    async with primary.session() as db:
+        yield db
@@ -1,8 +1,20 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.core.config import settings
+from app.core.security import password_hasher, PasswordHasherBusy, token_cache
 from app.core.logging import get_logger
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.db.deps import get_current_admin
 from app.db.influxdb import influx_db
+from app.db.pool import pool_stats
+from app.db.replicas import replica_router
+from app.services.duplicate_service import duplicate_detector
+from app.db.session import primary
+from app.services.outbox_relay import outbox_relay
+from app.services.analytics_cache import analytics_cache
+from app.services.principal_cache import principal_cache
+from app.services.ticket_access import ticket_access_cache
 
 logger = get_logger("main")
 
@@ -21,6 +33,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "Age"],
 )
 
 
@@ -38,14 +51,36 @@ async def startup_event():
     except Exception as e:
         logger.error(f"Failed to connect to InfluxDB: {e}")
 
+    # Drain the metric outbox to InfluxDB in the background
+    if settings.OUTBOX_RELAY_ENABLED:
+        outbox_relay.start()
+
+    # Start the password hashing workers before the first login
+    password_hasher.start()
+
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """
     Execute on application shutdown.
+    Flushes the points still queued in the InfluxDB writer.
     """
     logger.info("Shutting down Ticket System API...")
+    outbox_relay.stop()
     influx_db.close()
+    password_hasher.shutdown()
+
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    """
+    Too many logins/registrations at once: ask the client to retry.
+    """
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Too many authentication requests, try again shortly"},
+        headers={"Retry-After": "1"},
+    )
 
 
 @app.get("/")
@@ -68,13 +103,39 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics", dependencies=[Depends(get_current_admin)])
+async def metrics():
+    """
+    Internal counters of the API (InfluxDB writer, metric outbox relay,
+    analytics, principal, ticket access and token caches, password hashing
+    pool, database connection pools, read replica routing and duplicate
+    detection). Admins only: they describe the deployment's internals.
+    """
+    return {
+        "influxdb": influx_db.stats(),
+        "outbox_relay": outbox_relay.stats(),
+        "analytics_cache": analytics_cache.stats(),
+        "principal_cache": principal_cache.stats(),
+        "ticket_access_cache": ticket_access_cache.stats(),
+        "password_hasher": password_hasher.stats(),
+        "token_cache": token_cache.stats(),
+        "db_pool": {
+            "sync": pool_stats(primary.engine),
+            "async": pool_stats(primary.async_engine.sync_engine if primary.async_engine is not None else None),
+        },
+        "db_replicas": replica_router.stats(),
+        "duplicate_detector": duplicate_detector.stats(),
+    }
+
+
 # Include API routers
 from app.api.v1 import routes_auth
 
 app.include_router(routes_auth.router, prefix="/api/v1/auth", tags=["Authentication"])
 
 # TODO: Uncomment when implemented
-from app.api.v1 import routes_tickets, routes_comments, routes_analytics
+from app.api.v1 import routes_tickets, routes_comments, routes_analytics, routes_export
 app.include_router(routes_tickets.router, prefix="/api/v1", tags=["Tickets"])
 app.include_router(routes_comments.router, prefix="/api/v1", tags=["Comments"])
-app.include_router(routes_analytics.router, prefix="/api/v1", tags=["Analytics"])
\ No newline at end of file
+app.include_router(routes_analytics.router, prefix="/api/v1", tags=["Analytics"])
+app.include_router(routes_export.router, prefix="/api/v1", tags=["Export"])
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, Text, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, Text, DateTime, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship 
 from app.db.session import Base
@@ -12,6 +12,10 @@ class Comment(Base):
     - author: Usuario que escribió el comentario
     """
     __tablename__ = "comments"
+    __table_args__ = (
+        # Comentarios de un ticket en orden (listado y documento de búsqueda)
+        Index("ix_comments_ticket_id_created_at_id", "ticket_id", "created_at", "id"),
+    )
 
     # Campos principales
     id = Column(Integer, primary_key=True, index=True)
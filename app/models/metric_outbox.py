@@ -0,0 +1,24 @@
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, String, DateTime, JSON
+from app.db.session import Base
+
+class MetricOutbox(Base):
+    """
+    Outbox de eventos de métricas pendientes de enviar a InfluxDB.
+
+    Se escribe en la misma transacción que el cambio del ticket; el
+    OutboxRelay lo vacía en lotes hacia InfluxDB.
+    """
+    __tablename__ = "metric_outbox"
+
+    id = Column(Integer, primary_key=True)
+    measurement = Column(String(100), nullable=False)
+    tags = Column(JSON, nullable=False)
+    fields = Column(JSON, nullable=False)
+
+    # Momento del evento: se usa como timestamp del punto en InfluxDB,
+    # así reenviar un evento sobrescribe el mismo punto en vez de duplicarlo
+    created_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self):
+        return f"<MetricOutbox #{self.id}: {self.measurement}>"
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, ForeignKey, Index, text
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from app.db.session import Base
 import enum
 
@@ -32,6 +33,35 @@ class Ticket(Base):
     - assigned_agent: Agente asignado al ticket (FK a users, opcional)
     """
     __tablename__ = "tickets"
+    __table_args__ = (
+        # Índices para la paginación por cursor (created_at, id) de GET /tickets
+        Index("ix_tickets_created_at_id", "created_at", "id"),
+        Index("ix_tickets_creator_id_created_at_id", "creator_id", "created_at", "id"),
+        Index("ix_tickets_assigned_agent_id_created_at_id", "assigned_agent_id", "created_at", "id"),
+        Index("ix_tickets_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_tickets_priority_created_at_id", "priority", "created_at", "id"),
+        # Búsqueda full-text (GET /tickets/search)
+        Index("ix_tickets_search_vector", "search_vector", postgresql_using = "gin"),
+        # Índices parciales de las consultas calientes (los enums se guardan por nombre)
+        # Cola sin asignar: la rama "sin asignar" del listado de un AGENT
+        Index(
+            "ix_tickets_unassigned_created_at_id", "created_at", "id",
+            postgresql_where = text("assigned_agent_id IS NULL"),
+            sqlite_where = text("assigned_agent_id IS NULL")
+        ),
+        # Trabajo pendiente por agente (sin los resueltos y cerrados, que son la mayoría)
+        Index(
+            "ix_tickets_open_by_agent", "assigned_agent_id", "created_at", "id",
+            postgresql_where = text("status IN ('OPEN', 'IN_PROGRESS', 'PENDING')"),
+            sqlite_where = text("status IN ('OPEN', 'IN_PROGRESS', 'PENDING')")
+        ),
+        # Originales abiertos que indexa la detección de duplicados
+        Index(
+            "ix_tickets_open_roots_id", "id",
+            postgresql_where = text("status = 'OPEN' AND duplicate_of_id IS NULL"),
+            sqlite_where = text("status = 'OPEN' AND duplicate_of_id IS NULL")
+        ),
+    )
 
     # Campos principales
     id = Column(Integer, primary_key = True, index = True)
@@ -45,12 +75,18 @@ class Ticket(Base):
     # Relaciones (Foreign Keys)
     creator_id = Column(Integer, ForeignKey("users.id"), nullable = False)
     assigned_agent_id = Column(Integer, ForeignKey("users.id"), nullable = True)
+    # Ticket original del que este es un duplicado probable (detección al crear)
+    duplicate_of_id = Column(Integer, ForeignKey("tickets.id", ondelete = "SET NULL"), nullable = True, index = True)
 
     # Timestamps
     created_at = Column(DateTime(timezone = True), server_default = func.now())
     updated_at = Column(DateTime(timezone = True), onupdate=func.now())
     resolved_at = Column(DateTime(timezone = True), nullable = True)
 
+    # Documento de búsqueda (título, descripción y comentarios). En PostgreSQL
+    # lo mantienen triggers; diferido para no leerlo al cargar tickets
+    search_vector = deferred(Column(TSVECTOR().with_variant(Text(), "sqlite"), nullable = True))
+
     # Relaciones ORM (para acceder a los objetos User relacionados)
     # Esto te permite hacer: ticket.creator o ticket.assigned_agent.full_name
     creator = relationship("User", foreign_keys=[creator_id], backref = "created_tickets")
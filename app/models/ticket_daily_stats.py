@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Integer, Float, Date, Enum, UniqueConstraint
+from app.db.session import Base
+from app.models.ticket import TicketStatus, TicketPriority
+
+# agent_id usado para los tickets sin agente asignado
+UNASSIGNED_AGENT_ID = 0
+
+class TicketDailyStats(Base):
+    """
+    Rollup diario de tickets para analytics.
+
+    Cada ticket cuenta en exactamente una fila: la de su día de creación
+    (UTC) con su estado, prioridad y agente actuales. Los handlers de
+    tickets la mantienen de forma incremental y
+    app/scripts/backfill_ticket_stats.py la reconstruye desde cero.
+    """
+    __tablename__ = "ticket_daily_stats"
+    __table_args__ = (
+        UniqueConstraint("day", "status", "priority", "agent_id", name="uq_ticket_daily_stats_key"),
+    )
+
+    id = Column(Integer, primary_key=True)
+
+    # Clave del rollup
+    day = Column(Date, nullable=False, index=True)
+    status = Column(Enum(TicketStatus), nullable=False)
+    priority = Column(Enum(TicketPriority), nullable=False)
+    agent_id = Column(Integer, nullable=False, default=UNASSIGNED_AGENT_ID)
+
+    # Agregados
+    ticket_count = Column(Integer, nullable=False, default=0)
+    resolution_count = Column(Integer, nullable=False, default=0)
+    resolution_seconds_sum = Column(Float, nullable=False, default=0.0)
+
+    def __repr__(self):
+        return f"<TicketDailyStats {self.day} {self.status} {self.priority} agent={self.agent_id}>"
@@ -0,0 +1,55 @@
+from bisect import bisect_right
+from typing import List, Tuple
+from sqlalchemy import Column, Integer, UniqueConstraint
+from app.db.session import Base
+
+# Cubetas logarítmicas del tiempo de resolución: la cubeta 0 es [0, 60 s) y
+# cada una de las siguientes mide 2^(1/8) veces la anterior (~9% de ancho),
+# hasta ~2 años; la última no tiene límite superior.
+RESOLUTION_BUCKET_MIN_SECONDS = 60.0
+RESOLUTION_BUCKETS_PER_DOUBLING = 8
+RESOLUTION_BUCKET_BOUNDS: List[float] = [
+    RESOLUTION_BUCKET_MIN_SECONDS * 2 ** (i / RESOLUTION_BUCKETS_PER_DOUBLING)
+    for i in range(161)
+]
+
+
+def resolution_bucket(seconds: float) -> int:
+    """
+    Cubeta de un tiempo de resolución (la primera cota mayor que `seconds`).
+    """
+    return bisect_right(RESOLUTION_BUCKET_BOUNDS, seconds)
+
+
+def resolution_bucket_range(bucket: int) -> Tuple[float, float]:
+    """
+    Límites [inferior, superior) en segundos de una cubeta.
+    """
+    lower = RESOLUTION_BUCKET_BOUNDS[bucket - 1] if bucket > 0 else 0.0
+    if bucket < len(RESOLUTION_BUCKET_BOUNDS):
+        return lower, RESOLUTION_BUCKET_BOUNDS[bucket]
+    return lower, lower * 2 ** (1 / RESOLUTION_BUCKETS_PER_DOUBLING)
+
+
+class TicketResolutionHistogram(Base):
+    """
+    Histograma de tiempos de resolución por agente para los percentiles.
+
+    Cada ticket RESOLVED cuenta en la cubeta de su tiempo de resolución,
+    con el mismo agent_id que en ticket_daily_stats. Se mantiene junto con
+    el rollup diario, así que leerlo cuesta lo mismo con mil tickets que
+    con millones.
+    """
+    __tablename__ = "ticket_resolution_histogram"
+    __table_args__ = (
+        UniqueConstraint("agent_id", "bucket", name="uq_ticket_resolution_histogram_key"),
+    )
+
+    id = Column(Integer, primary_key=True)
+
+    agent_id = Column(Integer, nullable=False)
+    bucket = Column(Integer, nullable=False)
+    ticket_count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<TicketResolutionHistogram agent={self.agent_id} bucket={self.bucket} count={self.ticket_count}>"
@@ -30,6 +30,9 @@ class AgentStats(BaseModel):
     assigned_tickets: int
     resolved_tickets: int
     avg_resolution_time_hours: Optional[float] = None
+    p50_resolution_time_hours: Optional[float] = None
+    p90_resolution_time_hours: Optional[float] = None
+    p99_resolution_time_hours: Optional[float] = None
 
 class TimeSeriesData(BaseModel):
     """
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime
+from app.schemas.user import UserSummary
 
 class CommentBase(BaseModel):
     """
@@ -43,4 +44,13 @@ class CommentWithAuthor(CommentResponse):
     author_full_name: Optional[str] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class CommentDetail(CommentResponse):
+    """
+    Comentario dentro del detalle expandido de un ticket, con su autor.
+    """
+    author: UserSummary
+
+    class Config:
+        from_attributes = True
@@ -1,7 +1,9 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from app.models.ticket import TicketStatus, TicketPriority
+from app.schemas.comment import CommentDetail
+from app.schemas.user import UserSummary
 
 class TicketBase(BaseModel):
     """
@@ -35,6 +37,21 @@ class TicketAssign(BaseModel):
     """
     assigned_agent_id: int
 
+class TicketBulkChange(BaseModel):
+    """
+    Cambio de estado y/o asignación de un ticket dentro de un lote.
+    """
+    ticket_id: int
+    status: Optional[TicketStatus] = None
+    assigned_agent_id: Optional[int] = None
+
+class TicketBulkUpdate(BaseModel):
+    """
+    Schema para cambiar estado o asignación de varios tickets a la vez.
+    Cada ticket puede aparecer una sola vez.
+    """
+    changes: List[TicketBulkChange] = Field(..., min_length = 1, max_length = 1000)
+
 class TicketResponse(TicketBase):
     """
     Schema para respuestas de la API.
@@ -44,6 +61,7 @@ class TicketResponse(TicketBase):
     status: TicketStatus
     creator_id: int
     assigned_agent_id: Optional[int] = None
+    duplicate_of_id: Optional[int] = None # Original probable (detección de duplicados)
     created_at: datetime
     updated_at: Optional[datetime] = None
     resolved_at: Optional[datetime] = None
@@ -51,6 +69,15 @@ class TicketResponse(TicketBase):
     class Config:
         from_attributes = True # Para leer desde modelos SQLAlchemy
 
+class TicketDetailResponse(TicketResponse):
+    """
+    Detalle de un ticket con las relaciones pedidas en `include`.
+    Las que no se piden quedan en null.
+    """
+    creator: Optional[UserSummary] = None
+    assigned_agent: Optional[UserSummary] = None
+    comments: Optional[List[CommentDetail]] = None
+
 class TicketListResponse(BaseModel):
     """
     Schema para listar múltiples tickets con información resumida
@@ -64,4 +91,30 @@ class TicketListResponse(BaseModel):
     created_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class TicketSearchResult(TicketListResponse):
+    """
+    Resultado de la búsqueda full-text: el ticket resumido, su relevancia y
+    un fragmento de título y descripción con los términos entre <mark>.
+    El texto va escapado como HTML: <mark> es la única etiqueta.
+    """
+    rank: float
+    highlight: str
+
+class TicketImportError(BaseModel):
+    """
+    Fila rechazada por la importación masiva.
+    line = 0 si el archivo no se pudo seguir leyendo.
+    """
+    line: int
+    error: str
+
+class TicketImportResponse(BaseModel):
+    """
+    Resultado de la importación masiva de tickets
+    """
+    imported: int
+    failed: int
+    errors: List[TicketImportError]
+    errors_truncated: bool = False # Hubo más errores de los listados
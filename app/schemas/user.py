@@ -51,4 +51,17 @@ class UserResponse(UserBase):
     created_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class UserSummary(BaseModel):
+    """
+    Schema for users embedded in other responses (ticket creator, agent,
+    comment author)
+    """
+    id: int
+    email: EmailStr
+    full_name: str
+    role: UserRole
+
+    class Config:
+        from_attributes = True
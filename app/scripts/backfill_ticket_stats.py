@@ -0,0 +1,35 @@
+"""
+Backfill script for the ticket_daily_stats analytics rollup.
+
+Rebuilds the whole rollup from the tickets table. The migration that creates
+the table already fills it; run this whenever tickets were changed without
+going through the API (manual SQL, restores):
+    docker-compose exec api python -m app.scripts.backfill_ticket_stats
+"""
+
+from app.db.session import SessionLocal
+from app.services.ticket_stats_service import ticket_stats_service
+from app.core.logging import get_logger
+
+logger = get_logger("backfill_ticket_stats")
+
+
+def backfill_ticket_stats():
+    """
+    Main function to rebuild the rollup.
+    """
+    logger.info("Rebuilding ticket_daily_stats rollup...")
+    db = SessionLocal()
+
+    try:
+        rows = ticket_stats_service.backfill(db)
+        logger.info(f"✅ Rollup rebuilt: {rows} rows")
+    except Exception as e:
+        logger.error(f"❌ Error rebuilding rollup: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    backfill_ticket_stats()
@@ -0,0 +1,82 @@
+"""
+Benchmark of the per-request auth dependency (get_current_user).
+
+Measures the time spent authenticating one request with the same bearer
+token, with the verified-token cache of decode_access_token disabled
+(signature verified every time) and enabled. The user principal is cached
+in both cases, so the difference is the JWT decode alone.
+
+Run:
+    docker-compose exec api python -m app.scripts.benchmark_auth --requests 20000
+
+Uses an in-memory SQLite database, so it never touches the real data.
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.core.config import settings
+from app.core.security import create_access_token, token_cache
+from app.db.deps import get_current_user
+from app.db.session import Base, SyncSessionRunner
+from app.models.user import User, UserRole
+from app.models.ticket import Ticket  # noqa: F401 (registra la tabla tickets)
+from app.models.comment import Comment  # noqa: F401 (registra la tabla comments)
+from app.services.principal_cache import principal_cache
+
+
+async def authenticate(token: str, db: SyncSessionRunner, requests: int) -> float:
+    """
+    Average microseconds per get_current_user call.
+    """
+    started = time.perf_counter()
+    for _ in range(requests):
+        await get_current_user(token, db)
+    return (time.perf_counter() - started) / requests * 1_000_000
+
+
+def measure(token: str, db: SyncSessionRunner, requests: int, repeat: int, cache_entries: int) -> float:
+    """
+    Best microseconds per request over `repeat` runs with the given cache size.
+    """
+    settings.JWT_CACHE_MAX_ENTRIES = cache_entries
+    token_cache.clear()
+    return min(asyncio.run(authenticate(token, db, requests)) for _ in range(repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del costo de autenticación por request")
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    # The principal lookup may run in the threadpool: share the connection
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    user = User(email="bench@example.com", full_name="Bench", password_hash="x", role=UserRole.AGENT)
+    session.add(user)
+    session.commit()
+
+    token = create_access_token({"sub": str(user.id)}, expires_delta=timedelta(hours=1))
+    db = SyncSessionRunner(session)
+    principal_cache.clear()
+    principal_cache.get(session, user.id)
+
+    cache_entries = settings.JWT_CACHE_MAX_ENTRIES or 10_000
+    uncached = measure(token, db, args.requests, args.repeat, 0)
+    cached = measure(token, db, args.requests, args.repeat, cache_entries)
+    session.close()
+
+    print(f"requests: {args.requests}")
+    print(f"without token cache: {uncached:,.1f} µs/request")
+    print(f"with token cache:    {cached:,.1f} µs/request")
+    print(f"speedup:             {uncached / cached:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
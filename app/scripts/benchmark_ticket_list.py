@@ -0,0 +1,114 @@
+"""
+Benchmark of the GET /tickets serialization path.
+
+Compares the previous read path (full Ticket entities validated with
+from_attributes) against the projected one used by list_tickets (only the
+TicketListResponse columns, fetched as row tuples).
+
+Run:
+    docker-compose exec api python -m app.scripts.benchmark_ticket_list --rows 100000
+
+Uses an in-memory SQLite database, so it never touches the real data.
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta
+from typing import List
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.db.session import Base
+from app.models.user import User, UserRole
+from app.models.ticket import Ticket, TicketStatus, TicketPriority
+from app.models.comment import Comment  # noqa: F401 (registra la tabla comments)
+from app.schemas.ticket import TicketListResponse
+from app.api.v1.routes_tickets import TICKET_LIST_COLUMNS, TICKET_LIST_FIELDS
+
+list_adapter = TypeAdapter(List[TicketListResponse])
+
+
+def populate(session, rows: int):
+    """
+    Insert `rows` tickets with a realistic description size.
+    """
+    user = User(email="bench@example.com", full_name="Bench", password_hash="x", role=UserRole.USER)
+    session.add(user)
+    session.flush()
+
+    statuses = list(TicketStatus)
+    priorities = list(TicketPriority)
+    start = datetime(2025, 1, 1)
+    description = "Descripción de prueba para el benchmark. " * 25
+    session.bulk_insert_mappings(Ticket, [
+        {
+            "title": f"Ticket {i}",
+            "description": description,
+            "status": statuses[i % len(statuses)],
+            "priority": priorities[i % len(priorities)],
+            "creator_id": user.id,
+            "created_at": start + timedelta(seconds=i),
+        }
+        for i in range(rows)
+    ])
+    session.commit()
+
+
+def orm_path(session):
+    """
+    Previous path: hydrate Ticket entities, validate with from_attributes.
+    """
+    tickets = session.query(Ticket).all()
+    return list_adapter.dump_json(list_adapter.validate_python(tickets, from_attributes=True))
+
+
+def projected_path(session):
+    """
+    Current path: select the 7 list columns as tuples, validate plain dicts.
+    """
+    rows = session.query(*TICKET_LIST_COLUMNS).all()
+    return list_adapter.dump_json(list_adapter.validate_python([dict(zip(TICKET_LIST_FIELDS, row)) for row in rows]))
+
+
+def measure(session_factory, path, rows: int, repeat: int) -> float:
+    """
+    Best rows/sec over `repeat` runs, each one with a fresh session.
+    """
+    best = 0.0
+    for _ in range(repeat):
+        session = session_factory()
+        try:
+            started = time.perf_counter()
+            path(session)
+            elapsed = time.perf_counter() - started
+        finally:
+            session.close()
+        best = max(best, rows / elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de serialización de GET /tickets")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+
+    session = session_factory()
+    populate(session, args.rows)
+    session.close()
+
+    orm = measure(session_factory, orm_path, args.rows, args.repeat)
+    projected = measure(session_factory, projected_path, args.rows, args.repeat)
+
+    print(f"rows: {args.rows}")
+    print(f"ORM + from_attributes: {orm:,.0f} rows/sec")
+    print(f"projected columns:     {projected:,.0f} rows/sec")
+    print(f"speedup:               {projected / orm:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Bulk ticket import from an NDJSON or CSV file.
+
+Same loader as POST /api/v1/tickets/import: the file is streamed in chunks
+of TICKET_IMPORT_CHUNK_SIZE rows, each loaded with COPY (PostgreSQL) in its
+own transaction. Invalid rows are reported with their line number and
+skipped. Tickets are created as OPEN by the given user:
+    docker-compose exec api python -m app.scripts.import_tickets tickets.ndjson --creator-email admin@ticketsystem.com
+
+CSV files need a header row with title, description and (optionally) priority.
+"""
+
+import argparse
+import sys
+import time
+from app.db.session import SessionLocal
+from app.models.user import User
+from app.services.ticket_import_service import FileFormat, ticket_import_service
+from app.core.logging import get_logger
+
+logger = get_logger("import_tickets")
+
+
+def import_tickets(path: str, creator_email: str, fmt: FileFormat) -> bool:
+    """
+    Main function to import the file. Returns False if nothing was imported
+    because of a setup error.
+    """
+    db = SessionLocal()
+
+    try:
+        creator = db.query(User).filter(User.email == creator_email).first()
+        if creator is None:
+            logger.error(f"❌ User not found: {creator_email}")
+            return False
+
+        started = time.perf_counter()
+        with open(path, "rb") as file:
+            result = ticket_import_service.import_file(db, file, fmt, creator.id)
+        elapsed = time.perf_counter() - started
+
+        rate = result.imported / elapsed if elapsed > 0 else 0
+        logger.info(f"✅ Imported {result.imported} tickets in {elapsed:.2f}s ({rate:,.0f} tickets/s)")
+        if result.failed:
+            logger.warning(f"⚠️ {result.failed} rows rejected")
+            for error in result.errors:
+                logger.warning(f"  line {error.line}: {error.error}")
+            if len(result.errors) < result.failed:
+                logger.warning(f"  ... {result.failed - len(result.errors)} more")
+        return True
+    except Exception as e:
+        logger.error(f"❌ Error importing tickets: {e}")
+        db.rollback()
+        return False
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importación masiva de tickets (NDJSON / CSV)")
+    parser.add_argument("path")
+    parser.add_argument("--creator-email", required=True)
+    parser.add_argument("--format", choices=[f.value for f in FileFormat], default=None)
+    args = parser.parse_args()
+
+    fmt = FileFormat(args.format) if args.format else FileFormat.from_filename(args.path)
+    if fmt is None:
+        parser.error("cannot infer the format from the file name, use --format")
+
+    if not import_tickets(args.path, args.creator_email, fmt):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,12 +8,37 @@ Note: Set environment variables for passwords or use defaults (DEV ONLY):
     SEED_ADMIN_PASSWORD=your_secure_password
     SEED_AGENT_PASSWORD=your_secure_password
     SEED_USER_PASSWORD=your_secure_password
+
+Synthetic data for performance work (on top of the default users):
+    docker-compose exec api python -m app.scripts.seed_data \
+        --users 100000 --agents 500 --tickets 10000000 --comments 30000000 --days 730
+
+Rows are generated in batches of --batch-size and loaded with COPY on
+PostgreSQL (executemany elsewhere), one transaction per batch. Generated
+users share the SEED_AGENT_PASSWORD / SEED_USER_PASSWORD hash, computed once.
+Rows get explicit ids after the current maximum (sequences are moved past
+them at the end), so do not run it against a database taking live writes.
+With --influx the matching ticket_created, ticket_assigned and
+ticket_resolved points are written to InfluxDB with their historical
+timestamps. The analytics rollup is rebuilt at the end.
 """
 
+import argparse
+import math
 import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+from sqlalchemy import func, text
 from sqlalchemy.orm import Session
+from app.db.bulk import bulk_insert
+from app.db.influxdb import influx_db
 from app.db.session import SessionLocal
 from app.models.user import User, UserRole
+from app.models.ticket import Ticket, TicketStatus, TicketPriority
+from app.models.comment import Comment
+from app.services.ticket_stats_service import ticket_stats_service
 from app.core.security import get_password_hash
 from app.core.logging import get_logger
 
@@ -122,5 +147,358 @@ def seed_database():
         db.close()
 
 
+# ============================================
+# SYNTHETIC DATA
+# ============================================
+USER_COLUMNS = ["id", "email", "full_name", "password_hash", "role", "is_active", "created_at"]
+TICKET_COLUMNS = [
+    "id", "title", "description", "status", "priority", "creator_id",
+    "assigned_agent_id", "created_at", "updated_at", "resolved_at",
+]
+COMMENT_COLUMNS = ["id", "content", "ticket_id", "author_id", "created_at"]
+
+# Most tickets in a mature help desk are already closed
+STATUS_WEIGHTS = [
+    (TicketStatus.OPEN, 6),
+    (TicketStatus.IN_PROGRESS, 9),
+    (TicketStatus.PENDING, 5),
+    (TicketStatus.RESOLVED, 45),
+    (TicketStatus.CLOSED, 35),
+]
+PRIORITY_WEIGHTS = [
+    (TicketPriority.LOW, 30),
+    (TicketPriority.MEDIUM, 45),
+    (TicketPriority.HIGH, 20),
+    (TicketPriority.CRITICAL, 5),
+]
+# Share of OPEN tickets still waiting for an agent
+OPEN_UNASSIGNED_RATIO = 0.7
+# Resolution time: log-normal around 8 hours, with a long tail of days
+RESOLUTION_MEDIAN_HOURS = 8
+RESOLUTION_SIGMA = 1.2
+# Agent load is skewed: agent k gets a share proportional to 1 / (k + 1) ** AGENT_SKEW
+AGENT_SKEW = 0.8
+# A few long-running incidents collect a large share of the comments
+HOT_TICKET_RATIO = 0.001
+HOT_COMMENT_RATIO = 0.2
+# Ticket volume grows over time: position in the period = (i / n) ** VOLUME_GROWTH
+VOLUME_GROWTH = 0.8
+
+TEMPLATES = [
+    ("No puedo iniciar sesión", "El sistema rechaza mi contraseña desde esta mañana, ya probé restablecerla."),
+    ("VPN desconectada", "La VPN se corta cada pocos minutos cuando trabajo desde casa."),
+    ("Impresora sin conexión", "La impresora del piso aparece sin conexión y los trabajos quedan en cola."),
+    ("Error al exportar reporte", "Al exportar el reporte mensual a Excel aparece un error 500."),
+    ("Correo no sincroniza", "Outlook no recibe correos nuevos en el celular, en la PC funciona bien."),
+    ("Solicitud de acceso", "Necesito acceso de lectura a la carpeta compartida del equipo de finanzas."),
+    ("Pantalla azul", "La notebook se reinicia con pantalla azul al conectar el monitor externo."),
+    ("Lentitud en el ERP", "Las pantallas del ERP tardan más de un minuto en cargar desde ayer."),
+]
+COMMENTS = [
+    "Estoy revisando el caso.",
+    "¿Podés enviar una captura del error?",
+    "Adjunto la captura, sigue pasando.",
+    "Se aplicó un cambio de configuración, probá de nuevo por favor.",
+    "Ahora funciona, gracias.",
+    "Escalado al equipo de infraestructura.",
+    "Sigue fallando de forma intermitente.",
+]
+
+
+def _max_id(db: Session, model) -> int:
+    return db.query(func.coalesce(func.max(model.id), 0)).scalar()
+
+
+def _created_at(index: int, total: int, start: datetime, span: timedelta) -> datetime:
+    """
+    Creation time of the index-th generated ticket: increasing with the id,
+    with more tickets per day towards the end of the period.
+    """
+    return start + span * ((index + 0.5) / total) ** (1 / VOLUME_GROWTH)
+
+
+def _cum_weights(weights: List[Tuple[object, float]]) -> Tuple[list, list]:
+    values = [value for value, _ in weights]
+    total, cumulative = 0.0, []
+    for _, weight in weights:
+        total += weight
+        cumulative.append(total)
+    return values, cumulative
+
+
+def _progress(label: str, done: int, total: int, started: float):
+    elapsed = time.perf_counter() - started
+    rate = done / elapsed if elapsed > 0 else 0
+    logger.info(f"  {label}: {done:,}/{total:,} ({rate:,.0f} rows/s)")
+
+
+def generate_users(db: Session, users: int, agents: int, batch_size: int, start: datetime) -> Tuple[List[int], List[int]]:
+    """
+    Insert `agents` agents and `users` regular users. Returns their ids.
+    """
+    agent_hash = get_password_hash(AGENT_PASSWORD)
+    user_hash = get_password_hash(USER_PASSWORD)
+    first_id = _max_id(db, User) + 1
+
+    rows = []
+    for i in range(agents + users):
+        user_id = first_id + i
+        is_agent = i < agents
+        prefix = "agent" if is_agent else "user"
+        rows.append((
+            user_id,
+            f"seed-{prefix}-{user_id}@example.com",
+            f"{prefix.capitalize()} {user_id}",
+            agent_hash if is_agent else user_hash,
+            UserRole.AGENT if is_agent else UserRole.USER,
+            True,
+            start,
+        ))
+    for offset in range(0, len(rows), batch_size):
+        bulk_insert(db, User.__table__, USER_COLUMNS, rows[offset:offset + batch_size])
+        db.commit()
+
+    agent_ids = list(range(first_id, first_id + agents))
+    user_ids = list(range(first_id + agents, first_id + agents + users))
+    logger.info(f"✅ Created {agents:,} agents and {users:,} users")
+    return agent_ids, user_ids
+
+
+def _ticket_points(row: tuple, admin_id: int) -> List[str]:
+    """
+    InfluxDB line protocol points of a generated ticket, with the same
+    measurements and tags as MetricsService.
+    """
+    ticket_id, _, _, _, priority, creator_id, agent_id, created_at, _, resolved_at = row
+    created_ns = int(created_at.timestamp() * 1e9)
+    points = [
+        f"ticket_created,creator_id={creator_id},priority={priority.value} count=1i,ticket_id={ticket_id}i {created_ns}"
+    ]
+    if agent_id is not None:
+        points.append(
+            f"ticket_assigned,assigned_agent_id={agent_id},assigned_by_id={admin_id} "
+            f"count=1i,ticket_id={ticket_id}i {created_ns + 1000}"
+        )
+    # CLOSED tickets went through resolution too: they carry resolved_at
+    if resolved_at is not None:
+        seconds = int((resolved_at - created_at).total_seconds())
+        agent_tag = f",agent_id={agent_id}" if agent_id else ""
+        points.append(
+            f"ticket_resolved{agent_tag},ticket_id={ticket_id} "
+            f"count=1i,resolution_time_seconds={seconds}i {int(resolved_at.timestamp() * 1e9)}"
+        )
+    return points
+
+
+def generate_tickets(
+    db: Session,
+    count: int,
+    agent_ids: List[int],
+    user_ids: List[int],
+    batch_size: int,
+    start: datetime,
+    span: timedelta,
+    rng: random.Random,
+    influx_admin_id: Optional[int] = None,
+) -> int:
+    """
+    Insert `count` tickets spread over [start, start + span). Returns the
+    id of the first one. With `influx_admin_id`, the matching metric points
+    are written to InfluxDB batch by batch.
+    """
+    statuses, status_weights = _cum_weights(STATUS_WEIGHTS)
+    priorities, priority_weights = _cum_weights(PRIORITY_WEIGHTS)
+    agents, agent_weights = _cum_weights([(agent_id, 1 / (k + 1) ** AGENT_SKEW) for k, agent_id in enumerate(agent_ids)])
+    resolution_mu = math.log(RESOLUTION_MEDIAN_HOURS * 3600)
+    end = start + span
+    first_id = _max_id(db, Ticket) + 1
+
+    started = time.perf_counter()
+    for offset in range(0, count, batch_size):
+        size = min(batch_size, count - offset)
+        batch_statuses = rng.choices(statuses, cum_weights=status_weights, k=size)
+        batch_priorities = rng.choices(priorities, cum_weights=priority_weights, k=size)
+        batch_agents = rng.choices(agents, cum_weights=agent_weights, k=size) if agents else [None] * size
+
+        rows = []
+        for i in range(size):
+            index = offset + i
+            status = batch_statuses[i]
+            created_at = _created_at(index, count, start, span)
+            agent_id = batch_agents[i]
+            if status == TicketStatus.OPEN and rng.random() < OPEN_UNASSIGNED_RATIO:
+                agent_id = None
+
+            resolved_at = updated_at = None
+            if status in (TicketStatus.RESOLVED, TicketStatus.CLOSED):
+                resolved_at = min(created_at + timedelta(seconds=rng.lognormvariate(resolution_mu, RESOLUTION_SIGMA)), end)
+                updated_at = resolved_at
+            elif agent_id is not None:
+                updated_at = created_at + timedelta(minutes=rng.randint(1, 240))
+
+            title, description = TEMPLATES[index % len(TEMPLATES)]
+            rows.append((
+                first_id + index,
+                f"{title} #{first_id + index}",
+                description,
+                status,
+                batch_priorities[i],
+                rng.choice(user_ids),
+                agent_id,
+                created_at,
+                updated_at,
+                resolved_at,
+            ))
+
+        bulk_insert(db, Ticket.__table__, TICKET_COLUMNS, rows)
+        db.commit()
+        if influx_admin_id is not None:
+            influx_db.write_records([point for row in rows for point in _ticket_points(row, influx_admin_id)])
+        _progress("tickets", offset + size, count, started)
+
+    logger.info(f"✅ Created {count:,} tickets")
+    return first_id
+
+
+def generate_comments(
+    db: Session,
+    count: int,
+    tickets: int,
+    first_ticket_id: int,
+    author_ids: List[int],
+    batch_size: int,
+    start: datetime,
+    span: timedelta,
+    rng: random.Random,
+):
+    """
+    Insert `count` comments on the generated tickets, each some hours after
+    its ticket was created. A few "hot" tickets get HOT_COMMENT_RATIO of them.
+    """
+    if not tickets:
+        return
+    hot_tickets = max(int(tickets * HOT_TICKET_RATIO), 1)
+    end = start + span
+    first_id = _max_id(db, Comment) + 1
+
+    # On PostgreSQL the statement-level search trigger appends each batch to
+    # the ticket documents: one UPDATE per commented ticket and batch
+    started = time.perf_counter()
+    for offset in range(0, count, batch_size):
+        size = min(batch_size, count - offset)
+        rows = []
+        for i in range(size):
+            if rng.random() < HOT_COMMENT_RATIO:
+                index = rng.randrange(hot_tickets) * (tickets // hot_tickets)
+            else:
+                index = rng.randrange(tickets)
+            created_at = min(_created_at(index, tickets, start, span) + timedelta(seconds=rng.expovariate(1 / 21600)), end)
+            rows.append((
+                first_id + offset + i,
+                COMMENTS[(offset + i) % len(COMMENTS)],
+                first_ticket_id + index,
+                rng.choice(author_ids),
+                created_at,
+            ))
+        bulk_insert(db, Comment.__table__, COMMENT_COLUMNS, rows)
+        db.commit()
+        _progress("comments", offset + size, count, started)
+
+    logger.info(f"✅ Created {count:,} comments")
+
+
+def finish_load(db: Session):
+    """
+    Move the id sequences past the generated rows, rebuild the analytics
+    rollup and refresh the planner statistics.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        for table in ("users", "tickets", "comments"):
+            db.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT coalesce(max(id), 1) FROM {table}))"
+            ))
+        db.commit()
+
+    rows = ticket_stats_service.backfill(db)
+    logger.info(f"✅ Rollup rebuilt: {rows} rows")
+
+    db.execute(text("ANALYZE"))
+    db.commit()
+
+
+def generate_synthetic_data(
+    users: int,
+    agents: int,
+    tickets: int,
+    comments: int,
+    days: int,
+    batch_size: int,
+    seed: int,
+    influx: bool,
+):
+    """
+    Main function of the synthetic data generator.
+    """
+    rng = random.Random(seed)
+    span = timedelta(days=days)
+    start = datetime.now(timezone.utc).replace(microsecond=0) - span
+    db = SessionLocal()
+
+    try:
+        create_users(db)
+        admin_id = db.query(User.id).filter(User.email == "admin@ticketsystem.com").scalar()
+
+        if influx:
+            influx_db.connect()
+
+        started = time.perf_counter()
+        agent_ids, user_ids = generate_users(db, users, agents, batch_size, start)
+        first_ticket_id = generate_tickets(
+            db, tickets, agent_ids, user_ids, batch_size, start, span, rng,
+            influx_admin_id=admin_id if influx else None
+        )
+        generate_comments(db, comments, tickets, first_ticket_id, agent_ids + user_ids, batch_size, start, span, rng)
+        finish_load(db)
+        logger.info(f"🎉 Synthetic data generated in {time.perf_counter() - started:.1f}s")
+    except Exception as e:
+        logger.error(f"❌ Error generating synthetic data: {e}")
+        db.rollback()
+        raise
+    finally:
+        if influx:
+            influx_db.close()
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Datos iniciales y datos sintéticos para pruebas de rendimiento")
+    parser.add_argument("--users", type=int, default=0, help="usuarios regulares a generar")
+    parser.add_argument("--agents", type=int, default=0, help="agentes a generar")
+    parser.add_argument("--tickets", type=int, default=0, help="tickets a generar")
+    parser.add_argument("--comments", type=int, default=0, help="comentarios a generar")
+    parser.add_argument("--days", type=int, default=365, help="período que cubren los tickets")
+    parser.add_argument("--batch-size", type=int, default=50000, help="filas por transacción")
+    parser.add_argument("--seed", type=int, default=42, help="semilla para datos reproducibles")
+    parser.add_argument("--influx", action="store_true", help="escribir también los puntos en InfluxDB")
+    args = parser.parse_args()
+
+    if not any((args.users, args.agents, args.tickets, args.comments)):
+        seed_database()
+        return
+    if args.tickets and not (args.users and args.agents):
+        parser.error("--tickets needs --users and --agents")
+
+    generate_synthetic_data(
+        users=args.users,
+        agents=args.agents,
+        tickets=args.tickets,
+        comments=args.comments,
+        days=args.days,
+        batch_size=args.batch_size,
+        seed=args.seed,
+        influx=args.influx,
+    )
+
+
 if __name__ == "__main__":
-    seed_database()
+    main()
@@ -0,0 +1,123 @@
+from typing import Awaitable, Callable, Iterable, Optional, Tuple
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.core.cache import build_cache
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.models.ticket_daily_stats import UNASSIGNED_AGENT_ID
+from app.services.ticket_stats_service import TicketSnapshot
+
+logger = get_logger("analytics_cache")
+
+DASHBOARD_TAG = "dashboard"
+
+
+def agent_tag(agent_id: int) -> str:
+    """
+    Tag de las entradas que dependen de los tickets de un agente.
+    """
+    return f"agent:{agent_id}"
+
+
+class AnalyticsCache:
+    """
+    Cache de respuestas de los endpoints de analytics.
+
+    La clave incluye el endpoint, sus parámetros y el rol de quien consulta.
+    El dashboard agrega todos los tickets, así que cualquier cambio en el
+    rollup lo invalida; las estadísticas de un agente solo se invalidan si el
+    ticket modificado estaba o queda asignado a ese agente. Si el backend
+    falla, la respuesta se calcula sin cache.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    async def cached_response(
+        self,
+        key: str,
+        tags: Iterable[str],
+        compute: Callable[[], Awaitable[BaseModel]]
+    ) -> Response:
+        """
+        Devolver la respuesta cacheada para `key` o calcularla con `compute`.
+        Agrega los headers Cache-Control y Age.
+        """
+        cached = None
+        try:
+            cached = self.backend.get(key)
+        except Exception as e:
+            logger.error(f"Failed to read analytics cache: {e}")
+
+        if cached is not None:
+            body, age = cached
+            return self._response(body, age)
+
+        body = JSONResponse(jsonable_encoder(await compute())).body.decode()
+        try:
+            self.backend.set(key, body, tags)
+        except Exception as e:
+            logger.error(f"Failed to write analytics cache: {e}")
+        return self._response(body, 0)
+
+    def _response(self, body: str, age: float) -> Response:
+        max_age = max(int(self.backend.ttl - age), 0)
+        return Response(
+            content = body,
+            media_type = "application/json",
+            headers = {
+                "Cache-Control": f"private, max-age={max_age}",
+                "Age": str(int(age))
+            }
+        )
+
+    def invalidate_ticket_change(self, before: Optional[TicketSnapshot], after: Optional[TicketSnapshot]):
+        """
+        Invalidar las entradas afectadas por el cambio de aporte de un ticket
+        al rollup (mismos snapshots que TicketStatsService.apply).
+        """
+        self.invalidate_ticket_changes([(before, after)])
+
+    def invalidate_ticket_changes(self, changes: Iterable[Tuple[Optional[TicketSnapshot], Optional[TicketSnapshot]]]):
+        """
+        Igual que invalidate_ticket_change para varios tickets, con una sola
+        invalidación por tag.
+        """
+        tags = set()
+        for before, after in changes:
+            if before == after:
+                continue
+            tags.add(DASHBOARD_TAG)
+            for snapshot in (before, after):
+                if snapshot is not None and snapshot.agent_id != UNASSIGNED_AGENT_ID:
+                    tags.add(agent_tag(snapshot.agent_id))
+        if not tags:
+            return
+        try:
+            self.backend.invalidate_tags(tags)
+        except Exception as e:
+            logger.error(f"Failed to invalidate analytics cache: {e}")
+
+    def clear(self):
+        """
+        Vaciar el cache.
+        """
+        self.backend.clear()
+
+    def stats(self):
+        """
+        Contadores del backend (hits, misses, invalidaciones).
+        """
+        return self.backend.stats()
+
+
+# Instancia global del cache
+analytics_cache = AnalyticsCache(build_cache(
+    ttl = settings.ANALYTICS_CACHE_TTL_SECONDS,
+    max_entries = settings.ANALYTICS_CACHE_MAX_ENTRIES,
+    redis_url = settings.ANALYTICS_CACHE_REDIS_URL,
+    prefix = "analytics"
+))
@@ -0,0 +1,302 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.user import User, UserRole
+from app.models.ticket import Ticket, TicketStatus, TicketPriority
+from app.models.ticket_daily_stats import TicketDailyStats, UNASSIGNED_AGENT_ID
+from app.models.ticket_resolution_histogram import TicketResolutionHistogram, resolution_bucket_range
+from app.schemas.analytics import (
+    AnalyticsResponse,
+    TicketStats,
+    PriorityStats,
+    AgentStats,
+    TimeSeriesData
+)
+
+
+# Percentiles de tiempo de resolución expuestos en AgentStats
+PERCENTILES = {"p50": 0.5, "p90": 0.9, "p99": 0.99}
+
+
+def dialect_name(db: Session) -> str:
+    """
+    Nombre del dialecto SQL de la sesión (postgresql, sqlite, ...).
+    """
+    return db.get_bind().dialect.name
+
+
+def resolution_seconds_expr(db: Session):
+    """
+    Expresión SQL con los segundos entre created_at y resolved_at.
+
+    PostgreSQL usa EXTRACT(EPOCH FROM ...); SQLite no soporta intervalos,
+    así que se usa la diferencia de julianday().
+    """
+    if dialect_name(db) == "postgresql":
+        return func.extract("epoch", Ticket.resolved_at - Ticket.created_at)
+    return (func.julianday(Ticket.resolved_at) - func.julianday(Ticket.created_at)) * 86400
+
+
+def _percentile_fields(times: Dict[str, float]) -> Dict[str, Optional[float]]:
+    """
+    Campos p50/p90/p99 de AgentStats a partir de las estadísticas de resolución.
+    """
+    fields = {}
+    for name in PERCENTILES:
+        value = times.get(name)
+        fields[f"{name}_resolution_time_hours"] = round(value, 2) if value is not None else None
+    return fields
+
+
+class AnalyticsService:
+    """
+    Servicio de agregaciones para los endpoints de analytics.
+
+    Los conteos, promedios y la serie diaria se leen del rollup
+    ticket_daily_stats y los percentiles de resolución del histograma
+    ticket_resolution_histogram, así que el costo no depende de la
+    cantidad de tickets ni de días solicitados.
+    """
+
+    @staticmethod
+    def ticket_histograms(db: Session) -> Tuple[TicketStats, PriorityStats]:
+        """
+        Conteo de tickets por estado y por prioridad en una sola consulta.
+        """
+        rows = db.query(
+            TicketDailyStats.status,
+            TicketDailyStats.priority,
+            func.sum(TicketDailyStats.ticket_count)
+        ).group_by(TicketDailyStats.status, TicketDailyStats.priority).all()
+
+        by_status: Dict[TicketStatus, int] = defaultdict(int)
+        by_priority: Dict[TicketPriority, int] = defaultdict(int)
+        total = 0
+        for ticket_status, priority, count in rows:
+            by_status[ticket_status] += count or 0
+            by_priority[priority] += count or 0
+            total += count or 0
+
+        ticket_stats = TicketStats(
+            total_tickets = total,
+            open_tickets = by_status[TicketStatus.OPEN],
+            in_progress_tickets = by_status[TicketStatus.IN_PROGRESS],
+            resolved_tickets = by_status[TicketStatus.RESOLVED],
+            closed_tickets = by_status[TicketStatus.CLOSED]
+        )
+        priority_stats = PriorityStats(
+            low = by_priority[TicketPriority.LOW],
+            medium = by_priority[TicketPriority.MEDIUM],
+            high = by_priority[TicketPriority.HIGH],
+            critical = by_priority[TicketPriority.CRITICAL]
+        )
+        return ticket_stats, priority_stats
+
+    @staticmethod
+    def _percentile(buckets: List[Tuple[int, int]], fraction: float) -> float:
+        """
+        Percentil estimado desde un histograma [(cubeta, cantidad)] ordenado.
+
+        Usa la interpolación lineal de percentile_cont entre los dos valores
+        vecinos; cada valor se estima repartiendo los tickets de su cubeta
+        de forma geométrica entre sus límites (error < ~5%).
+        """
+        total = sum(count for _, count in buckets)
+
+        def value(rank: int) -> float:
+            for bucket, count in buckets:
+                if rank < count:
+                    lower, upper = resolution_bucket_range(bucket)
+                    position = (rank + 0.5) / count
+                    if lower == 0:
+                        return upper * position
+                    return lower * (upper / lower) ** position
+                rank -= count
+            raise ValueError("rank out of range")
+
+        position = (total - 1) * fraction
+        lower = int(position)
+        upper = min(lower + 1, total - 1)
+        lower_value = value(lower)
+        return lower_value + (value(upper) - lower_value) * (position - lower)
+
+    def resolution_percentiles(self, db: Session, agent_id: Optional[int] = None) -> Dict[Optional[int], Dict[str, float]]:
+        """
+        Percentiles p50/p90/p99 del tiempo de resolución por agente (en horas).
+
+        Se estiman desde ticket_resolution_histogram: una fila por agente y
+        cubeta no vacía, sin importar cuántos tickets haya resueltos.
+        """
+        query = db.query(
+            TicketResolutionHistogram.agent_id,
+            TicketResolutionHistogram.bucket,
+            TicketResolutionHistogram.ticket_count
+        ).filter(TicketResolutionHistogram.ticket_count > 0)
+        if agent_id is not None:
+            query = query.filter(TicketResolutionHistogram.agent_id == agent_id)
+
+        histograms: Dict[Optional[int], List[Tuple[int, int]]] = defaultdict(list)
+        for row_agent_id, bucket, count in query.order_by(
+            TicketResolutionHistogram.agent_id,
+            TicketResolutionHistogram.bucket
+        ):
+            key = None if row_agent_id == UNASSIGNED_AGENT_ID else row_agent_id
+            histograms[key].append((bucket, count))
+
+        return {
+            row_agent_id: {
+                name: self._percentile(buckets, fraction) / 3600
+                for name, fraction in PERCENTILES.items()
+            }
+            for row_agent_id, buckets in histograms.items()
+        }
+
+    @staticmethod
+    def avg_resolution_time_hours(db: Session) -> Optional[float]:
+        """
+        Tiempo promedio de resolución global (en horas), desde el rollup.
+        """
+        total_seconds, resolutions = db.query(
+            func.sum(TicketDailyStats.resolution_seconds_sum),
+            func.sum(TicketDailyStats.resolution_count)
+        ).one()
+        if not resolutions:
+            return None
+        return round((total_seconds / resolutions) / 3600, 2)  # Convertir a horas
+
+    @staticmethod
+    def _agent_rollup(db: Session, agent_id: Optional[int] = None):
+        """
+        Subconsulta del rollup agregada por agente: asignados, resueltos y
+        suma/cantidad de tiempos de resolución.
+        """
+        query = db.query(
+            TicketDailyStats.agent_id.label("agent_id"),
+            func.sum(TicketDailyStats.ticket_count).label("assigned_tickets"),
+            func.sum(TicketDailyStats.ticket_count).filter(
+                TicketDailyStats.status == TicketStatus.RESOLVED
+            ).label("resolved_tickets"),
+            func.sum(TicketDailyStats.resolution_seconds_sum).label("resolution_seconds"),
+            func.sum(TicketDailyStats.resolution_count).label("resolutions"),
+        )
+        if agent_id is not None:
+            query = query.filter(TicketDailyStats.agent_id == agent_id)
+        return query.group_by(TicketDailyStats.agent_id).subquery()
+
+    @staticmethod
+    def _agent_stats_row(agent_id: int, agent_name: str, assigned, resolved, seconds, resolutions,
+                         percentiles: Dict[str, float], zero_avg_as_none: bool = False) -> AgentStats:
+        avg_time = seconds / resolutions / 3600 if resolutions else None  # Convertir a horas
+        if zero_avg_as_none and not avg_time:
+            avg_time = None
+        return AgentStats(
+            agent_id = agent_id,
+            agent_name = agent_name,
+            assigned_tickets = assigned or 0,
+            resolved_tickets = resolved or 0,
+            avg_resolution_time_hours = round(avg_time, 2) if avg_time is not None else None,
+            **_percentile_fields(percentiles)
+        )
+
+    def agent_stats(self, db: Session, percentiles: Dict[Optional[int], Dict[str, float]]) -> List[AgentStats]:
+        """
+        Tickets asignados y resueltos por agente en una sola consulta agrupada.
+        """
+        rollup = self._agent_rollup(db)
+        agents_data = db.query(
+            User.id,
+            User.full_name,
+            rollup.c.assigned_tickets,
+            rollup.c.resolved_tickets,
+            rollup.c.resolution_seconds,
+            rollup.c.resolutions,
+        ).join(
+            rollup, rollup.c.agent_id == User.id, isouter=True
+        ).filter(
+            User.role.in_([UserRole.AGENT, UserRole.ADMIN])
+        ).order_by(User.id).all()
+
+        agents = []
+        for agent_id, agent_name, *aggregates in agents_data:
+            # En el dashboard un promedio de 0 horas se reporta como None
+            agents.append(self._agent_stats_row(
+                agent_id, agent_name, *aggregates, percentiles.get(agent_id, {}), zero_avg_as_none=True
+            ))
+
+        # Ordenar por tickets resueltos
+        agents.sort(key=lambda x: x.resolved_tickets, reverse=True)
+        return agents
+
+    def agent_detail(self, db: Session, agent: User) -> AgentStats:
+        """
+        Estadísticas de un agente individual.
+        """
+        rollup = self._agent_rollup(db, agent_id=agent.id)
+        aggregates = db.query(
+            rollup.c.assigned_tickets,
+            rollup.c.resolved_tickets,
+            rollup.c.resolution_seconds,
+            rollup.c.resolutions,
+        ).first() or (0, 0, None, None)
+
+        percentiles = self.resolution_percentiles(db, agent_id=agent.id).get(agent.id, {})
+        return self._agent_stats_row(agent.id, agent.full_name, *aggregates, percentiles)
+
+    @staticmethod
+    def tickets_over_time(db: Session, today: date, days: int) -> List[TimeSeriesData]:
+        """
+        Tickets creados por día (UTC) en los últimos `days` días calendario,
+        incluido `today`, leídos del rollup.
+        """
+        if days <= 0:
+            return []
+
+        start_day = today - timedelta(days=days - 1)
+        end_day = today + timedelta(days=1)
+
+        rows = db.query(
+            TicketDailyStats.day,
+            func.sum(TicketDailyStats.ticket_count)
+        ).filter(
+            TicketDailyStats.day >= start_day,
+            TicketDailyStats.day < end_day
+        ).group_by(TicketDailyStats.day).all()
+
+        counts: Dict[date, int] = {day: count or 0 for day, count in rows}
+
+        tickets_over_time = []
+        for i in range(days):
+            day = start_day + timedelta(days=i)
+            tickets_over_time.append(TimeSeriesData(
+                timestamp = day.strftime("%Y-%m-%d"),
+                value = float(counts.get(day, 0))
+            ))
+        return tickets_over_time
+
+    def dashboard(self, db: Session, days: int) -> AnalyticsResponse:
+        """
+        Construir el dashboard completo con un número constante de consultas.
+        """
+        # Los días del rollup son UTC
+        today = datetime.now(timezone.utc).date()
+
+        ticket_stats, priority_stats = self.ticket_histograms(db)
+        percentiles = self.resolution_percentiles(db)
+        avg_resolution_time = self.avg_resolution_time_hours(db)
+        top_agents = self.agent_stats(db, percentiles)
+        tickets_over_time = self.tickets_over_time(db, today, days)
+
+        return AnalyticsResponse(
+            ticket_stats = ticket_stats,
+            priority_stats = priority_stats,
+            top_agents = top_agents[:10], # Top 10 agentes
+            tickets_over_time = tickets_over_time,
+            avg_resolution_time_hours = avg_resolution_time
+        )
+
+
+# Instancia global del servicio
+analytics_service = AnalyticsService()
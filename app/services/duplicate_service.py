@@ -0,0 +1,272 @@
+import heapq
+import random
+import re
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.models.ticket import Ticket, TicketStatus
+
+logger = get_logger("duplicates")
+
+# Primo mayor que 2^32 para las permutaciones (a * h + b) mod p
+_PRIME = 4294967311
+# Solo se usa el comienzo del texto: acota el costo por ticket
+MAX_TEXT_CHARS = 1000
+
+_WORD = re.compile(r"\w+")
+
+Signature = Tuple[int, ...]
+
+
+class DuplicateMatch(NamedTuple):
+    """
+    Ticket original probable y similitud estimada (0-1).
+    """
+    ticket_id: int
+    similarity: float
+
+
+def _epoch(value: datetime) -> float:
+    """
+    Segundos epoch de un datetime (SQLite devuelve datetimes sin zona, en UTC).
+    """
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _shingles(title: str, description: str) -> Set[int]:
+    """
+    Hashes de los trigramas de caracteres del texto normalizado.
+    """
+    text = " ".join(_WORD.findall(f"{title} {description}".lower()))[:MAX_TEXT_CHARS]
+    return {zlib.crc32(text[i:i + 3].encode()) for i in range(max(len(text) - 2, 1))}
+
+
+class DuplicateDetector:
+    """
+    Detección de tickets duplicados con MinHash + LSH sobre trigramas de
+    título y descripción.
+
+    Mantiene en memoria las firmas de los tickets abiertos creados en los
+    últimos `window_seconds` (según su created_at, máximo `max_tickets`; si
+    sobran se descartan los más viejos). Las firmas se dividen en
+    `bands` bandas; dos tickets son candidatos si coinciden en una banda
+    completa y se consideran duplicados si la similitud estimada llega a
+    `threshold`. Solo se indexan tickets originales: un duplicado se enlaza
+    al original de su grupo, así los buckets no crecen durante un incidente.
+
+    Cada proceso indexa sus propios tickets al crearlos y, antes de buscar,
+    agrega los más nuevos de otros procesos (hasta `refresh_batch` por
+    búsqueda, del más reciente hacia atrás).
+    """
+
+    def __init__(
+        self,
+        threshold: float,
+        window_seconds: float,
+        max_tickets: int,
+        num_perm: int,
+        bands: int,
+        refresh_batch: int,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.window_seconds = window_seconds
+        self.max_tickets = max_tickets
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.refresh_batch = refresh_batch
+
+        rng = random.Random(42)  # Mismas permutaciones en todos los procesos
+        self._permutations = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+
+        # Firma y created_at (epoch) por ticket; el heap ordena por created_at
+        # para el desalojo y puede tener entradas ya removidas
+        self._entries: Dict[int, Tuple[Signature, float]] = {}
+        self._by_created: List[Tuple[float, int]] = []
+        self._buckets: List[Dict[Signature, Set[int]]] = [{} for _ in range(bands)]
+        self._max_seen_id = 0
+        self._lock = threading.Lock()
+
+        self.checks = 0
+        self.duplicates = 0
+        self.check_seconds = 0.0
+
+    # ----------------------------------------
+    # Firmas
+    # ----------------------------------------
+    def signature(self, title: str, description: str) -> Signature:
+        """
+        Firma MinHash del ticket.
+        """
+        hashes = _shingles(title, description)
+        return tuple(min([(a * h + b) % _PRIME for h in hashes]) for a, b in self._permutations)
+
+    def _bands(self, signature: Signature):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows]
+
+    def _similarity(self, a: Signature, b: Signature) -> float:
+        return sum(x == y for x, y in zip(a, b)) / self.num_perm
+
+    # ----------------------------------------
+    # Búsqueda
+    # ----------------------------------------
+    def find(self, db: Session, signature: Signature) -> Optional[DuplicateMatch]:
+        """
+        Ticket abierto más parecido por encima del umbral, o None.
+        """
+        started = time.perf_counter()
+        self.refresh(db)
+
+        with self._lock:
+            self._evict()
+            candidates: Set[int] = set()
+            for band, key in self._bands(signature):
+                candidates.update(self._buckets[band].get(key, ()))
+            scored = sorted(
+                (
+                    (similarity, ticket_id)
+                    for ticket_id in candidates
+                    if (similarity := self._similarity(signature, self._entries[ticket_id][0])) >= self.threshold
+                ),
+                key=lambda item: (-item[0], item[1])
+            )
+
+        match = None
+        if scored:
+            # Confirmar que siguen abiertos (pudieron cambiar por otra vía)
+            open_ids = {
+                ticket_id for (ticket_id,) in
+                db.query(Ticket.id).filter(Ticket.id.in_([t for _, t in scored]), Ticket.status == TicketStatus.OPEN)
+            }
+            with self._lock:
+                for _, ticket_id in scored:
+                    if ticket_id not in open_ids:
+                        self._remove(ticket_id)
+            match = next((DuplicateMatch(t, s) for s, t in scored if t in open_ids), None)
+
+        with self._lock:
+            self.checks += 1
+            self.duplicates += match is not None
+            self.check_seconds += time.perf_counter() - started
+        return match
+
+    def add(self, ticket_id: int, signature: Signature, created_at: datetime):
+        """
+        Indexar un ticket original recién creado.
+        """
+        with self._lock:
+            self._add(ticket_id, signature, _epoch(created_at))
+            self._evict()
+
+    def refresh(self, db: Session):
+        """
+        Indexar los tickets originales abiertos creados por otros procesos (o
+        por la importación masiva). Avanza por id de a `refresh_batch` filas,
+        así que una ráfaga grande se completa en varias llamadas sin saltear
+        ninguna.
+        """
+        with self._lock:
+            since_id = self._max_seen_id
+        rows = (
+            db.query(Ticket.id, Ticket.title, Ticket.description, Ticket.created_at)
+            .filter(
+                Ticket.id > since_id,
+                Ticket.status == TicketStatus.OPEN,
+                Ticket.duplicate_of_id.is_(None),
+            )
+            .order_by(Ticket.id.asc())
+            .limit(self.refresh_batch)
+            .all()
+        )
+        if not rows:
+            return
+        oldest = time.time() - self.window_seconds
+        with self._lock:
+            # Los creados por este proceso ya están indexados; los que ya
+            # salieron de la ventana no se indexan
+            missing = [
+                (row, created) for row in rows
+                if row.id not in self._entries and (created := _epoch(row.created_at)) >= oldest
+            ]
+        signatures = [(row.id, self.signature(row.title, row.description), created) for row, created in missing]
+        with self._lock:
+            for ticket_id, signature, created in signatures:
+                if ticket_id not in self._entries:
+                    self._add(ticket_id, signature, created)
+            self._max_seen_id = max(self._max_seen_id, rows[-1].id)
+            self._evict()
+
+    # ----------------------------------------
+    # Mantenimiento del índice (con el lock tomado)
+    # ----------------------------------------
+    def _add(self, ticket_id: int, signature: Signature, created: float):
+        self._entries[ticket_id] = (signature, created)
+        heapq.heappush(self._by_created, (created, ticket_id))
+        for band, key in self._bands(signature):
+            self._buckets[band].setdefault(key, set()).add(ticket_id)
+
+    def _remove(self, ticket_id: int):
+        entry = self._entries.pop(ticket_id, None)
+        if entry is None:
+            return
+        for band, key in self._bands(entry[0]):
+            bucket = self._buckets[band].get(key)
+            if bucket is not None:
+                bucket.discard(ticket_id)
+                if not bucket:
+                    del self._buckets[band][key]
+
+    def _evict(self):
+        # Hora real: created_at viene de la base, no de este proceso
+        oldest = time.time() - self.window_seconds
+        while self._by_created:
+            created, ticket_id = self._by_created[0]
+            entry = self._entries.get(ticket_id)
+            if entry is not None and entry[1] == created:
+                if created >= oldest and len(self._entries) <= self.max_tickets:
+                    break
+                self._remove(ticket_id)
+            heapq.heappop(self._by_created)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_created.clear()
+            for bucket in self._buckets:
+                bucket.clear()
+            self._max_seen_id = 0
+
+    def stats(self) -> Dict:
+        """
+        Tamaño del índice y costo promedio de una verificación.
+        """
+        with self._lock:
+            return {
+                "indexed": len(self._entries),
+                "checks": self.checks,
+                "duplicates": self.duplicates,
+                "check_ms_avg": round(self.check_seconds / self.checks * 1000, 3) if self.checks else 0.0,
+            }
+
+
+# Instancia global del detector
+duplicate_detector = DuplicateDetector(
+    threshold = settings.DUPLICATE_SIMILARITY_THRESHOLD,
+    window_seconds = settings.DUPLICATE_WINDOW_SECONDS,
+    max_tickets = settings.DUPLICATE_INDEX_MAX_TICKETS,
+    num_perm = settings.DUPLICATE_MINHASH_PERMUTATIONS,
+    bands = settings.DUPLICATE_LSH_BANDS,
+    refresh_batch = settings.DUPLICATE_REFRESH_BATCH
+)
@@ -0,0 +1,97 @@
+import csv
+import enum
+import io
+import json
+import zlib
+from datetime import date, datetime
+from typing import AsyncContextManager, AsyncIterator, Callable, List, Optional, Sequence
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.services.ticket_import_service import FileFormat
+
+logger = get_logger("export")
+
+MEDIA_TYPES = {
+    FileFormat.NDJSON: "application/x-ndjson",
+    FileFormat.CSV: "text/csv",
+}
+
+
+def _plain(value):
+    """
+    Valor serializable: enums por su valor y fechas en ISO 8601.
+    """
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+class RowEncoder:
+    """
+    Convierte bloques de filas en bytes NDJSON o CSV.
+    """
+    def __init__(self, fields: List[str], fmt: FileFormat):
+        self.fields = fields
+        self.fmt = fmt
+
+    def header(self) -> bytes:
+        if self.fmt == FileFormat.CSV:
+            return self._csv([self.fields])
+        return b""
+
+    def encode(self, rows: Sequence[Sequence]) -> bytes:
+        if self.fmt == FileFormat.CSV:
+            return self._csv([["" if value is None else _plain(value) for value in row] for row in rows])
+        return "".join(
+            json.dumps(dict(zip(self.fields, map(_plain, row))), ensure_ascii=False) + "\n"
+            for row in rows
+        ).encode()
+
+    @staticmethod
+    def _csv(rows) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerows(rows)
+        return buffer.getvalue().encode()
+
+
+async def stream_rows(
+    open_session: Callable[[], AsyncContextManager],
+    statement,
+    fields: List[str],
+    fmt: FileFormat,
+    compress: bool = False,
+    batch_size: Optional[int] = None,
+) -> AsyncIterator[bytes]:
+    """
+    Generar el archivo de exportación de `statement` bloque a bloque.
+
+    La consulta se lee con un cursor del lado del servidor (`yield_per`), así
+    que la memoria depende del tamaño del bloque y no de la cantidad de filas.
+    Con `compress` cada bloque se comprime con gzip al vuelo. La sesión se
+    abre aquí porque el body se envía después de cerrar las dependencias.
+    """
+    batch_size = batch_size or settings.EXPORT_BATCH_SIZE
+    encoder = RowEncoder(fields, fmt)
+    gzip = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    rows_sent = 0
+
+    async with open_session() as db:
+        result = await db.stream(statement.execution_options(yield_per=batch_size))
+        chunk = encoder.header()
+        async for rows in result.partitions():
+            chunk += encoder.encode(rows)
+            rows_sent += len(rows)
+            if gzip is not None:
+                chunk = gzip.compress(chunk)
+            if chunk:
+                yield chunk
+            chunk = b""
+        if gzip is not None:
+            yield gzip.compress(chunk) + gzip.flush()
+        elif chunk:
+            yield chunk
+
+    logger.info(f"Export finished: {rows_sent} rows ({fmt.value})")
@@ -1,22 +1,49 @@
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, NamedTuple, Optional
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
 from app.db.influxdb import influx_db
+from app.models.metric_outbox import MetricOutbox
 from app.core.logging import get_logger
 
 logger = get_logger("metrics")
 
+
+class MetricEvent(NamedTuple):
+    """
+    Evento de métrica listo para el outbox o InfluxDB.
+    """
+    measurement: str
+    tags: dict
+    fields: dict
+
+
 class MetricsService:
     """
     Servicio para registrar métricas en InfluxDB.
+
+    Si se pasa la sesión `db`, el evento se guarda en el outbox dentro de la
+    transacción del handler (sin I/O de red) y el OutboxRelay lo envía a
+    InfluxDB después del commit. Sin sesión se encola en el writer de InfluxDB.
     """
 
     @staticmethod
-    def record_ticket_created(ticket_id: int, creator_id: int, priority: str):
+    def _record(measurement: str, tags: dict, fields: dict, db: Optional[Session] = None):
+        """
+        Guardar el evento en el outbox o encolarlo en el writer de InfluxDB.
+        """
+        if db is not None:
+            db.add(MetricOutbox(measurement=measurement, tags=tags, fields=fields))
+        else:
+            influx_db.write_point(measurement=measurement, tags=tags, fields=fields)
+
+    @staticmethod
+    def record_ticket_created(ticket_id: int, creator_id: int, priority: str, db: Optional[Session] = None):
         """
         Registrar la creación de un ticket.
         """
         try:
-            influx_db.write_point(
+            MetricsService._record(
                 measurement="ticket_created",
                 tags={
                     "priority": priority,
@@ -25,84 +52,156 @@ class MetricsService:
                 fields={
                     "ticket_id": ticket_id,
                     "count": 1
-                }
+                },
+                db=db
             )
             logger.info(f"Metric recorded: ticket_created - ID {ticket_id}")
         except Exception as e:
             logger.error(f"Failed to record ticket_created metric: {e}")
 
     @staticmethod
-    def record_ticket_status_change(ticket_id: int, old_status: str, new_status: str, user_id: int):
+    def record_tickets_imported(creator_id: int, counts: Dict[str, int], db: Optional[Session] = None):
+        """
+        Registrar los tickets creados por una importación masiva: un punto
+        ticket_created por prioridad con la cantidad en `count` (puntos por
+        ticket con la misma serie y timestamp se pisarían en InfluxDB).
+        """
+        try:
+            for priority, count in counts.items():
+                MetricsService._record(
+                    measurement="ticket_created",
+                    tags={
+                        "priority": priority,
+                        "creator_id": str(creator_id),
+                        "source": "import"
+                    },
+                    fields={
+                        "count": count
+                    },
+                    db=db
+                )
+            logger.info(f"Metric recorded: ticket_created - {sum(counts.values())} imported")
+        except Exception as e:
+            logger.error(f"Failed to record imported tickets metric: {e}")
+
+    @staticmethod
+    def ticket_status_change_event(ticket_id: int, old_status: str, new_status: str, user_id: int) -> MetricEvent:
+        """
+        Evento del cambio de estado de un ticket.
+        """
+        return MetricEvent(
+            measurement="ticket_status_change",
+            tags={
+                "old_status": old_status,
+                "new_status": new_status,
+                "user_id": str(user_id)
+            },
+            fields={
+                "ticket_id": ticket_id,
+                "count": 1
+            }
+        )
+
+    @staticmethod
+    def record_ticket_status_change(ticket_id: int, old_status: str, new_status: str, user_id: int, db: Optional[Session] = None):
         """
         Registrar el cambio de estado de un ticket.
         """
         try:
-            influx_db.write_point(
-                measurement="ticket_status_change",
-                tags={
-                    "old_status": old_status,
-                    "new_status": new_status,
-                    "user_id": str(user_id)
-                },
-                fields={
-                    "ticket_id": ticket_id,
-                    "count": 1
-                }
-            )
+            event = MetricsService.ticket_status_change_event(ticket_id, old_status, new_status, user_id)
+            MetricsService._record(*event, db=db)
             logger.info(f"Metric recorded: status change {old_status} -> {new_status}")
         except Exception as e:
             logger.error(f"Failed to record status change metric: {e}")
 
     @staticmethod
-    def record_ticket_assigned(ticket_id: int, agent_id: int, assigned_by_id: int):
+    def ticket_assigned_event(ticket_id: int, agent_id: int, assigned_by_id: int) -> MetricEvent:
+        """
+        Evento de la asignación de un ticket a un agente.
+        """
+        return MetricEvent(
+            measurement="ticket_assigned",
+            tags={
+                "assigned_agent_id": str(agent_id),
+                "assigned_by_id": str(assigned_by_id)
+            },
+            fields={
+                "ticket_id": ticket_id,
+                "count": 1
+            }
+        )
+
+    @staticmethod
+    def record_ticket_assigned(ticket_id: int, agent_id: int, assigned_by_id: int, db: Optional[Session] = None):
         """
         Registrar la asignación de un ticket a un agente.
         """
         try:
-            influx_db.write_point(
-                measurement="ticket_assigned",
-                tags={
-                    "assigned_agent_id": str(agent_id),
-                    "assigned_by_id": str(assigned_by_id)
-                },
-                fields={
-                    "ticket_id": ticket_id,
-                    "count": 1
-                }
-            )
+            event = MetricsService.ticket_assigned_event(ticket_id, agent_id, assigned_by_id)
+            MetricsService._record(*event, db=db)
             logger.info(f"Metric recorded: ticket assigned to agent {agent_id}")
         except Exception as e:
             logger.error(f"Failed to record ticket assigned metric: {e}")
 
     @staticmethod
-    def record_ticket_resolved(ticket_id: int, agent_id: Optional[int], resolution_time_seconds: int):
+    def ticket_resolved_event(ticket_id: int, agent_id: Optional[int], resolution_time_seconds: int) -> MetricEvent:
+        """
+        Evento de la resolución de un ticket.
+        """
+        tags = {"ticket_id": str(ticket_id)}
+        if agent_id:
+            tags["agent_id"] = str(agent_id)
+
+        return MetricEvent(
+            measurement="ticket_resolved",
+            tags=tags,
+            fields={
+                "resolution_time_seconds": resolution_time_seconds,
+                "count": 1
+            }
+        )
+
+    @staticmethod
+    def record_ticket_resolved(ticket_id: int, agent_id: Optional[int], resolution_time_seconds: int, db: Optional[Session] = None):
         """
         Registrar la resolución de un ticket.
         """
         try:
-            tags = {"ticket_id": str(ticket_id)}
-            if agent_id:
-                tags["agent_id"] = str(agent_id)
-
-            influx_db.write_point(
-                measurement="ticket_resolved",
-                tags=tags,
-                fields={
-                    "resolution_time_seconds": resolution_time_seconds,
-                    "count": 1
-                }
-            )
+            event = MetricsService.ticket_resolved_event(ticket_id, agent_id, resolution_time_seconds)
+            MetricsService._record(*event, db=db)
             logger.info(f"Metric recorded: ticket resolved - ID {ticket_id}")
         except Exception as e:
             logger.error(f"Failed to record ticket resolved metric: {e}")
 
     @staticmethod
-    def record_comment_created(ticket_id: int, author_id: int):
+    def record_events(events: List[MetricEvent], db: Optional[Session] = None):
+        """
+        Registrar varios eventos con una sola escritura: un INSERT multi-fila
+        en el outbox (o encolarlos en el writer de InfluxDB sin sesión).
+
+        Cada evento recibe un timestamp distinto (1 µs de diferencia) para que
+        los de la misma serie no se pisen en InfluxDB.
+        """
+        if not events:
+            return
+        if db is not None:
+            now = datetime.now(timezone.utc)
+            db.execute(insert(MetricOutbox), [
+                {**event._asdict(), "created_at": now + timedelta(microseconds=i)}
+                for i, event in enumerate(events)
+            ])
+        else:
+            for event in events:
+                influx_db.write_point(*event)
+        logger.info(f"Metrics recorded: {len(events)} events")
+
+    @staticmethod
+    def record_comment_created(ticket_id: int, author_id: int, db: Optional[Session] = None):
         """
         Registrar la creación de un comentario.
         """
         try:
-            influx_db.write_point(
+            MetricsService._record(
                 measurement="comment_created",
                 tags={
                     "ticket_id": str(ticket_id),
@@ -110,11 +209,12 @@ class MetricsService:
                 },
                 fields={
                     "count": 1
-                }
+                },
+                db=db
             )
             logger.info(f"Metric recorded: comment created on ticket {ticket_id}")
         except Exception as e:
             logger.error(f"Failed to record comment created metric: {e}")
 
 # Instancia global del servicio
-metrics_service = MetricsService()
\ No newline at end of file
+metrics_service = MetricsService()
@@ -0,0 +1,125 @@
+import threading
+from typing import Callable, Dict, List
+from influxdb_client import Point
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.influxdb import influx_db
+from app.db.session import SessionLocal
+from app.models.metric_outbox import MetricOutbox
+
+logger = get_logger("outbox_relay")
+
+
+def outbox_to_point(event: MetricOutbox) -> Point:
+    """
+    Convertir un evento del outbox en un punto de InfluxDB con su timestamp original.
+    """
+    point = Point(event.measurement)
+    for key, value in event.tags.items():
+        point = point.tag(key, value)
+    for key, value in event.fields.items():
+        point = point.field(key, value)
+    return point.time(event.created_at)
+
+
+class OutboxRelay:
+    """
+    Worker que vacía la tabla metric_outbox hacia InfluxDB en lotes.
+
+    Cada lote se bloquea con SELECT ... FOR UPDATE SKIP LOCKED, así que
+    varias instancias de la API (o procesos relay) pueden correr en paralelo
+    sin enviar el mismo evento dos veces. Las filas se borran en la misma
+    transacción, solo después de que InfluxDB aceptó el lote.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        write_records: Callable[[List[Point]], None],
+        batch_size: int,
+        poll_interval: float,
+    ):
+        self.session_factory = session_factory
+        self.write_records = write_records
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.relayed = 0
+        self.failed_batches = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def relay_batch(self) -> int:
+        """
+        Enviar un lote del outbox a InfluxDB.
+        Devuelve la cantidad de eventos enviados.
+        """
+        db = self.session_factory()
+        try:
+            events = db.query(MetricOutbox).order_by(
+                MetricOutbox.id
+            ).limit(self.batch_size).with_for_update(skip_locked=True).all()
+
+            if not events:
+                db.rollback()
+                return 0
+
+            self.write_records([outbox_to_point(event) for event in events])
+
+            db.query(MetricOutbox).filter(
+                MetricOutbox.id.in_([event.id for event in events])
+            ).delete(synchronize_session=False)
+            db.commit()
+
+            self.relayed += len(events)
+            return len(events)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def start(self):
+        """
+        Iniciar el relay en un hilo de fondo.
+        """
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="outbox-relay", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """
+        Detener el relay.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Contadores del relay.
+        """
+        return {"relayed": self.relayed, "failed_batches": self.failed_batches}
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                relayed = self.relay_batch()
+            except Exception as e:
+                logger.error(f"Failed to relay metric outbox batch: {e}")
+                self.failed_batches += 1
+                relayed = 0
+
+            # Lote incompleto: el outbox quedó vacío, esperar nuevos eventos
+            if relayed < self.batch_size:
+                self._stop.wait(self.poll_interval)
+
+
+# Instancia global del relay
+outbox_relay = OutboxRelay(
+    session_factory=SessionLocal,
+    write_records=influx_db.write_records,
+    batch_size=settings.OUTBOX_BATCH_SIZE,
+    poll_interval=settings.OUTBOX_POLL_INTERVAL_SECONDS,
+)
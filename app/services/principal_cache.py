@@ -0,0 +1,107 @@
+from typing import Dict, NamedTuple, Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.user import User, UserRole
+
+# Clave de Session.info con los usuarios modificados en la transacción
+CHANGED_USERS_KEY = "principal_cache_changed_users"
+
+
+class UserPrincipal(NamedTuple):
+    """
+    Datos del usuario autenticado que necesitan las decisiones de autorización.
+    """
+    id: int
+    role: UserRole
+    is_active: bool
+
+
+class PrincipalCache:
+    """
+    Cache en proceso de UserPrincipal por id de usuario (TTL corto + LRU).
+
+    Evita la consulta a users en cada request autenticado. Las entradas se
+    invalidan después del commit de cualquier sesión que actualice o borre
+    el usuario; entre procesos distintos el TTL acota cuánto puede quedar
+    desactualizado un rol.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.cache = TTLCache(ttl=ttl, max_entries=max_entries)
+
+    def cached(self, user_id: int) -> Optional[UserPrincipal]:
+        """
+        Principal cacheado del usuario, sin consultar la base.
+        """
+        cached = self.cache.get(str(user_id))
+        return cached[0] if cached is not None else None
+
+    def get(self, db: Session, user_id: int) -> Optional[UserPrincipal]:
+        """
+        Obtener el principal del usuario, consultando la base solo si no está cacheado.
+        """
+        principal = self.cached(user_id)
+        if principal is not None:
+            return principal
+        return self.load(db, user_id)
+
+    def load(self, db: Session, user_id: int) -> Optional[UserPrincipal]:
+        """
+        Leer el principal de la base y cachearlo.
+        """
+        row = db.query(User.id, User.role, User.is_active).filter(User.id == user_id).first()
+        if row is None:
+            return None
+
+        principal = UserPrincipal(*row)
+        self.cache.set(str(principal.id), principal)
+        return principal
+
+    def invalidate(self, user_id: int):
+        """
+        Descartar el principal cacheado de un usuario.
+        """
+        self.cache.delete(str(user_id))
+
+    def clear(self):
+        """
+        Vaciar el cache.
+        """
+        self.cache.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Contadores del cache (hits, misses, invalidaciones).
+        """
+        return self.cache.stats()
+
+
+# Instancia global del cache
+principal_cache = PrincipalCache(
+    ttl = settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    max_entries = settings.PRINCIPAL_CACHE_MAX_ENTRIES
+)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _mark_user_changed(mapper, connection, target: User):
+    # Se invalida recién en el commit, para que un request concurrente no
+    # vuelva a cachear la fila vieja entre el flush y el commit
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(CHANGED_USERS_KEY, set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session: Session):
+    for user_id in session.info.pop(CHANGED_USERS_KEY, ()):
+        principal_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_users(session: Session):
+    session.info.pop(CHANGED_USERS_KEY, None)
@@ -0,0 +1,294 @@
+import html
+import math
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import event, func, select
+from sqlalchemy.dialects.postgresql import ts_headline, websearch_to_tsquery
+from sqlalchemy.orm import Session, object_session
+
+from app.models.comment import Comment
+from app.models.ticket import Ticket
+from app.schemas.ticket import TicketListResponse
+from app.services.analytics_service import dialect_name
+from app.services.principal_cache import UserPrincipal
+from app.services.ticket_access import visible_tickets_filter
+
+# Configuración de texto de PostgreSQL: sin stemming ni stopwords, igual que
+# el índice en memoria (debe coincidir con la migración del search_vector)
+SEARCH_CONFIG = "simple"
+
+# Pesos por campo, los mismos que usa ts_rank_cd para A (título), B
+# (descripción) y C (comentarios)
+TITLE_WEIGHT = 1.0
+DESCRIPTION_WEIGHT = 0.4
+COMMENT_WEIGHT = 0.2
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_STOP = "</mark>"
+HEADLINE_OPTIONS = f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, MaxWords=30, MinWords=10, MaxFragments=2"
+
+# Mismos reemplazos que html.escape, en orden (& primero)
+HTML_ESCAPES = [("&", "&amp;"), ("<", "&lt;"), (">", "&gt;"), ('"', "&quot;"), ("'", "&#x27;")]
+
+SEARCH_FIELDS = list(TicketListResponse.model_fields)
+SEARCH_COLUMNS = [getattr(Ticket, field) for field in SEARCH_FIELDS]
+
+# Clave de Session.info con los tickets cuyo documento cambió en la transacción
+CHANGED_TICKETS_KEY = "search_index_changed_tickets"
+
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """
+    Términos de un texto: palabras en minúsculas.
+    """
+    return _TOKEN.findall(text.lower()) if text else []
+
+
+def escape_html_sql(expression):
+    """
+    Expresión SQL con el texto escapado como HTML (equivalente a html.escape).
+    """
+    for char, entity in HTML_ESCAPES:
+        expression = func.replace(expression, char, entity)
+    return expression
+
+
+def highlight(text: str, terms: Set[str], max_chars: int = 200) -> str:
+    """
+    Fragmento de `text` alrededor del primer término encontrado, con los
+    términos marcados como en ts_headline. El texto se escapa como HTML:
+    las únicas etiquetas del resultado son las marcas.
+    """
+    matches = [m for m in _TOKEN.finditer(text) if m.group().lower() in terms]
+    start = max(matches[0].start() - max_chars // 4, 0) if matches else 0
+    end = min(start + max_chars, len(text))
+
+    parts, position = [], start
+    for match in matches:
+        if match.start() < start or match.end() > end:
+            continue
+        parts.append(html.escape(text[position:match.start()]))
+        parts.append(f"{HIGHLIGHT_START}{html.escape(match.group())}{HIGHLIGHT_STOP}")
+        position = match.end()
+    parts.append(html.escape(text[position:end]))
+    return "".join(parts)
+
+
+class InvertedIndex:
+    """
+    Índice invertido en memoria para bases sin full-text (SQLite en
+    desarrollo y tests).
+
+    Se construye desde la base en la primera búsqueda. Después solo se
+    reindexan los tickets modificados por sesiones ORM (marcados al hacer
+    commit) y los de id mayor al último indexado, que cubre las cargas con
+    INSERT de Core (importación masiva).
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self._terms: Dict[int, Set[str]] = {}
+        self._dirty: Set[int] = set()
+        self._max_id = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def mark_dirty(self, ticket_ids: Iterable[int]):
+        with self._lock:
+            if self._loaded:
+                self._dirty.update(ticket_ids)
+
+    def clear(self):
+        with self._lock:
+            self._postings.clear()
+            self._terms.clear()
+            self._dirty.clear()
+            self._max_id = 0
+            self._loaded = False
+
+    def refresh(self, db: Session):
+        """
+        Poner el índice al día con la base.
+        """
+        with self._lock:
+            if not self._loaded:
+                self._index(db, None)
+                self._loaded = True
+                return
+            dirty, self._dirty = self._dirty, set()
+            self._index(db, dirty)
+
+    def search(self, terms: List[str]) -> Dict[int, float]:
+        """
+        Tickets que contienen todos los términos, con su puntaje.
+        """
+        with self._lock:
+            postings = [self._postings.get(term, {}) for term in set(terms)]
+            if not postings or not all(postings):
+                return {}
+            postings.sort(key=len)
+            ids = set(postings[0]).intersection(*postings[1:])
+            return {ticket_id: sum(posting[ticket_id] for posting in postings) for ticket_id in ids}
+
+    def _index(self, db: Session, ticket_ids: Optional[Set[int]]):
+        # ticket_ids None = todos; además siempre se agregan los tickets nuevos
+        condition = Ticket.id > self._max_id
+        if ticket_ids:
+            condition = condition | Ticket.id.in_(ticket_ids)
+        if ticket_ids is None:
+            condition = None
+
+        tickets = db.query(Ticket.id, Ticket.title, Ticket.description)
+        comments = db.query(Comment.ticket_id, Comment.content)
+        if condition is not None:
+            tickets = tickets.filter(condition)
+            comments = comments.join(Ticket, Ticket.id == Comment.ticket_id).filter(condition)
+
+        comments_by_ticket = defaultdict(list)
+        for ticket_id, content in comments:
+            comments_by_ticket[ticket_id].append(content)
+
+        found = set()
+        for ticket_id, title, description in tickets:
+            found.add(ticket_id)
+            self._remove(ticket_id)
+            weights = defaultdict(float)
+            for weight, texts in (
+                (TITLE_WEIGHT, [title]),
+                (DESCRIPTION_WEIGHT, [description]),
+                (COMMENT_WEIGHT, comments_by_ticket.get(ticket_id, [])),
+            ):
+                for text in texts:
+                    for term in tokenize(text):
+                        weights[term] += weight
+            # Normalizar por largo para no favorecer documentos enormes
+            norm = 1 + math.log(1 + sum(weights.values()))
+            for term, weight in weights.items():
+                self._postings[term][ticket_id] = weight / norm
+            self._terms[ticket_id] = set(weights)
+            self._max_id = max(self._max_id, ticket_id)
+
+        # Los marcados que ya no existen fueron borrados
+        for ticket_id in (ticket_ids or set()) - found:
+            self._remove(ticket_id)
+
+    def _remove(self, ticket_id: int):
+        for term in self._terms.pop(ticket_id, ()):
+            posting = self._postings.get(term)
+            if posting is not None:
+                posting.pop(ticket_id, None)
+                if not posting:
+                    del self._postings[term]
+
+
+class TicketSearchService:
+    """
+    Búsqueda full-text de tickets por título, descripción y comentarios.
+
+    En PostgreSQL usa la columna tickets.search_vector (índice GIN, mantenida
+    por triggers), ordena por ts_rank_cd y resalta con ts_headline solo la
+    página devuelta. En otras bases usa el índice invertido en memoria, que
+    solo acepta palabras sueltas (todas deben aparecer).
+    """
+
+    def __init__(self):
+        self.index = InvertedIndex()
+
+    def search(self, db: Session, text: str, current_user: UserPrincipal, limit: int, offset: int) -> List[dict]:
+        """
+        Tickets visibles para el usuario que coinciden con `text`, del más
+        relevante al menos relevante, con `rank` y `highlight`.
+        """
+        if dialect_name(db) == "postgresql":
+            return self._search_postgres(db, text, current_user, limit, offset)
+        return self._search_in_memory(db, text, current_user, limit, offset)
+
+    @staticmethod
+    def _search_postgres(db: Session, text: str, current_user: UserPrincipal, limit: int, offset: int) -> List[dict]:
+        query = websearch_to_tsquery(SEARCH_CONFIG, text)
+        rank = func.ts_rank_cd(Ticket.search_vector, query).label("rank")
+
+        hits = select(Ticket.id, rank).where(Ticket.search_vector.op("@@")(query))
+        visible = visible_tickets_filter(current_user)
+        if visible is not None:
+            hits = hits.where(visible)
+        hits = hits.order_by(rank.desc(), Ticket.id.desc()).limit(limit).offset(offset).subquery()
+
+        # ts_headline es caro: solo para las filas de la página. El documento
+        # se escapa antes de insertar las marcas (el parser trata las
+        # entidades como tokens propios, así que no cambia qué coincide)
+        document = escape_html_sql(Ticket.title + ". " + Ticket.description)
+        rows = db.execute(
+            select(*SEARCH_COLUMNS, hits.c.rank, ts_headline(SEARCH_CONFIG, document, query, HEADLINE_OPTIONS))
+            .join(hits, hits.c.id == Ticket.id)
+            .order_by(hits.c.rank.desc(), Ticket.id.desc())
+        )
+        return [
+            {**dict(zip(SEARCH_FIELDS, row)), "rank": row[-2], "highlight": row[-1]}
+            for row in rows
+        ]
+
+    def _search_in_memory(self, db: Session, text: str, current_user: UserPrincipal, limit: int, offset: int) -> List[dict]:
+        terms = tokenize(text)
+        if not terms:
+            return []
+        self.index.refresh(db)
+        scores = self.index.search(terms)
+        if not scores:
+            return []
+
+        query = db.query(*SEARCH_COLUMNS, Ticket.description).filter(Ticket.id.in_(scores))
+        visible = visible_tickets_filter(current_user)
+        if visible is not None:
+            query = query.filter(visible)
+        rows = sorted(query, key=lambda row: (-scores[row.id], -row.id))[offset:offset + limit]
+
+        term_set = set(terms)
+        return [
+            {
+                **dict(zip(SEARCH_FIELDS, row)),
+                "rank": scores[row.id],
+                "highlight": highlight(f"{row.title}. {row.description}", term_set),
+            }
+            for row in rows
+        ]
+
+
+# Instancia global del servicio
+ticket_search_service = TicketSearchService()
+
+
+@event.listens_for(Ticket, "after_insert")
+@event.listens_for(Ticket, "after_update")
+@event.listens_for(Ticket, "after_delete")
+def _mark_ticket_changed(mapper, connection, target: Ticket):
+    # El índice en memoria se actualiza recién después del commit
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(CHANGED_TICKETS_KEY, set()).add(target.id)
+
+
+@event.listens_for(Comment, "after_insert")
+@event.listens_for(Comment, "after_update")
+@event.listens_for(Comment, "after_delete")
+def _mark_comment_changed(mapper, connection, target: Comment):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(CHANGED_TICKETS_KEY, set()).add(target.ticket_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _reindex_changed_tickets(session: Session):
+    changed = session.info.pop(CHANGED_TICKETS_KEY, None)
+    if changed:
+        ticket_search_service.index.mark_dirty(changed)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_tickets(session: Session):
+    session.info.pop(CHANGED_TICKETS_KEY, None)
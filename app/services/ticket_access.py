@@ -0,0 +1,193 @@
+from typing import Dict, NamedTuple, Optional
+from sqlalchemy import event, or_
+from sqlalchemy.orm import Session, object_session
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.core.cache import build_cache
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.models.ticket import Ticket
+from app.models.user import UserRole
+from app.services.principal_cache import UserPrincipal
+
+logger = get_logger("ticket_access")
+
+# Clave de Session.info con la proyección nueva de los tickets escritos en la
+# transacción (None = borrado)
+CHANGED_TICKETS_KEY = "ticket_access_changed_tickets"
+
+
+class TicketAccess(NamedTuple):
+    """
+    Columnas del ticket que necesitan las decisiones de autorización.
+    """
+    id: int
+    creator_id: int
+    assigned_agent_id: Optional[int]
+
+    @classmethod
+    def of(cls, ticket) -> "TicketAccess":
+        return cls(ticket.id, ticket.creator_id, ticket.assigned_agent_id)
+
+    def encode(self) -> str:
+        return f"{self.creator_id}:{'' if self.assigned_agent_id is None else self.assigned_agent_id}"
+
+    @classmethod
+    def decode(cls, ticket_id: int, value: str) -> "TicketAccess":
+        creator_id, assigned_agent_id = value.split(":")
+        return cls(ticket_id, int(creator_id), int(assigned_agent_id) if assigned_agent_id else None)
+
+
+def visible_tickets_filter(current_user: UserPrincipal) -> Optional[ColumnElement]:
+    """
+    Condición SQL de los tickets que el usuario puede ver (None = todos):
+    - USER: solo sus propios tickets
+    - AGENT: tickets asignados a él + sin asignar
+    - ADMIN: todos los tickets
+    """
+    if current_user.role == UserRole.AGENT:
+        return or_(Ticket.assigned_agent_id == current_user.id, Ticket.assigned_agent_id.is_(None))
+    if current_user.role == UserRole.USER:
+        return Ticket.creator_id == current_user.id
+    return None
+
+
+def can_view_ticket(current_user: UserPrincipal, ticket) -> bool:
+    """
+    Misma regla que visible_tickets_filter para un ticket ya leído (el
+    modelo o su TicketAccess). Ver un ticket habilita ver y crear sus
+    comentarios.
+    """
+    if current_user.role == UserRole.AGENT:
+        return ticket.assigned_agent_id is None or ticket.assigned_agent_id == current_user.id
+    if current_user.role == UserRole.USER:
+        return ticket.creator_id == current_user.id
+    return True
+
+
+def can_edit_ticket(current_user: UserPrincipal, ticket) -> bool:
+    """
+    USER solo edita sus propios tickets; AGENT y ADMIN cualquiera.
+    """
+    return current_user.role != UserRole.USER or ticket.creator_id == current_user.id
+
+
+def can_manage_comment(current_user: UserPrincipal, author_id: int) -> bool:
+    """
+    Solo el autor del comentario o un ADMIN pueden editarlo o eliminarlo.
+    """
+    return author_id == current_user.id or current_user.role == UserRole.ADMIN
+
+
+class TicketAccessCache:
+    """
+    Cache de TicketAccess por id de ticket: en proceso (TTL + LRU) o en
+    Redis, compartido por todos los workers.
+
+    Los endpoints de comentarios solo necesitan saber si el ticket existe y
+    a quién pertenece: con el cache se evita leer la fila completa en cada
+    request. Es write-through: al hacer commit, las sesiones ORM que crean,
+    modifican o borran un ticket dejan la proyección nueva en el cache
+    (los UPDATE de Core llaman a `put`). Con el cache en proceso, en los
+    demás workers el TTL acota cuánto puede quedar desactualizada una
+    asignación; con Redis la escritura llega a todos. Si el backend falla,
+    se lee la base.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def get(self, db: Session, ticket_id: int) -> Optional[TicketAccess]:
+        """
+        Proyección del ticket, consultando la base solo si no está cacheada.
+        None si el ticket no existe.
+        """
+        cached = None
+        try:
+            cached = self.backend.get(str(ticket_id))
+        except Exception as e:
+            logger.error(f"Failed to read ticket access cache: {e}")
+        if cached is not None:
+            return TicketAccess.decode(ticket_id, cached[0])
+
+        row = (
+            db.query(Ticket.id, Ticket.creator_id, Ticket.assigned_agent_id)
+            .filter(Ticket.id == ticket_id)
+            .first()
+        )
+        if row is None:
+            return None
+
+        access = TicketAccess(*row)
+        self.put(access)
+        return access
+
+    def put(self, access: TicketAccess):
+        """
+        Guardar la proyección vigente de un ticket.
+        """
+        try:
+            self.backend.set(str(access.id), access.encode())
+        except Exception as e:
+            logger.error(f"Failed to write ticket access cache: {e}")
+
+    def invalidate(self, ticket_id: int):
+        """
+        Descartar la proyección cacheada de un ticket.
+        """
+        try:
+            self.backend.delete(str(ticket_id))
+        except Exception as e:
+            logger.error(f"Failed to invalidate ticket access cache: {e}")
+
+    def clear(self):
+        """
+        Vaciar el cache.
+        """
+        self.backend.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Contadores del cache (hits, misses, invalidaciones).
+        """
+        return self.backend.stats()
+
+
+# Instancia global del cache
+ticket_access_cache = TicketAccessCache(build_cache(
+    ttl = settings.TICKET_ACCESS_CACHE_TTL_SECONDS,
+    max_entries = settings.TICKET_ACCESS_CACHE_MAX_ENTRIES,
+    redis_url = settings.TICKET_ACCESS_CACHE_REDIS_URL,
+    prefix = "ticket_access"
+))
+
+
+@event.listens_for(Ticket, "after_insert")
+@event.listens_for(Ticket, "after_update")
+def _mark_ticket_written(mapper, connection, target: Ticket):
+    # Se escribe en el cache recién en el commit: un rollback no debe dejar
+    # una asignación que nunca existió
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(CHANGED_TICKETS_KEY, {})[target.id] = TicketAccess.of(target)
+
+
+@event.listens_for(Ticket, "after_delete")
+def _mark_ticket_deleted(mapper, connection, target: Ticket):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(CHANGED_TICKETS_KEY, {})[target.id] = None
+
+
+@event.listens_for(Session, "after_commit")
+def _write_changed_tickets(session: Session):
+    for ticket_id, access in session.info.pop(CHANGED_TICKETS_KEY, {}).items():
+        if access is None:
+            ticket_access_cache.invalidate(ticket_id)
+        else:
+            ticket_access_cache.put(access)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_tickets(session: Session):
+    session.info.pop(CHANGED_TICKETS_KEY, None)
@@ -0,0 +1,233 @@
+import csv
+import enum
+import io
+import itertools
+from collections import Counter
+from datetime import datetime, timezone
+from typing import IO, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.bulk import bulk_insert
+from app.models.ticket import Ticket, TicketStatus
+from app.models.ticket_daily_stats import UNASSIGNED_AGENT_ID
+from app.schemas.ticket import TicketCreate
+from app.services.analytics_cache import analytics_cache
+from app.services.metrics_service import metrics_service
+from app.services.ticket_stats_service import TicketSnapshot, ticket_stats_service
+
+logger = get_logger("ticket_import")
+
+# Columnas que se cargan; id, updated_at y resolved_at quedan con su default
+IMPORT_COLUMNS = ["title", "description", "status", "priority", "creator_id", "created_at"]
+
+
+class FileFormat(str, enum.Enum):
+    """
+    Formatos de archivo de la importación y la exportación.
+    """
+    NDJSON = "ndjson"  # Un objeto JSON por línea
+    CSV = "csv"        # Con encabezado: title,description,priority
+
+    @classmethod
+    def from_filename(cls, filename: Optional[str]) -> Optional["FileFormat"]:
+        """
+        Deducir el formato de la extensión del archivo.
+        """
+        extension = (filename or "").rsplit(".", 1)[-1].lower()
+        if extension in ("ndjson", "jsonl"):
+            return cls.NDJSON
+        if extension == "csv":
+            return cls.CSV
+        return None
+
+
+class RowError(NamedTuple):
+    """
+    Fila rechazada: número de línea en el archivo y motivo.
+    """
+    line: int
+    error: str
+
+
+class ValidatedChunk(NamedTuple):
+    """
+    Bloque de filas validadas con TicketCreate, listo para cargar.
+    """
+    tickets: List[TicketCreate]
+    lines: List[int]
+    errors: List[RowError]
+
+
+class ImportResult:
+    """
+    Totales de una importación. Guarda como máximo `max_errors` errores
+    para que la respuesta no crezca con el archivo.
+    """
+    def __init__(self, max_errors: int):
+        self.max_errors = max_errors
+        self.imported = 0
+        self.failed = 0
+        self.errors: List[RowError] = []
+
+    def add_errors(self, errors: Iterable[RowError]):
+        for error in errors:
+            self.failed += 1
+            if len(self.errors) < self.max_errors:
+                self.errors.append(error)
+
+    def summary(self) -> dict:
+        return {
+            "imported": self.imported,
+            "failed": self.failed,
+            "errors": [error._asdict() for error in self.errors],
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc']) or 'fila'}: {detail['msg']}"
+        for detail in error.errors()
+    )
+
+
+class TicketImportService:
+    """
+    Importación masiva de tickets desde NDJSON o CSV.
+
+    El archivo se lee en streaming y se procesa en bloques de `chunk_size`
+    filas: cada bloque se valida con TicketCreate, se carga con COPY en
+    PostgreSQL (executemany en otras bases), actualiza el rollup con un
+    upsert por clave y registra una métrica agregada por prioridad, todo en
+    una transacción por bloque. Las filas inválidas se informan con su
+    número de línea sin abortar el resto.
+    """
+
+    def __init__(self, chunk_size: int, max_errors: int):
+        self.chunk_size = chunk_size
+        self.max_errors = max_errors
+
+    # ----------------------------------------
+    # Lectura y validación
+    # ----------------------------------------
+    @staticmethod
+    def read_rows(file: IO[bytes], fmt: FileFormat) -> Iterator[Tuple[int, object]]:
+        """
+        Recorrer el archivo devolviendo (línea, fila). La fila es el texto
+        JSON en NDJSON o un dict en CSV.
+        """
+        text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+        if fmt == FileFormat.NDJSON:
+            for line_number, line in enumerate(text, start=1):
+                if line.strip():
+                    yield line_number, line
+        else:
+            reader = csv.DictReader(text)
+            for row in reader:
+                # Celdas vacías: usar el default del schema (p. ej. priority)
+                yield reader.line_num, {key: value for key, value in row.items() if key and value}
+
+    def next_chunk(self, rows: Iterator[Tuple[int, object]]) -> Optional[ValidatedChunk]:
+        """
+        Validar las siguientes `chunk_size` filas. None al terminar el archivo.
+        """
+        chunk = ValidatedChunk([], [], [])
+        count = 0
+        try:
+            for line_number, row in itertools.islice(rows, self.chunk_size):
+                count += 1
+                try:
+                    if isinstance(row, str):
+                        ticket = TicketCreate.model_validate_json(row)
+                    else:
+                        ticket = TicketCreate.model_validate(row)
+                except ValidationError as e:
+                    chunk.errors.append(RowError(line_number, _validation_message(e)))
+                    continue
+                chunk.tickets.append(ticket)
+                chunk.lines.append(line_number)
+        except (UnicodeDecodeError, csv.Error) as e:
+            # El archivo no se puede seguir leyendo: cortar aquí
+            chunk.errors.append(RowError(0, f"Archivo inválido: {e}"))
+            return chunk
+        return chunk if count else None
+
+    # ----------------------------------------
+    # Carga
+    # ----------------------------------------
+    def load_chunk(self, db: Session, chunk: ValidatedChunk, creator_id: int) -> List[RowError]:
+        """
+        Cargar las filas válidas del bloque en una transacción. Si la base
+        rechaza el bloque, todas sus filas se informan como error.
+        """
+        if not chunk.tickets:
+            return []
+
+        created_at = datetime.now(timezone.utc)
+        records = [
+            (ticket.title, ticket.description, TicketStatus.OPEN, ticket.priority, creator_id, created_at)
+            for ticket in chunk.tickets
+        ]
+        by_priority = Counter(ticket.priority for ticket in chunk.tickets)
+        snapshots = Counter({
+            TicketSnapshot(created_at.date(), TicketStatus.OPEN, priority, UNASSIGNED_AGENT_ID, None): count
+            for priority, count in by_priority.items()
+        })
+
+        try:
+            self._insert(db, records)
+            ticket_stats_service.apply_many(db, snapshots)
+            metrics_service.record_tickets_imported(
+                creator_id=creator_id,
+                counts={priority.value: count for priority, count in by_priority.items()},
+                db=db
+            )
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Ticket import chunk failed: {e}")
+            return [RowError(line, "Error de base de datos al cargar el bloque") for line in chunk.lines]
+
+        analytics_cache.invalidate_ticket_change(None, next(iter(snapshots)))
+        return []
+
+    @staticmethod
+    def _insert(db: Session, records: List[tuple]):
+        """
+        COPY en PostgreSQL (misma transacción), executemany en otras bases.
+        """
+        bulk_insert(db, Ticket.__table__, IMPORT_COLUMNS, records)
+
+    def import_file(self, db: Session, file: IO[bytes], fmt: FileFormat, creator_id: int) -> ImportResult:
+        """
+        Importar un archivo completo con una sesión sync (scripts).
+        """
+        result = ImportResult(self.max_errors)
+        rows = self.read_rows(file, fmt)
+        while (chunk := self.next_chunk(rows)) is not None:
+            self.apply_chunk(db, chunk, creator_id, result)
+        return result
+
+    def apply_chunk(self, db: Session, chunk: ValidatedChunk, creator_id: int, result: ImportResult):
+        """
+        Cargar un bloque y sumar sus totales al resultado.
+        """
+        result.add_errors(chunk.errors)
+        load_errors = self.load_chunk(db, chunk, creator_id)
+        if load_errors:
+            result.add_errors(load_errors)
+        else:
+            result.imported += len(chunk.tickets)
+        # Ordenar por línea: los errores de carga llegan después de los de validación
+        result.errors.sort(key=lambda error: error.line)
+
+
+# Instancia global del servicio
+ticket_import_service = TicketImportService(
+    chunk_size = settings.TICKET_IMPORT_CHUNK_SIZE,
+    max_errors = settings.TICKET_IMPORT_MAX_ERRORS
+)
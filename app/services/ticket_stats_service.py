@@ -0,0 +1,182 @@
+from datetime import date, datetime, timezone
+from typing import Mapping, NamedTuple, Optional
+from sqlalchemy import case, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.models.ticket import Ticket, TicketStatus, TicketPriority
+from app.models.ticket_daily_stats import TicketDailyStats, UNASSIGNED_AGENT_ID
+from app.models.ticket_resolution_histogram import (
+    TicketResolutionHistogram,
+    RESOLUTION_BUCKET_BOUNDS,
+    resolution_bucket
+)
+from app.services.analytics_service import dialect_name, resolution_seconds_expr
+
+ROLLUP_KEY = ["day", "status", "priority", "agent_id"]
+ROLLUP_VALUES = ["ticket_count", "resolution_count", "resolution_seconds_sum"]
+HISTOGRAM_KEY = ["agent_id", "bucket"]
+
+
+def _as_utc(value: datetime) -> datetime:
+    """
+    Normalizar un datetime a UTC (SQLite devuelve datetimes sin zona).
+    """
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+class TicketSnapshot(NamedTuple):
+    """
+    Aporte de un ticket al rollup: su clave y su tiempo de resolución.
+    """
+    day: date
+    status: TicketStatus
+    priority: TicketPriority
+    agent_id: int
+    resolution_seconds: Optional[float]
+
+
+class TicketStatsService:
+    """
+    Mantenimiento del rollup ticket_daily_stats y del histograma de tiempos
+    de resolución (ticket_resolution_histogram).
+
+    Los handlers toman un snapshot del ticket antes y después del cambio y
+    aplican la diferencia (-1 en la clave vieja, +1 en la nueva) con un
+    upsert atómico dentro de la misma transacción.
+    """
+
+    @staticmethod
+    def snapshot(ticket: Ticket) -> TicketSnapshot:
+        """
+        Calcular el aporte actual de un ticket al rollup.
+        """
+        resolution_seconds = None
+        if ticket.status == TicketStatus.RESOLVED and ticket.resolved_at is not None:
+            resolution_seconds = (_as_utc(ticket.resolved_at) - _as_utc(ticket.created_at)).total_seconds()
+
+        return TicketSnapshot(
+            day = _as_utc(ticket.created_at).date(),
+            status = ticket.status,
+            priority = ticket.priority,
+            agent_id = ticket.assigned_agent_id or UNASSIGNED_AGENT_ID,
+            resolution_seconds = resolution_seconds
+        )
+
+    def apply(self, db: Session, before: Optional[TicketSnapshot], after: Optional[TicketSnapshot]):
+        """
+        Mover el aporte de un ticket de `before` a `after`.
+        None en `before` es una creación y None en `after` un borrado.
+        """
+        if before == after:
+            return
+        if before is not None:
+            self._increment(db, before, -1)
+        if after is not None:
+            self._increment(db, after, 1)
+
+    def apply_many(self, db: Session, deltas: Mapping[TicketSnapshot, int]):
+        """
+        Aplicar cambios en bloque: un upsert por clave con la cantidad de
+        tickets que entran (positiva) o salen (negativa) de ella.
+        """
+        for snapshot, delta in deltas.items():
+            if delta:
+                self._increment(db, snapshot, delta)
+
+    @staticmethod
+    def _increment(db: Session, snapshot: TicketSnapshot, delta: int):
+        resolved = snapshot.resolution_seconds is not None
+        insert = pg_insert if dialect_name(db) == "postgresql" else sqlite_insert
+        stmt = insert(TicketDailyStats).values(
+            day = snapshot.day,
+            status = snapshot.status,
+            priority = snapshot.priority,
+            agent_id = snapshot.agent_id,
+            ticket_count = delta,
+            resolution_count = delta if resolved else 0,
+            resolution_seconds_sum = delta * snapshot.resolution_seconds if resolved else 0.0
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements = ROLLUP_KEY,
+            set_ = {
+                column: getattr(TicketDailyStats, column) + getattr(stmt.excluded, column)
+                for column in ROLLUP_VALUES
+            }
+        )
+        db.execute(stmt)
+
+        if resolved:
+            stmt = insert(TicketResolutionHistogram).values(
+                agent_id = snapshot.agent_id,
+                bucket = resolution_bucket(snapshot.resolution_seconds),
+                ticket_count = delta
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements = HISTOGRAM_KEY,
+                set_ = {"ticket_count": TicketResolutionHistogram.ticket_count + stmt.excluded.ticket_count}
+            )
+            db.execute(stmt)
+
+    @staticmethod
+    def backfill(db: Session) -> int:
+        """
+        Reconstruir el rollup y el histograma desde la tabla tickets, con un
+        INSERT ... SELECT cada uno. Devuelve la cantidad de filas del rollup.
+        """
+        if dialect_name(db) == "postgresql":
+            day = func.date(func.timezone("UTC", Ticket.created_at))
+        else:
+            day = func.date(Ticket.created_at)
+
+        resolution_seconds = case(
+            (
+                (Ticket.status == TicketStatus.RESOLVED) & Ticket.resolved_at.isnot(None),
+                resolution_seconds_expr(db)
+            ),
+            else_ = None
+        )
+        agent_id = func.coalesce(Ticket.assigned_agent_id, UNASSIGNED_AGENT_ID)
+
+        source = select(
+            day,
+            Ticket.status,
+            Ticket.priority,
+            agent_id,
+            func.count(Ticket.id),
+            func.count(resolution_seconds),
+            func.coalesce(func.sum(resolution_seconds), 0.0)
+        ).group_by(day, Ticket.status, Ticket.priority, agent_id)
+
+        # Misma cubeta que resolution_bucket: la primera cota mayor al valor
+        seconds = resolution_seconds_expr(db)
+        bucket = case(
+            *[(seconds < bound, index) for index, bound in enumerate(RESOLUTION_BUCKET_BOUNDS)],
+            else_ = len(RESOLUTION_BUCKET_BOUNDS)
+        )
+        histogram = select(
+            agent_id,
+            bucket,
+            func.count(Ticket.id)
+        ).filter(
+            Ticket.status == TicketStatus.RESOLVED,
+            Ticket.resolved_at.isnot(None)
+        ).group_by(agent_id, bucket)
+
+        db.query(TicketDailyStats).delete(synchronize_session=False)
+        db.query(TicketResolutionHistogram).delete(synchronize_session=False)
+        db.execute(
+            TicketDailyStats.__table__.insert().from_select(ROLLUP_KEY + ROLLUP_VALUES, source)
+        )
+        db.execute(
+            TicketResolutionHistogram.__table__.insert().from_select(HISTOGRAM_KEY + ["ticket_count"], histogram)
+        )
+        db.commit()
+        return db.query(TicketDailyStats).count()
+
+
+# Instancia global del servicio
+ticket_stats_service = TicketStatsService()
@@ -16,6 +16,9 @@ from app.models.user import User
 # TODO: Uncomment when models are created
 from app.models.ticket import Ticket
 from app.models.comment import Comment
+from app.models.metric_outbox import MetricOutbox
+from app.models.ticket_daily_stats import TicketDailyStats
+from app.models.ticket_resolution_histogram import TicketResolutionHistogram
 # from app.models.activity_log import ActivityLog
 
 # this is the Alembic Config object
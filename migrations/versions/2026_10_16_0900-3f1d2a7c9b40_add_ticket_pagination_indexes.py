@@ -0,0 +1,32 @@
+"""Add ticket pagination indexes
+
+Revision ID: 3f1d2a7c9b40
+Revises: 7c4bb77cc756
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1d2a7c9b40'
+down_revision = '7c4bb77cc756'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_tickets_created_at_id', 'tickets', ['created_at', 'id'], unique=False)
+    op.create_index('ix_tickets_creator_id_created_at_id', 'tickets', ['creator_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_tickets_assigned_agent_id_created_at_id', 'tickets', ['assigned_agent_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_tickets_status_created_at_id', 'tickets', ['status', 'created_at', 'id'], unique=False)
+    op.create_index('ix_tickets_priority_created_at_id', 'tickets', ['priority', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tickets_priority_created_at_id', table_name='tickets')
+    op.drop_index('ix_tickets_status_created_at_id', table_name='tickets')
+    op.drop_index('ix_tickets_assigned_agent_id_created_at_id', table_name='tickets')
+    op.drop_index('ix_tickets_creator_id_created_at_id', table_name='tickets')
+    op.drop_index('ix_tickets_created_at_id', table_name='tickets')
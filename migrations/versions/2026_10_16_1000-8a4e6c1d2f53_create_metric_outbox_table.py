@@ -0,0 +1,31 @@
+"""Create metric_outbox table
+
+Revision ID: 8a4e6c1d2f53
+Revises: 3f1d2a7c9b40
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8a4e6c1d2f53'
+down_revision = '3f1d2a7c9b40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('metric_outbox',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('measurement', sa.String(length=100), nullable=False),
+    sa.Column('tags', sa.JSON(), nullable=False),
+    sa.Column('fields', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('metric_outbox')
@@ -0,0 +1,60 @@
+"""Create ticket_daily_stats table
+
+Revision ID: b27f90d4e1a6
+Revises: 8a4e6c1d2f53
+Create Date: 2026-10-16 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'b27f90d4e1a6'
+down_revision = '8a4e6c1d2f53'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Reuse the enum types created with the tickets table
+    ticketstatus = postgresql.ENUM('OPEN', 'IN_PROGRESS', 'PENDING', 'RESOLVED', 'CLOSED', name='ticketstatus', create_type=False)
+    ticketpriority = postgresql.ENUM('LOW', 'MEDIUM', 'HIGH', 'CRITICAL', name='ticketpriority', create_type=False)
+
+    op.create_table('ticket_daily_stats',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('status', ticketstatus, nullable=False),
+    sa.Column('priority', ticketpriority, nullable=False),
+    sa.Column('agent_id', sa.Integer(), nullable=False),
+    sa.Column('ticket_count', sa.Integer(), nullable=False),
+    sa.Column('resolution_count', sa.Integer(), nullable=False),
+    sa.Column('resolution_seconds_sum', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('day', 'status', 'priority', 'agent_id', name='uq_ticket_daily_stats_key')
+    )
+    op.create_index(op.f('ix_ticket_daily_stats_day'), 'ticket_daily_stats', ['day'], unique=False)
+
+    # Backfill from the existing tickets (same rules as TicketStatsService.backfill):
+    # one row per UTC creation day, status, priority and agent (0 = unassigned)
+    op.execute("""
+        INSERT INTO ticket_daily_stats
+            (day, status, priority, agent_id, ticket_count, resolution_count, resolution_seconds_sum)
+        SELECT
+            (created_at AT TIME ZONE 'UTC')::date,
+            status,
+            priority,
+            coalesce(assigned_agent_id, 0),
+            count(*),
+            count(*) FILTER (WHERE status = 'RESOLVED' AND resolved_at IS NOT NULL),
+            coalesce(sum(extract(epoch FROM resolved_at - created_at))
+                FILTER (WHERE status = 'RESOLVED' AND resolved_at IS NOT NULL), 0)
+        FROM tickets
+        GROUP BY 1, 2, 3, 4
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_ticket_daily_stats_day'), table_name='ticket_daily_stats')
+    op.drop_table('ticket_daily_stats')
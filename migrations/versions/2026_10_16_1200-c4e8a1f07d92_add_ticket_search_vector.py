@@ -0,0 +1,88 @@
+"""Add ticket full-text search vector
+
+Revision ID: c4e8a1f07d92
+Revises: b27f90d4e1a6
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e8a1f07d92'
+down_revision = 'b27f90d4e1a6'
+branch_labels = None
+depends_on = None
+
+# Must match SEARCH_CONFIG in app/services/search_service.py
+SEARCH_CONFIG = 'simple'
+
+
+def upgrade() -> None:
+    op.add_column('tickets', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+
+    # The triggers look up the comments of a ticket
+    op.create_index('ix_comments_ticket_id_created_at_id', 'comments', ['ticket_id', 'created_at', 'id'], unique=False)
+
+    # Weighted document: title (A), description (B) and comments (C)
+    op.execute(f"""
+        CREATE FUNCTION ticket_search_vector(title text, description text, comments text) RETURNS tsvector AS $$
+            SELECT setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A')
+                || setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')
+                || setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(comments, '')), 'C')
+        $$ LANGUAGE sql IMMUTABLE
+    """)
+    op.execute("""
+        CREATE FUNCTION ticket_comments_text(ticket integer) RETURNS text AS $$
+            SELECT string_agg(content, ' ' ORDER BY created_at, id) FROM comments WHERE ticket_id = ticket
+        $$ LANGUAGE sql STABLE
+    """)
+    op.execute("""
+        CREATE FUNCTION tickets_search_vector_trigger() RETURNS trigger AS $$
+        BEGIN
+            -- A new ticket has no comments yet
+            NEW.search_vector := ticket_search_vector(
+                NEW.title, NEW.description,
+                CASE WHEN TG_OP = 'INSERT' THEN NULL ELSE ticket_comments_text(NEW.id) END
+            );
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER tickets_search_vector_update
+        BEFORE INSERT OR UPDATE OF title, description ON tickets
+        FOR EACH ROW EXECUTE FUNCTION tickets_search_vector_trigger()
+    """)
+    op.execute("""
+        CREATE FUNCTION comments_search_vector_trigger() RETURNS trigger AS $$
+        BEGIN
+            UPDATE tickets SET search_vector = ticket_search_vector(title, description, ticket_comments_text(id))
+            WHERE id = CASE WHEN TG_OP = 'DELETE' THEN OLD.ticket_id ELSE NEW.ticket_id END;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER comments_search_vector_update
+        AFTER INSERT OR UPDATE OF content OR DELETE ON comments
+        FOR EACH ROW EXECUTE FUNCTION comments_search_vector_trigger()
+    """)
+
+    # Backfill existing tickets, then build the index in one pass
+    op.execute("UPDATE tickets SET search_vector = ticket_search_vector(title, description, ticket_comments_text(id))")
+    op.create_index('ix_tickets_search_vector', 'tickets', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tickets_search_vector', table_name='tickets', postgresql_using='gin')
+    op.execute("DROP TRIGGER comments_search_vector_update ON comments")
+    op.execute("DROP FUNCTION comments_search_vector_trigger()")
+    op.execute("DROP TRIGGER tickets_search_vector_update ON tickets")
+    op.execute("DROP FUNCTION tickets_search_vector_trigger()")
+    op.execute("DROP FUNCTION ticket_comments_text(integer)")
+    op.execute("DROP FUNCTION ticket_search_vector(text, text, text)")
+    op.drop_column('tickets', 'search_vector')
+    op.drop_index('ix_comments_ticket_id_created_at_id', table_name='comments')
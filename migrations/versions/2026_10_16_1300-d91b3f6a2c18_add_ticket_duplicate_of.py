@@ -0,0 +1,28 @@
+"""Add ticket duplicate_of_id
+
+Revision ID: d91b3f6a2c18
+Revises: c4e8a1f07d92
+Create Date: 2026-10-16 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd91b3f6a2c18'
+down_revision = 'c4e8a1f07d92'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('tickets', sa.Column('duplicate_of_id', sa.Integer(), nullable=True))
+    op.create_foreign_key('fk_tickets_duplicate_of_id', 'tickets', 'tickets', ['duplicate_of_id'], ['id'], ondelete='SET NULL')
+    op.create_index(op.f('ix_tickets_duplicate_of_id'), 'tickets', ['duplicate_of_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_tickets_duplicate_of_id'), table_name='tickets')
+    op.drop_constraint('fk_tickets_duplicate_of_id', 'tickets', type_='foreignkey')
+    op.drop_column('tickets', 'duplicate_of_id')
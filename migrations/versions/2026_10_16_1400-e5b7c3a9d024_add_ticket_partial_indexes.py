@@ -0,0 +1,46 @@
+"""Add partial indexes for hot ticket queries
+
+Revision ID: e5b7c3a9d024
+Revises: d91b3f6a2c18
+Create Date: 2026-10-16 14:00:00.000000
+
+The indexes are built with CREATE INDEX CONCURRENTLY so the migration can
+run against a live database without blocking writes on tickets. That
+cannot happen inside a transaction, hence the autocommit blocks; if a
+build fails it leaves an INVALID index that must be dropped before
+retrying.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b7c3a9d024'
+down_revision = 'd91b3f6a2c18'
+branch_labels = None
+depends_on = None
+
+# (name, columns, predicate); enums are stored by name
+INDEXES = [
+    ('ix_tickets_unassigned_created_at_id', ['created_at', 'id'], "assigned_agent_id IS NULL"),
+    ('ix_tickets_open_by_agent', ['assigned_agent_id', 'created_at', 'id'], "status IN ('OPEN', 'IN_PROGRESS', 'PENDING')"),
+    ('ix_tickets_open_roots_id', ['id'], "status = 'OPEN' AND duplicate_of_id IS NULL"),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, columns, predicate in INDEXES:
+            op.create_index(
+                name, 'tickets', columns, unique=False,
+                postgresql_where=sa.text(predicate),
+                postgresql_concurrently=True,
+                if_not_exists=True
+            )
+        op.execute("ANALYZE tickets")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name='tickets', postgresql_concurrently=True, if_exists=True)
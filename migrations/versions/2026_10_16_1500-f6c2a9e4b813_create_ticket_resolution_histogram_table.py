@@ -0,0 +1,52 @@
+"""Create ticket_resolution_histogram table
+
+Revision ID: f6c2a9e4b813
+Revises: e5b7c3a9d024
+Create Date: 2026-10-16 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f6c2a9e4b813'
+down_revision = 'e5b7c3a9d024'
+branch_labels = None
+depends_on = None
+
+# Must match RESOLUTION_BUCKET_BOUNDS in app/models/ticket_resolution_histogram.py
+BUCKET_BOUNDS = [60.0 * 2 ** (i / 8) for i in range(161)]
+
+
+def upgrade() -> None:
+    op.create_table('ticket_resolution_histogram',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('agent_id', sa.Integer(), nullable=False),
+    sa.Column('bucket', sa.Integer(), nullable=False),
+    sa.Column('ticket_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('agent_id', 'bucket', name='uq_ticket_resolution_histogram_key')
+    )
+
+    # Backfill from the resolved tickets (same rules as TicketStatsService.backfill):
+    # bucket = index of the first bound greater than the resolution time
+    bucket = "CASE {} ELSE {} END".format(
+        " ".join(f"WHEN seconds < {bound!r} THEN {index}" for index, bound in enumerate(BUCKET_BOUNDS)),
+        len(BUCKET_BOUNDS)
+    )
+    op.execute(f"""
+        INSERT INTO ticket_resolution_histogram (agent_id, bucket, ticket_count)
+        SELECT agent_id, {bucket}, count(*)
+        FROM (
+            SELECT coalesce(assigned_agent_id, 0) AS agent_id,
+                   extract(epoch FROM resolved_at - created_at) AS seconds
+            FROM tickets
+            WHERE status = 'RESOLVED' AND resolved_at IS NOT NULL
+        ) AS resolved
+        GROUP BY 1, 2
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('ticket_resolution_histogram')
@@ -0,0 +1,65 @@
+"""Append new comments to the ticket search vector
+
+Revision ID: a7d4e2c8f519
+Revises: f6c2a9e4b813
+Create Date: 2026-10-16 16:00:00.000000
+
+The row-level comment trigger rebuilt the whole document (string_agg of
+every comment) on each insert, which is quadratic for tickets with long
+threads. Inserts now go through a statement-level trigger that appends
+the tsvector of the new comments, one UPDATE per ticket and statement
+(also for COPY). Edits and deletes still rebuild the document.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7d4e2c8f519'
+down_revision = 'f6c2a9e4b813'
+branch_labels = None
+depends_on = None
+
+# Must match SEARCH_CONFIG in app/services/search_service.py
+SEARCH_CONFIG = 'simple'
+
+
+def upgrade() -> None:
+    op.execute("DROP TRIGGER comments_search_vector_update ON comments")
+    op.execute("""
+        CREATE TRIGGER comments_search_vector_update
+        AFTER UPDATE OF content OR DELETE ON comments
+        FOR EACH ROW EXECUTE FUNCTION comments_search_vector_trigger()
+    """)
+    op.execute(f"""
+        CREATE FUNCTION comments_search_vector_append() RETURNS trigger AS $$
+        BEGIN
+            UPDATE tickets
+            SET search_vector = coalesce(tickets.search_vector, ticket_search_vector(tickets.title, tickets.description, NULL))
+                || setweight(to_tsvector('{SEARCH_CONFIG}', added.content), 'C')
+            FROM (
+                SELECT ticket_id, string_agg(content, ' ' ORDER BY created_at, id) AS content
+                FROM inserted_comments
+                GROUP BY ticket_id
+            ) AS added
+            WHERE tickets.id = added.ticket_id;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER comments_search_vector_insert
+        AFTER INSERT ON comments
+        REFERENCING NEW TABLE AS inserted_comments
+        FOR EACH STATEMENT EXECUTE FUNCTION comments_search_vector_append()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER comments_search_vector_insert ON comments")
+    op.execute("DROP FUNCTION comments_search_vector_append()")
+    op.execute("DROP TRIGGER comments_search_vector_update ON comments")
+    op.execute("""
+        CREATE TRIGGER comments_search_vector_update
+        AFTER INSERT OR UPDATE OF content OR DELETE ON comments
+        FOR EACH ROW EXECUTE FUNCTION comments_search_vector_trigger()
+    """)
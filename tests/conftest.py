@@ -1,9 +1,27 @@
+import os
+import tempfile
+
+# Keep the metrics spool out of the working tree while testing
+os.environ.setdefault("INFLUXDB_SPOOL_DIR", tempfile.mkdtemp(prefix="metrics_spool_"))
+# The relay uses its own sessions; tests drive it explicitly instead
+os.environ.setdefault("OUTBOX_RELAY_ENABLED", "false")
+# bcrypt barato y sin procesos de hashing; el pool se prueba aparte
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("PASSWORD_HASH_WORKERS", "0")
+
 import pytest
+from contextlib import asynccontextmanager
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.main import app
-from app.db.session import Base, get_db
+from app.db.session import Base, get_db, get_async_db, SyncSessionRunner
+from app.db.deps import get_read_session_factory
+from app.services.analytics_cache import analytics_cache
+from app.services.principal_cache import principal_cache
+from app.services.ticket_access import ticket_access_cache
+from app.services.search_service import ticket_search_service
+from app.services.duplicate_service import duplicate_detector
 import json
 from app.models.user import User, UserRole
 from app.core.security import get_password_hash
@@ -42,7 +60,31 @@ def client(db):
         finally:
             db.close()
     
+    async def override_get_async_db():
+        # Sin driver async para SQLite: los endpoints corren sobre la sesión sync
+        try:
+            yield SyncSessionRunner(db)
+        finally:
+            db.close()
+
+    @asynccontextmanager
+    async def open_test_session():
+        # Las exportaciones abren su propia sesión sobre la base de pruebas
+        session = TestingSessionLocal()
+        try:
+            yield SyncSessionRunner(session)
+        finally:
+            session.close()
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_read_session_factory] = lambda: open_test_session
+    # Cada test usa una base nueva: no reutilizar respuestas cacheadas
+    analytics_cache.clear()
+    principal_cache.clear()
+    ticket_access_cache.clear()
+    ticket_search_service.index.clear()
+    duplicate_detector.clear()
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
@@ -54,6 +54,27 @@ def test_dashboard_analytics(client, user_token, admin_token, agent_id):
     assert "top_agents" in data
 
 
+def test_tickets_over_time_incluye_hoy(client, user_token, admin_token):
+    """Un ticket recién creado debe contar en el último día de la serie"""
+    from datetime import datetime, timezone
+
+    client.post(
+        "/api/v1/tickets/",
+        headers={"Authorization": f"Bearer {user_token}"},
+        json={"title": "Ticket de hoy", "description": "Descripción válida para analytics", "priority": "low"}
+    )
+    hoy = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    for days in (1, 7, 30):
+        response = client.get(
+            f"/api/v1/analytics/dashboard?days={days}",
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+        serie = response.json()["tickets_over_time"]
+        assert len(serie) == days
+        assert serie[-1] == {"timestamp": hoy, "value": 1.0}
+        assert sum(punto["value"] for punto in serie) == 1.0
+
+
 def test_agent_stats(client, user_token, admin_token, agent_id):
     """Debe devolver estadísticas de un agente"""
     crear_ticket_y_resolver(client, user_token, admin_token, agent_id)
@@ -65,3 +86,247 @@ def test_agent_stats(client, user_token, admin_token, agent_id):
     data = response.json()
     assert "agent_id" in data
     assert "resolved_tickets" in data
+
+
+def test_dashboard_numero_constante_de_consultas(client, db, user_token, admin_token, agent_id):
+    """El dashboard debe ejecutar el mismo número de consultas sin importar días o agentes"""
+    from sqlalchemy import event
+    from app.models.user import User, UserRole
+
+    crear_ticket_y_resolver(client, user_token, admin_token, agent_id)
+    engine = db.get_bind()
+    statements = []
+
+    def contar(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    def consultas_dashboard(days):
+        statements.clear()
+        response = client.get(
+            f"/api/v1/analytics/dashboard?days={days}",
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+        assert response.status_code == 200
+        assert len(response.json()["tickets_over_time"]) == days
+        return len(statements)
+
+    event.listen(engine, "before_cursor_execute", contar)
+    try:
+        pocos = consultas_dashboard(7)
+        for i in range(5):
+            db.add(User(email=f"extra{i}@example.com", full_name=f"Agente {i}", password_hash="x", role=UserRole.AGENT))
+        db.commit()
+        muchos = consultas_dashboard(365)
+    finally:
+        event.remove(engine, "before_cursor_execute", contar)
+
+    assert pocos == muchos
+
+
+def test_agent_stats_percentiles(client, db, admin_token, agent_id):
+    """Promedio exacto y percentiles de resolución estimados desde el histograma"""
+    from datetime import datetime, timedelta
+    from app.models.ticket import Ticket, TicketStatus
+    from app.services.ticket_stats_service import ticket_stats_service
+
+    ahora = datetime.utcnow()
+    for horas in (1, 2, 3, 10):
+        db.add(Ticket(
+            title="Ticket resuelto", description="Descripción de prueba",
+            status=TicketStatus.RESOLVED, creator_id=agent_id, assigned_agent_id=agent_id,
+            created_at=ahora - timedelta(hours=horas), resolved_at=ahora
+        ))
+    db.commit()
+    # Tickets insertados fuera de la API: reconstruir el rollup
+    ticket_stats_service.backfill(db)
+
+    response = client.get(
+        f"/api/v1/analytics/agent/{agent_id}",
+        headers={"Authorization": f"Bearer {admin_token}"}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["resolved_tickets"] == 4
+    assert data["avg_resolution_time_hours"] == 4.0
+    # percentile_cont daría 2.5 / 7.9 / 9.79; las cubetas tienen ~9% de ancho
+    assert data["p50_resolution_time_hours"] == pytest.approx(2.5, rel=0.05)
+    assert data["p90_resolution_time_hours"] == pytest.approx(7.9, rel=0.05)
+    assert data["p99_resolution_time_hours"] == pytest.approx(9.79, rel=0.05)
+
+
+def test_rollup_incremental_igual_a_backfill(client, db, user_token, admin_token, agent_token, agent_id):
+    """El rollup mantenido por los handlers debe coincidir con uno reconstruido desde cero"""
+    from app.models.ticket_daily_stats import TicketDailyStats
+    from app.models.ticket_resolution_histogram import TicketResolutionHistogram
+    from app.services.ticket_stats_service import ticket_stats_service
+
+    admin = {"Authorization": f"Bearer {admin_token}"}
+    ids = []
+    for priority in ("low", "high", "critical", "medium"):
+        response = client.post(
+            "/api/v1/tickets/",
+            headers={"Authorization": f"Bearer {user_token}"},
+            json={"title": "Ticket rollup", "description": "Descripción de prueba", "priority": priority}
+        )
+        ids.append(response.json()["id"])
+    client.patch(f"/api/v1/tickets/{ids[0]}/assign", headers=admin, json={"assigned_agent_id": agent_id})
+    client.put(f"/api/v1/tickets/{ids[0]}", headers=admin, json={"status": "resolved"})
+    client.put(f"/api/v1/tickets/{ids[1]}", headers=admin, json={"priority": "low", "status": "pending"})
+    client.delete(f"/api/v1/tickets/{ids[2]}", headers=admin)
+
+    def rollup():
+        filas = db.query(TicketDailyStats).filter(TicketDailyStats.ticket_count != 0).all()
+        cubetas = db.query(TicketResolutionHistogram).filter(TicketResolutionHistogram.ticket_count != 0).all()
+        return sorted(
+            (f.day, f.status, f.priority, f.agent_id, f.ticket_count, f.resolution_count, round(f.resolution_seconds_sum, 3))
+            for f in filas
+        ), sorted((c.agent_id, c.bucket, c.ticket_count) for c in cubetas)
+
+    incremental = rollup()
+    ticket_stats_service.backfill(db)
+    db.expire_all()
+    assert incremental == rollup()
+
+    response = client.get("/api/v1/analytics/dashboard", headers=admin)
+    stats = response.json()["ticket_stats"]
+    assert stats["total_tickets"] == 3
+    assert stats["resolved_tickets"] == 1
+
+
+def test_dashboard_cacheado_e_invalidado(client, user_token, admin_token, agent_id):
+    """El dashboard debe servirse desde el cache hasta que cambie un ticket"""
+    from app.services.analytics_cache import analytics_cache
+
+    admin = {"Authorization": f"Bearer {admin_token}"}
+    primera = client.get("/api/v1/analytics/dashboard", headers=admin)
+    assert primera.headers["Age"] == "0"
+    assert primera.headers["Cache-Control"].startswith("private, max-age=")
+
+    hits = analytics_cache.stats()["hits"]
+    segunda = client.get("/api/v1/analytics/dashboard", headers=admin)
+    assert segunda.json() == primera.json()
+    assert analytics_cache.stats()["hits"] == hits + 1
+
+    crear_ticket_y_resolver(client, user_token, admin_token, agent_id)
+    tercera = client.get("/api/v1/analytics/dashboard", headers=admin)
+    assert tercera.json()["ticket_stats"]["total_tickets"] == 1
+    assert tercera.headers["Age"] == "0"
+
+
+def test_agent_stats_invalidacion_por_agente(client, db, user_token, admin_token, agent_id):
+    """Cambios en tickets de otro agente no deben invalidar las estadísticas cacheadas"""
+    from app.models.user import User, UserRole
+    from app.services.analytics_cache import analytics_cache
+
+    otro = User(email="otro@example.com", full_name="Otro Agente", password_hash="x", role=UserRole.AGENT)
+    db.add(otro)
+    db.commit()
+    otro_id = otro.id
+    admin = {"Authorization": f"Bearer {admin_token}"}
+
+    def resolver_ticket(agente):
+        ticket_id = client.post(
+            "/api/v1/tickets/",
+            headers={"Authorization": f"Bearer {user_token}"},
+            json={"title": "Ticket cache", "description": "Descripción de prueba", "priority": "low"}
+        ).json()["id"]
+        client.patch(f"/api/v1/tickets/{ticket_id}/assign", headers=admin, json={"assigned_agent_id": agente})
+        client.put(f"/api/v1/tickets/{ticket_id}", headers=admin, json={"status": "resolved"})
+
+    client.get(f"/api/v1/analytics/agent/{agent_id}", headers=admin)
+    resolver_ticket(otro_id)
+    hits = analytics_cache.stats()["hits"]
+    response = client.get(f"/api/v1/analytics/agent/{agent_id}", headers=admin)
+    assert analytics_cache.stats()["hits"] == hits + 1
+    assert response.json()["resolved_tickets"] == 0
+
+    resolver_ticket(agent_id)
+    response = client.get(f"/api/v1/analytics/agent/{agent_id}", headers=admin)
+    assert response.json()["resolved_tickets"] == 1
+
+
+def test_rollup_con_actualizaciones_concurrentes(monkeypatch):
+    """
+    Dos escrituras intercaladas sobre el mismo ticket: la segunda espera el
+    bloqueo de la primera y el rollup sigue coincidiendo con un recálculo.
+
+    SQLite ignora FOR UPDATE, así que corre solo contra TEST_POSTGRES_URL.
+    """
+    import os
+    import threading
+    import time
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.api.v1.routes_tickets import _assign_ticket, _update_ticket
+    from app.db.session import Base
+    from app.models.ticket import Ticket, TicketPriority, TicketStatus
+    from app.models.ticket_daily_stats import TicketDailyStats
+    from app.models.ticket_resolution_histogram import TicketResolutionHistogram
+    from app.models.user import User, UserRole
+    from app.schemas.ticket import TicketAssign, TicketUpdate
+    from app.services.principal_cache import UserPrincipal
+    from app.services.ticket_stats_service import ticket_stats_service
+
+    url = os.environ.get("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRES_URL no configurada")
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    Sesion = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    try:
+        with Sesion() as db:
+            admin = User(email="admin@example.com", full_name="Admin", password_hash="x", role=UserRole.ADMIN)
+            agente = User(email="agente@example.com", full_name="Agente", password_hash="x", role=UserRole.AGENT)
+            db.add_all([admin, agente])
+            db.flush()
+            ticket = Ticket(title="Ticket concurrente", description="Descripción de prueba",
+                            priority=TicketPriority.HIGH, status=TicketStatus.OPEN, creator_id=admin.id)
+            db.add(ticket)
+            db.commit()
+            ticket_id, agente_id = ticket.id, agente.id
+            principal = UserPrincipal(id=admin.id, role=UserRole.ADMIN, is_active=True)
+            ticket_stats_service.backfill(db)
+
+        # La primera escritura se detiene con el ticket ya cargado y deja
+        # entrar a la segunda antes de seguir
+        bloqueado = threading.Event()
+        snapshot = ticket_stats_service.snapshot
+        def snapshot_lento(t):
+            if threading.current_thread().name == "primera" and not bloqueado.is_set():
+                bloqueado.set()
+                time.sleep(0.5)
+            return snapshot(t)
+        monkeypatch.setattr(ticket_stats_service, "snapshot", snapshot_lento)
+
+        def resolver():
+            with Sesion() as db:
+                _update_ticket(db, ticket_id, TicketUpdate(status=TicketStatus.RESOLVED), principal)
+
+        def asignar():
+            bloqueado.wait()
+            with Sesion() as db:
+                _assign_ticket(db, ticket_id, TicketAssign(assigned_agent_id=agente_id), principal)
+
+        hilos = [threading.Thread(target=resolver, name="primera"), threading.Thread(target=asignar)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        def rollup(db):
+            filas = db.query(TicketDailyStats).filter(TicketDailyStats.ticket_count != 0).all()
+            cubetas = db.query(TicketResolutionHistogram).filter(TicketResolutionHistogram.ticket_count != 0).all()
+            return sorted(
+                (f.day, f.status, f.priority, f.agent_id, f.ticket_count, f.resolution_count, round(f.resolution_seconds_sum, 3))
+                for f in filas
+            ), sorted((c.agent_id, c.bucket, c.ticket_count) for c in cubetas)
+
+        with Sesion() as db:
+            assert db.get(Ticket, ticket_id).status == TicketStatus.RESOLVED
+            incremental = rollup(db)
+            ticket_stats_service.backfill(db)
+            db.expire_all()
+            assert incremental == rollup(db)
+    finally:
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
@@ -159,3 +159,121 @@ def test_get_current_user_invalid_token(client):
         headers={"Authorization": "Bearer invalid_token"}
     )
     assert response.status_code == 401
+
+
+def test_principal_cacheado_evita_consulta_de_usuario(client, db, user_token):
+    """Requests repetidos no deben volver a consultar la tabla users"""
+    from sqlalchemy import event
+
+    headers = {"Authorization": f"Bearer {user_token}"}
+    ticket_id = client.post(
+        "/api/v1/tickets/",
+        headers=headers,
+        json={"title": "Ticket cache", "description": "Descripción de prueba", "priority": "low"}
+    ).json()["id"]
+    engine = db.get_bind()
+    statements = []
+
+    def contar(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", contar)
+    try:
+        response = client.get(f"/api/v1/tickets/{ticket_id}", headers=headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", contar)
+
+    assert response.status_code == 200
+    assert not any("FROM users" in statement for statement in statements)
+
+
+def test_principal_invalidado_al_modificar_usuario(client, db, user_token):
+    """Cambiar el rol de un usuario debe reflejarse en el siguiente request"""
+    headers = {"Authorization": f"Bearer {user_token}"}
+    assert client.get("/api/v1/analytics/dashboard", headers=headers).status_code == 403
+
+    user = db.query(User).filter(User.email == "user@example.com").first()
+    user.role = UserRole.ADMIN
+    db.commit()
+
+    assert client.get("/api/v1/analytics/dashboard", headers=headers).status_code == 200
+
+
+def test_login_rehash_si_cambian_los_rounds(client, db):
+    """El login debe regenerar el hash si BCRYPT_ROUNDS cambió"""
+    from passlib.context import CryptContext
+
+    hash_viejo = CryptContext(schemes=["bcrypt"], bcrypt__rounds=5).hash("testpass123")
+    user = User(email="rehash@example.com", full_name="Rehash", password_hash=hash_viejo, role=UserRole.USER)
+    db.add(user)
+    db.commit()
+
+    response = client.post("/api/v1/auth/login", data={"username": "rehash@example.com", "password": "testpass123"})
+    assert response.status_code == 200
+
+    db.expire_all()
+    user = db.query(User).filter(User.email == "rehash@example.com").first()
+    assert user.password_hash != hash_viejo
+    assert user.password_hash.startswith("$2b$04$")
+
+
+def test_login_503_si_el_pool_de_hashing_esta_saturado(client, db, monkeypatch):
+    """Con la cola de hashing llena el login debe responder 503"""
+    from app.core.security import password_hasher
+
+    db.add(User(email="busy@example.com", full_name="Busy", password_hash=get_password_hash("testpass123"), role=UserRole.USER))
+    db.commit()
+    monkeypatch.setattr(password_hasher, "max_pending", 0)
+
+    response = client.post("/api/v1/auth/login", data={"username": "busy@example.com", "password": "testpass123"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert password_hasher.stats()["rejected"] >= 1
+
+
+def test_password_hasher_en_procesos():
+    """El pool de procesos debe hashear y verificar contraseñas"""
+    import asyncio
+    from app.core.security import PasswordHasher
+
+    hasher = PasswordHasher(workers=1, max_pending=4)
+    try:
+        hashed = asyncio.run(hasher.hash("secreto123"))
+        assert asyncio.run(hasher.verify("secreto123", hashed))
+        assert not asyncio.run(hasher.verify("otra", hashed))
+    finally:
+        hasher.shutdown()
+    assert hasher.stats()["completed"] == 3
+
+
+def test_decode_access_token_cacheado_hasta_exp(monkeypatch):
+    """Un token ya verificado se sirve del cache solo hasta su exp"""
+    import time
+    from datetime import timedelta
+    from app.core import cache
+    from app.core.security import create_access_token, decode_access_token, token_cache
+
+    token = create_access_token({"sub": "42"}, expires_delta=timedelta(seconds=60))
+    assert decode_access_token(token)["sub"] == "42"
+    hits = token_cache.stats()["hits"]
+    assert decode_access_token(token)["sub"] == "42"
+    assert token_cache.stats()["hits"] == hits + 1
+
+    # Pasado el exp la entrada ya no se usa
+    ahora = time.time()
+    monkeypatch.setattr(cache.time, "time", lambda: ahora + 120)
+    misses = token_cache.stats()["misses"]
+    decode_access_token(token)
+    assert token_cache.stats()["misses"] == misses + 1
+
+
+def test_decode_access_token_no_cachea_tokens_invalidos():
+    """Tokens con firma inválida o vencidos no deben cachearse"""
+    from datetime import timedelta
+    from app.core.security import create_access_token, decode_access_token
+
+    token = create_access_token({"sub": "42"}, expires_delta=timedelta(seconds=60))
+    assert decode_access_token(token[:-2] + "xx") is None
+    vencido = create_access_token({"sub": "42"}, expires_delta=timedelta(seconds=-10))
+    assert decode_access_token(vencido) is None
+    assert decode_access_token(vencido) is None
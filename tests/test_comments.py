@@ -34,3 +34,130 @@ def test_eliminar_comentario(client, user_token, ticket_id, comment_id):
         headers={"Authorization": f"Bearer {user_token}"}
     )
     assert response.status_code == 204
+
+
+def test_permisos_de_comentarios_siguen_la_asignacion(client, user_token, admin_token, agent_token, agent_id):
+    """Reasignar un ticket cambia enseguida quién puede comentarlo"""
+    from app.services.ticket_access import ticket_access_cache
+
+    usuario = {"Authorization": f"Bearer {user_token}"}
+    admin = {"Authorization": f"Bearer {admin_token}"}
+    agente = {"Authorization": f"Bearer {agent_token}"}
+    response = client.post(
+        "/api/v1/tickets/",
+        headers=usuario,
+        json={"title": "Sin acceso a la intranet", "description": "Error 500 al entrar"}
+    )
+    ticket_id = response.json()["id"]
+
+    # Sin asignar: el agente puede comentar y listar (la proyección sale del cache)
+    hits = ticket_access_cache.stats()["hits"]
+    assert client.post(f"/api/v1/tickets/{ticket_id}/comments", headers=agente, json={"content": "Reviso"}).status_code == 201
+    assert client.get(f"/api/v1/tickets/{ticket_id}/comments", headers=agente).status_code == 200
+    assert ticket_access_cache.stats()["hits"] == hits + 2
+
+    # Asignado a otro agente con el cambio en bloque (UPDATE de Core)
+    cambios = {"changes": [{"ticket_id": ticket_id, "assigned_agent_id": agent_id}]}
+    assert client.patch("/api/v1/tickets/bulk", headers=admin, json=cambios).status_code == 200
+    assert client.get(f"/api/v1/tickets/{ticket_id}/comments", headers=agente).status_code == 403
+    assert client.post(f"/api/v1/tickets/{ticket_id}/comments", headers=agente, json={"content": "Otro"}).status_code == 403
+
+    # Borrado: 404 aunque estuviera cacheado
+    response = client.post("/api/v1/tickets/", headers=usuario, json={"title": "Ticket a borrar", "description": "Creado por error"})
+    otro_id = response.json()["id"]
+    assert client.get(f"/api/v1/tickets/{otro_id}/comments", headers=admin).status_code == 200
+    assert client.delete(f"/api/v1/tickets/{otro_id}", headers=admin).status_code == 204
+    assert client.get(f"/api/v1/tickets/{otro_id}/comments", headers=admin).status_code == 404
+
+
+def test_proyeccion_compartida_entre_workers(client, user_token, admin_token, agent_id):
+    """Con un backend compartido (Redis) la reasignación se ve enseguida en otro worker"""
+    from app.services.ticket_access import TicketAccessCache, ticket_access_cache
+
+    # Otro worker: su propio TicketAccessCache sobre el mismo backend
+    otro_worker = TicketAccessCache(ticket_access_cache.backend)
+    ticket_id = client.post(
+        "/api/v1/tickets/", headers={"Authorization": f"Bearer {user_token}"},
+        json={"title": "Sin acceso a la intranet", "description": "Error 500 al entrar"}
+    ).json()["id"]
+    # Sin sesión: tiene que salir del cache, no de la base
+    assert otro_worker.get(None, ticket_id).assigned_agent_id is None
+
+    client.patch(
+        f"/api/v1/tickets/{ticket_id}/assign", headers={"Authorization": f"Bearer {admin_token}"},
+        json={"assigned_agent_id": agent_id}
+    )
+    assert otro_worker.get(None, ticket_id).assigned_agent_id == agent_id
+
+
+def test_paginar_comentarios(client, user_token):
+    """Los comentarios se recorren por cursor hacia adelante y hacia atrás"""
+    headers = {"Authorization": f"Bearer {user_token}"}
+    ticket_id = client.post(
+        "/api/v1/tickets/", headers=headers,
+        json={"title": "Caída del ERP", "description": "Incidente largo con muchas novedades"}
+    ).json()["id"]
+    for i in range(7):
+        client.post(f"/api/v1/tickets/{ticket_id}/comments", headers=headers, json={"content": f"Novedad {i}"})
+
+    url = f"/api/v1/tickets/{ticket_id}/comments"
+    paginas, params = [], {"limit": 3}
+    while True:
+        response = client.get(url, headers=headers, params=params)
+        assert response.status_code == 200
+        paginas.append([c["content"] for c in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        params = {"limit": 3, "since": cursor}
+    assert paginas == [["Novedad 0", "Novedad 1", "Novedad 2"], ["Novedad 3", "Novedad 4", "Novedad 5"], ["Novedad 6"]]
+
+    # Hacia atrás desde el cursor de "Novedad 5": páginas en orden cronológico
+    cursor = client.get(url, headers=headers, params={"limit": 6}).headers["X-Next-Cursor"]
+    response = client.get(url, headers=headers, params={"limit": 4, "before": cursor})
+    assert [c["content"] for c in response.json()] == ["Novedad 1", "Novedad 2", "Novedad 3", "Novedad 4"]
+    response = client.get(url, headers=headers, params={"limit": 4, "before": response.headers["X-Next-Cursor"]})
+    assert [c["content"] for c in response.json()] == ["Novedad 0"]
+    assert "X-Next-Cursor" not in response.headers
+
+    assert client.get(url, headers=headers, params={"since": "xyz"}).status_code == 400
+    assert client.get(url, headers=headers, params={"since": cursor, "before": cursor}).status_code == 400
+
+
+def test_listar_comentarios_sin_parametros_devuelve_todos(client, user_token):
+    """Sin limit ni cursor se devuelven todos los comentarios, sin header de cursor"""
+    headers = {"Authorization": f"Bearer {user_token}"}
+    ticket_id = client.post(
+        "/api/v1/tickets/", headers=headers,
+        json={"title": "Ticket con historial", "description": "Ticket con muchos comentarios"}
+    ).json()["id"]
+    for i in range(55):
+        client.post(f"/api/v1/tickets/{ticket_id}/comments", headers=headers, json={"content": f"Novedad {i}"})
+
+    response = client.get(f"/api/v1/tickets/{ticket_id}/comments", headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()) == 55
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_ultimos_comentarios(client, user_token):
+    """latest trae los últimos comentarios y el cursor para seguir hacia atrás"""
+    headers = {"Authorization": f"Bearer {user_token}"}
+    ticket_id = client.post(
+        "/api/v1/tickets/", headers=headers,
+        json={"title": "Caída del ERP", "description": "Incidente largo con muchas novedades"}
+    ).json()["id"]
+    for i in range(5):
+        client.post(f"/api/v1/tickets/{ticket_id}/comments", headers=headers, json={"content": f"Novedad {i}"})
+
+    url = f"/api/v1/tickets/{ticket_id}/comments"
+    response = client.get(url, headers=headers, params={"latest": True, "limit": 2})
+    assert [c["content"] for c in response.json()] == ["Novedad 3", "Novedad 4"]
+    cursor = response.headers["X-Next-Cursor"]
+    response = client.get(url, headers=headers, params={"limit": 2, "before": cursor})
+    assert [c["content"] for c in response.json()] == ["Novedad 1", "Novedad 2"]
+
+    response = client.get(url, headers=headers, params={"latest": True})
+    assert len(response.json()) == 5
+    assert "X-Next-Cursor" not in response.headers
+    assert client.get(url, headers=headers, params={"latest": True, "since": cursor}).status_code == 400
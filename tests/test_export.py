@@ -0,0 +1,72 @@
+"""
+Pruebas de la exportación en streaming (NDJSON / CSV / gzip)
+"""
+import csv
+import gzip
+import io
+import json
+
+
+def crear_ticket(client, token, titulo):
+    response = client.post(
+        "/api/v1/tickets/",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"title": titulo, "description": "Descripción de prueba"}
+    )
+    return response.json()["id"]
+
+
+def test_exportar_tickets_ndjson_respeta_visibilidad(client, user_token, admin_token):
+    """El USER solo exporta sus tickets; el ADMIN exporta todos"""
+    propios = [crear_ticket(client, user_token, f"Ticket propio {i}") for i in range(3)]
+    crear_ticket(client, admin_token, "Ticket del admin")
+
+    response = client.get("/api/v1/export/tickets", headers={"Authorization": f"Bearer {user_token}"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    filas = [json.loads(linea) for linea in response.text.splitlines()]
+    assert [fila["id"] for fila in filas] == propios
+    assert filas[0]["status"] == "open"
+    assert "description" in filas[0]
+
+    response = client.get("/api/v1/export/tickets", headers={"Authorization": f"Bearer {admin_token}"})
+    assert len(response.text.splitlines()) == 4
+
+
+def test_exportar_tickets_csv_en_bloques_con_gzip(client, admin_token, monkeypatch):
+    """CSV con encabezado, leído en varios bloques y comprimido al vuelo"""
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 2)
+    ids = [crear_ticket(client, admin_token, f"Ticket, con coma {i}") for i in range(5)]
+
+    with client.stream(
+        "GET", "/api/v1/export/tickets",
+        headers={"Authorization": f"Bearer {admin_token}"},
+        params={"format": "csv", "gzip": "true"}
+    ) as response:
+        assert response.headers["content-encoding"] == "gzip"
+        comprimido = b"".join(response.iter_raw())
+
+    filas = list(csv.DictReader(io.StringIO(gzip.decompress(comprimido).decode())))
+    assert [int(fila["id"]) for fila in filas] == ids
+    assert filas[0]["title"] == "Ticket, con coma 0"
+    assert filas[0]["assigned_agent_id"] == ""
+
+
+def test_exportar_comentarios_respeta_visibilidad(client, user_token, admin_token):
+    """Solo se exportan comentarios de tickets visibles para el usuario"""
+    propio = crear_ticket(client, user_token, "Ticket propio")
+    ajeno = crear_ticket(client, admin_token, "Ticket del admin")
+    for ticket_id, token in ((propio, user_token), (ajeno, admin_token)):
+        client.post(
+            f"/api/v1/tickets/{ticket_id}/comments",
+            headers={"Authorization": f"Bearer {token}"},
+            json={"content": "Comentario de prueba"}
+        )
+
+    response = client.get("/api/v1/export/comments", headers={"Authorization": f"Bearer {user_token}"})
+    assert [json.loads(linea)["ticket_id"] for linea in response.text.splitlines()] == [propio]
+
+    response = client.get("/api/v1/export/comments", headers={"Authorization": f"Bearer {admin_token}"})
+    assert len(response.text.splitlines()) == 2
@@ -0,0 +1,234 @@
+"""
+Pruebas para el writer de métricas en segundo plano (InfluxDB)
+"""
+import threading
+import time
+from influxdb_client import Point
+from app.db.influxdb import InfluxDBWriter, BackpressurePolicy
+from app.db.metrics_spool import MetricsSpool
+
+
+def crear_spool(tmp_path, segment_max_bytes=1024 * 1024):
+    return MetricsSpool(str(tmp_path / "spool"), segment_max_bytes=segment_max_bytes, max_segments=100)
+
+
+def crear_writer(write_batch, tmp_path, policy=BackpressurePolicy.DROP_OLDEST, max_queue_size=100, batch_size=10):
+    return InfluxDBWriter(
+        write_batch=write_batch,
+        batch_size=batch_size,
+        flush_interval=0.05,
+        max_queue_size=max_queue_size,
+        policy=policy,
+        block_timeout=0.01,
+        spool=crear_spool(tmp_path),
+    )
+
+
+def test_writer_agrupa_y_vacia_al_cerrar(tmp_path):
+    """Debe escribir en lotes y vaciar la cola al cerrar"""
+    lotes = []
+    writer = crear_writer(lotes.append, tmp_path)
+    writer.start()
+    for i in range(25):
+        assert writer.put(Point("ticket_created").field("count", i))
+    writer.close(timeout=5)
+
+    assert sum(len(lote) for lote in lotes) == 25
+    assert all(len(lote) <= 10 for lote in lotes)
+    stats = writer.stats()
+    assert stats["written"] == 25
+    assert stats["pending"] == 0
+    assert stats["dropped"] == 0
+
+
+def test_writer_no_bloquea_si_influxdb_esta_lento(tmp_path):
+    """Con drop_oldest la cola llena descarta los puntos más viejos sin esperar a InfluxDB"""
+    liberar = threading.Event()
+    writer = crear_writer(lambda lote: liberar.wait(5), tmp_path, max_queue_size=5, batch_size=1)
+    writer.start()
+    for i in range(20):
+        writer.put(Point("ticket_created").field("count", i))
+    assert writer.stats()["dropped"] > 0
+    liberar.set()
+    writer.close(timeout=5)
+
+
+def test_writer_spill_a_disco(tmp_path):
+    """Con spill los puntos que no caben o fallan se guardan en disco"""
+    def falla(lote):
+        raise ConnectionError("InfluxDB caído")
+
+    writer = crear_writer(falla, tmp_path, policy=BackpressurePolicy.SPILL, max_queue_size=2)
+    for i in range(5):
+        writer.put(Point("ticket_created").field("count", i))
+    writer.start()
+    writer.close(timeout=5)
+
+    lineas = []
+    writer.spool.replay(lineas.extend, batch_size=100, max_points_per_second=1e6)
+    assert len(lineas) == 5
+    assert writer.stats()["spilled"] == 5
+    assert writer.stats()["dropped"] == 0
+
+
+def test_spool_rota_y_reanuda_replay(tmp_path):
+    """El spool debe rotar segmentos y reanudar el replay sin perder puntos tras un error"""
+    spool = crear_spool(tmp_path, segment_max_bytes=50)
+    lineas = [f"ticket_created count={i}i {i}" for i in range(20)]
+    for linea in lineas:
+        spool.append([linea])
+    assert spool.stats()["spool_segments"] > 1
+
+    enviados = []
+    llamadas = {"n": 0}
+
+    def falla_una_vez(lote):
+        llamadas["n"] += 1
+        if llamadas["n"] == 3:
+            raise ConnectionError("InfluxDB caído")
+        enviados.extend(lote)
+
+    try:
+        spool.replay(falla_una_vez, batch_size=2, max_points_per_second=1e6)
+    except ConnectionError:
+        pass
+    spool.replay(falla_una_vez, batch_size=2, max_points_per_second=1e6)
+
+    assert enviados == lineas
+    assert spool.is_empty()
+
+
+def test_spool_replay_limitado(tmp_path):
+    """El replay no debe superar los puntos por segundo configurados"""
+    import time
+    spool = crear_spool(tmp_path)
+    spool.append([f"ticket_created count={i}i {i}" for i in range(30)])
+    inicio = time.monotonic()
+    spool.replay(lambda lote: None, batch_size=10, max_points_per_second=100)
+    assert time.monotonic() - inicio >= 0.25
+
+
+def test_endpoint_metrics(client, user_token, admin_token):
+    """Debe exponer los contadores del writer y del pool de conexiones, solo a admins"""
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": f"Bearer {user_token}"}).status_code == 403
+
+    response = client.get("/metrics", headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    assert "influxdb" in response.json()
+    assert "sync" in response.json()["db_pool"]
+
+
+def test_outbox_en_la_misma_transaccion(client, db, user_token):
+    """Crear un ticket debe dejar su evento en el outbox y el relay debe vaciarlo"""
+    from app.models.metric_outbox import MetricOutbox
+    from app.services.outbox_relay import OutboxRelay
+
+    response = client.post(
+        "/api/v1/tickets/",
+        headers={"Authorization": f"Bearer {user_token}"},
+        json={"title": "Ticket con outbox", "description": "Descripción de prueba", "priority": "high"}
+    )
+    assert response.status_code == 201
+    eventos = db.query(MetricOutbox).all()
+    assert [e.measurement for e in eventos] == ["ticket_created"]
+    assert eventos[0].fields["ticket_id"] == response.json()["id"]
+
+    lotes = []
+    relay = OutboxRelay(session_factory=lambda: db, write_records=lotes.append, batch_size=10, poll_interval=0.1)
+    assert relay.relay_batch() == 1
+    assert len(lotes) == 1 and lotes[0][0]._name == "ticket_created"
+    assert db.query(MetricOutbox).count() == 0
+
+
+def test_outbox_no_se_borra_si_influxdb_falla(client, db, user_token):
+    """Si InfluxDB falla los eventos deben quedar en el outbox para reintentar"""
+    import pytest
+    from app.models.metric_outbox import MetricOutbox
+    from app.services.outbox_relay import OutboxRelay
+
+    client.post(
+        "/api/v1/tickets/",
+        headers={"Authorization": f"Bearer {user_token}"},
+        json={"title": "Ticket con outbox", "description": "Descripción de prueba", "priority": "low"}
+    )
+
+    def falla(lote):
+        raise ConnectionError("InfluxDB caído")
+
+    relay = OutboxRelay(session_factory=lambda: db, write_records=falla, batch_size=10, poll_interval=0.1)
+    with pytest.raises(ConnectionError):
+        relay.relay_batch()
+    assert db.query(MetricOutbox).count() == 1
+
+
+def test_pool_instrumentado_mide_esperas_y_timeouts(tmp_path):
+    """El pool debe exponer conexiones en uso, esperas y timeouts de checkout"""
+    import pytest
+    from sqlalchemy import create_engine, exc
+    from app.db.pool import InstrumentedQueuePool, pool_stats
+
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    conexion = engine.connect()
+    stats = pool_stats(engine)
+    assert stats["checked_out"] == 1
+    assert stats["wait_count"] == 1
+
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    conexion.close()
+
+    stats = pool_stats(engine)
+    assert stats["checked_out"] == 0
+    assert stats["wait_timeouts"] == 1
+    assert stats["wait_ms_buckets"]["+Inf"] == stats["wait_count"]
+    engine.dispose()
+
+
+
+def test_spill_con_influxdb_disponible_se_reenvia(tmp_path, monkeypatch):
+    """Los puntos que desbordan la cola con InfluxDB sano deben reenviarse desde el spool"""
+    from app.core.config import settings
+    from app.db.influxdb import InfluxDBConnection
+
+    class ClienteSano:
+        def ping(self):
+            return True
+
+    liberar = threading.Event()
+    escritos = []
+    writer = crear_writer(lambda lote: liberar.wait(5), tmp_path, policy=BackpressurePolicy.SPILL,
+                          max_queue_size=2, batch_size=1)
+    writer.start()
+    for i in range(10):
+        writer.put(Point("ticket_created").field("count", i))
+    assert writer.stats()["spilled"] > 0
+    assert writer.available.is_set()
+
+    monkeypatch.setattr(settings, "INFLUXDB_REPLAY_INTERVAL_SECONDS", 0.01)
+    conexion = InfluxDBConnection()
+    conexion.client = ClienteSano()
+    conexion.write_records = escritos.extend
+    conexion.spool = writer.spool
+    conexion.writer = writer
+    replay = threading.Thread(target=conexion._replay_loop)
+    replay.start()
+    try:
+        for _ in range(500):
+            if writer.spool.is_empty():
+                break
+            time.sleep(0.01)
+    finally:
+        conexion._stop_replay.set()
+        replay.join(timeout=5)
+        liberar.set()
+        writer.close(timeout=5)
+
+    assert len(escritos) == writer.stats()["spilled"]
+    assert writer.spool.is_empty()
@@ -0,0 +1,199 @@
+"""
+Regresión de planes de consulta: las consultas calientes deben usar índices.
+
+Se siembra una base grande, se actualizan las estadísticas (ANALYZE) y se
+ejecutan las funciones reales de los endpoints capturando el SQL que emiten.
+Cada sentencia se vuelve a correr con EXPLAIN y el test falla si alguna lee
+tickets o comments completos (seq scan).
+
+Corre sobre un SQLite propio en tmp_path y, si TEST_POSTGRES_URL apunta a
+una base PostgreSQL descartable, también con EXPLAIN (FORMAT JSON) sobre ella
+(ahí se validan los índices parciales tal como los ve el planner real).
+"""
+import os
+import random
+import re
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.api.v1.routes_comments import _list_comments
+from app.api.v1.routes_tickets import _get_ticket, _list_tickets
+from app.db.session import Base
+from app.models.comment import Comment
+from app.models.ticket import Ticket, TicketPriority, TicketStatus
+from app.models.user import User, UserRole
+from app.services.duplicate_service import duplicate_detector
+from app.services.principal_cache import UserPrincipal
+from app.services.ticket_access import ticket_access_cache
+
+TICKETS = 20000
+COMMENTS = 20000
+HOT_TABLES = ("tickets", "comments")
+POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+
+# Plan de una sentencia que recorre la tabla completa
+FULL_SCAN = {
+    "sqlite": re.compile(r"^SCAN (%s)\b(?!.*\bUSING\b)" % "|".join(HOT_TABLES)),
+    "postgresql": re.compile(r"Seq Scan on (%s)\b" % "|".join(HOT_TABLES)),
+}
+
+
+@pytest.fixture(scope="function", params=["sqlite", "postgresql"])
+def db(request, tmp_path):
+    """Base propia del módulo: no comparte el archivo de los demás tests"""
+    if request.param == "postgresql":
+        if not POSTGRES_URL:
+            pytest.skip("TEST_POSTGRES_URL no configurada")
+        engine = create_engine(POSTGRES_URL)
+    else:
+        engine = create_engine(f"sqlite:///{tmp_path / 'planes.db'}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+
+@pytest.fixture(scope="function")
+def datos(db):
+    """Base sembrada: 60 usuarios, 10 agentes, 20k tickets y 20k comentarios"""
+    rng = random.Random(7)
+    db.execute(User.__table__.insert(), [
+        {"email": f"u{i}@example.com", "full_name": f"Usuario {i}", "password_hash": "x",
+         "role": UserRole.AGENT if i < 10 else UserRole.USER, "is_active": True}
+        for i in range(60)
+    ])
+    ids = dict(db.query(User.email, User.id).all())
+    agentes = [ids[f"u{i}@example.com"] for i in range(10)]
+    usuarios = [ids[f"u{i}@example.com"] for i in range(10, 60)]
+
+    inicio = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    estados = [TicketStatus.OPEN, TicketStatus.IN_PROGRESS, TicketStatus.PENDING, TicketStatus.RESOLVED, TicketStatus.CLOSED]
+    filas = []
+    for i in range(TICKETS):
+        estado = rng.choices(estados, weights=[5, 5, 2, 60, 28])[0]
+        creado = inicio + timedelta(minutes=i * 10)
+        filas.append({
+            "title": f"Ticket {i}", "description": "Descripción de prueba", "status": estado,
+            "priority": rng.choice(list(TicketPriority)), "creator_id": rng.choice(usuarios),
+            "assigned_agent_id": None if estado == TicketStatus.OPEN else rng.choice(agentes),
+            "created_at": creado,
+            "resolved_at": creado + timedelta(hours=rng.randint(1, 72)) if estado == TicketStatus.RESOLVED else None,
+        })
+    db.execute(Ticket.__table__.insert(), filas)
+    db.execute(Comment.__table__.insert(), [
+        {"content": f"Comentario {i}", "ticket_id": rng.randint(1, TICKETS), "author_id": rng.choice(usuarios),
+         "created_at": inicio + timedelta(minutes=i)}
+        for i in range(COMMENTS)
+    ])
+    db.commit()
+    db.connection().exec_driver_sql("ANALYZE")
+    db.commit()
+    yield {"agente": agentes[0], "usuario": usuarios[0], "ticket": TICKETS // 2}
+
+    # Los servicios globales no deben quedarse con datos de esta base
+    duplicate_detector.clear()
+    ticket_access_cache.clear()
+
+
+def capturar_planes(db, consulta):
+    """Ejecutar `consulta` y devolver [(sentencia, plan)] de sus SELECT"""
+    engine = db.get_bind()
+    sentencias = []
+
+    def capturar(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            sentencias.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capturar)
+    try:
+        consulta()
+    finally:
+        event.remove(engine, "before_cursor_execute", capturar)
+
+    connection = db.connection()
+    planes = []
+    for statement, parameters in sentencias:
+        if engine.dialect.name == "sqlite":
+            filas = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+            planes.append((statement, [fila[-1] for fila in filas]))
+        else:
+            plan = connection.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).scalar()
+            planes.append((statement, list(nodos_postgres(plan[0]["Plan"]))))
+    return planes
+
+
+def nodos_postgres(nodo):
+    """Nodos de un plan JSON de PostgreSQL, uno por línea: 'Index Scan on tickets using ix_...'"""
+    linea = nodo["Node Type"]
+    if "Relation Name" in nodo:
+        linea += f" on {nodo['Relation Name']}"
+    if "Index Name" in nodo:
+        linea += f" using {nodo['Index Name']}"
+    yield linea
+    for hijo in nodo.get("Plans", []):
+        yield from nodos_postgres(hijo)
+
+
+def seq_scans(db, consulta):
+    """Sentencias de `consulta` cuyo plan recorre una tabla caliente completa"""
+    patron = FULL_SCAN[db.get_bind().dialect.name]
+    return [
+        f"{statement}\n  -> " + "\n  -> ".join(plan)
+        for statement, plan in capturar_planes(db, consulta)
+        if any(patron.search(linea) for linea in plan)
+    ]
+
+
+def test_listados_de_tickets_usan_indices(db, datos):
+    """Listados por rol y filtros del panel sin seq scan"""
+    usuario = UserPrincipal(datos["usuario"], UserRole.USER, True)
+    agente = UserPrincipal(datos["agente"], UserRole.AGENT, True)
+    admin = UserPrincipal(0, UserRole.ADMIN, True)
+
+    consultas = {
+        "USER": lambda: _list_tickets(db, usuario, None, 50),
+        "AGENT": lambda: _list_tickets(db, agente, None, 50),
+        "AGENT en curso": lambda: _list_tickets(db, agente, None, 50, ticket_status=TicketStatus.IN_PROGRESS),
+        "status": lambda: _list_tickets(db, admin, None, 50, ticket_status=TicketStatus.PENDING),
+        "prioridad": lambda: _list_tickets(db, admin, None, 50, priority=TicketPriority.CRITICAL),
+        "agente": lambda: _list_tickets(db, admin, None, 50, assigned_agent_id=datos["agente"]),
+        "creador": lambda: _list_tickets(db, admin, None, 50, creator_id=datos["usuario"]),
+        "rango de fechas": lambda: _list_tickets(
+            db, admin, None, 50, created_from=datetime(2026, 3, 1), created_to=datetime(2026, 3, 2)
+        ),
+    }
+    fallas = {nombre: seq_scans(db, consulta) for nombre, consulta in consultas.items()}
+    assert not any(fallas.values()), {nombre: planes for nombre, planes in fallas.items() if planes}
+
+
+def test_detalle_y_comentarios_usan_indices(db, datos):
+    """Detalle expandido y página de comentarios leen solo el ticket pedido"""
+    admin = UserPrincipal(0, UserRole.ADMIN, True)
+    consultas = {
+        "detalle": lambda: _get_ticket(db, datos["ticket"], admin, {"comments", "creator", "agent"}),
+        "comentarios": lambda: _list_comments(db, datos["ticket"], admin, None, 50, False),
+    }
+    fallas = {nombre: seq_scans(db, consulta) for nombre, consulta in consultas.items()}
+    assert not any(fallas.values()), {nombre: planes for nombre, planes in fallas.items() if planes}
+
+
+def test_colas_y_duplicados_usan_indices(db, datos):
+    """Colas de trabajo (pendientes de un agente, sin asignar) y refresco de duplicados sin seq scan"""
+    agente = UserPrincipal(datos["agente"], UserRole.AGENT, True)
+    admin = UserPrincipal(0, UserRole.ADMIN, True)
+    consultas = {
+        "pendientes del agente": lambda: _list_tickets(
+            db, admin, None, 50, ticket_status=TicketStatus.IN_PROGRESS, assigned_agent_id=datos["agente"]
+        ),
+        "sin asignar": lambda: _list_tickets(db, agente, None, 50, ticket_status=TicketStatus.OPEN),
+        "duplicados": lambda: duplicate_detector.refresh(db),
+    }
+    fallas = {nombre: seq_scans(db, consulta) for nombre, consulta in consultas.items()}
+    assert not any(fallas.values()), {nombre: planes for nombre, planes in fallas.items() if planes}
@@ -0,0 +1,72 @@
+"""
+Pruebas del ruteo de lecturas a réplicas (dos archivos SQLite como nodos)
+"""
+import pytest
+from app.db import deps
+from app.db.replicas import ReplicaRouter, BalancingPolicy
+from app.db.session import Base, DatabaseNode
+from app.models.ticket import Ticket
+
+
+def crear_nodo(tmp_path, nombre, ticket_id, creator_id):
+    """Crea una base SQLite con una copia del ticket con el título del nodo"""
+    nodo = DatabaseNode(f"sqlite:///{tmp_path / nombre}.db")
+    Base.metadata.create_all(bind=nodo.engine)
+    with nodo.SessionLocal() as session:
+        session.add(Ticket(id=ticket_id, title=f"Ticket {nombre}", description="Descripción de prueba", creator_id=creator_id))
+        session.commit()
+    return nodo
+
+
+@pytest.fixture
+def ticket_primario(db, admin_token):
+    from app.models.user import User
+    admin = db.query(User).filter(User.email == "admin@example.com").first()
+    ticket = Ticket(title="Ticket primario", description="Descripción de prueba", creator_id=admin.id)
+    db.add(ticket)
+    db.commit()
+    return ticket.id, admin.id
+
+
+def test_lecturas_balanceadas_y_read_your_writes(client, admin_token, ticket_primario, tmp_path, monkeypatch):
+    """Las lecturas rotan entre réplicas y vuelven al primario después de una escritura"""
+    ticket_id, admin_id = ticket_primario
+    router = ReplicaRouter(
+        replicas=[crear_nodo(tmp_path, "replica_a", ticket_id, admin_id), crear_nodo(tmp_path, "replica_b", ticket_id, admin_id)],
+        policy=BalancingPolicy.ROUND_ROBIN,
+        sticky_seconds=60,
+    )
+    monkeypatch.setattr(deps, "replica_router", router)
+    headers = {"Authorization": f"Bearer {admin_token}"}
+
+    titulos = {client.get(f"/api/v1/tickets/{ticket_id}", headers=headers).json()["title"] for _ in range(2)}
+    assert titulos == {"Ticket replica_a", "Ticket replica_b"}
+
+    response = client.put(f"/api/v1/tickets/{ticket_id}", headers=headers, json={"title": "Ticket actualizado"})
+    assert response.status_code == 200
+    assert client.get(f"/api/v1/tickets/{ticket_id}", headers=headers).json()["title"] == "Ticket actualizado"
+
+    stats = router.stats()
+    assert [replica["reads"] for replica in stats["replicas"]] == [1, 1]
+    assert stats["sticky_reads"] == 1
+
+
+def test_least_connections_elige_la_replica_libre(tmp_path):
+    """Con least_connections no se elige la réplica con conexiones en uso"""
+    ocupada = crear_nodo(tmp_path, "ocupada", 1, 1)
+    libre = crear_nodo(tmp_path, "libre", 1, 1)
+    router = ReplicaRouter(replicas=[ocupada, libre], policy=BalancingPolicy.LEAST_CONNECTIONS, sticky_seconds=0)
+
+    conexion = ocupada.engine.connect()
+    try:
+        assert all(router.choose(1) is libre for _ in range(4))
+    finally:
+        conexion.close()
+
+
+def test_sin_replicas_todo_va_al_primario():
+    """Sin réplicas configuradas no se elige ningún nodo"""
+    router = ReplicaRouter(replicas=[], policy=BalancingPolicy.ROUND_ROBIN, sticky_seconds=5)
+    router.mark_write(1)
+    assert router.choose(1) is None
+    assert router.stats()["primary_reads"] == 1
@@ -0,0 +1,61 @@
+"""
+Pruebas de la búsqueda full-text (índice en memoria sobre SQLite)
+"""
+
+
+def crear_ticket(client, token, titulo, descripcion):
+    response = client.post(
+        "/api/v1/tickets/",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"title": titulo, "description": descripcion}
+    )
+    return response.json()["id"]
+
+
+def buscar(client, token, q):
+    response = client.get("/api/v1/tickets/search", headers={"Authorization": f"Bearer {token}"}, params={"q": q})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_busqueda_ordena_por_relevancia_y_resalta(client, user_token):
+    """El título pesa más que la descripción y los términos se marcan"""
+    en_descripcion = crear_ticket(client, user_token, "Problema de acceso", "La impresora del piso dos no imprime")
+    en_titulo = crear_ticket(client, user_token, "Impresora sin tóner", "Se acabó el cartucho del equipo")
+    crear_ticket(client, user_token, "Correo lento", "Outlook tarda en sincronizar")
+
+    resultados = buscar(client, user_token, "Impresora")
+    assert [r["id"] for r in resultados] == [en_titulo, en_descripcion]
+    assert resultados[0]["rank"] > resultados[1]["rank"]
+    assert "<mark>Impresora</mark>" in resultados[0]["highlight"]
+    assert "<mark>impresora</mark>" in resultados[1]["highlight"]
+
+    # Todos los términos deben aparecer
+    assert [r["id"] for r in buscar(client, user_token, "impresora piso")] == [en_descripcion]
+    assert buscar(client, user_token, "impresora outlook") == []
+
+
+def test_busqueda_se_actualiza_y_respeta_visibilidad(client, user_token, admin_token):
+    """Ediciones y comentarios se reflejan en el índice; el USER solo ve lo suyo"""
+    ticket_id = crear_ticket(client, user_token, "Pantalla azul", "El equipo se reinicia solo")
+    crear_ticket(client, admin_token, "Pantalla rota", "Cambiar monitor de recepción")
+    assert [r["id"] for r in buscar(client, user_token, "pantalla")] == [ticket_id]
+    assert len(buscar(client, admin_token, "pantalla")) == 2
+
+    headers = {"Authorization": f"Bearer {user_token}"}
+    client.post(f"/api/v1/tickets/{ticket_id}/comments", headers=headers, json={"content": "Ocurre al conectar el proyector"})
+    assert [r["id"] for r in buscar(client, user_token, "proyector")] == [ticket_id]
+
+    client.put(f"/api/v1/tickets/{ticket_id}", headers={"Authorization": f"Bearer {admin_token}"}, json={"title": "Reinicios inesperados"})
+    assert buscar(client, user_token, "pantalla") == []
+    assert [r["id"] for r in buscar(client, user_token, "inesperados")] == [ticket_id]
+
+
+def test_resaltado_escapa_html(client, user_token):
+    """El texto del ticket se devuelve escapado: solo las marcas son HTML"""
+    crear_ticket(client, user_token, "<script>alert(1)</script> impresora", "Falla \"rara\" con <b>negrita</b> & más")
+
+    resaltado = buscar(client, user_token, "impresora")[0]["highlight"]
+    assert "<script>" not in resaltado and "<b>" not in resaltado
+    assert "&lt;script&gt;alert(1)&lt;/script&gt; <mark>impresora</mark>" in resaltado
+    assert "&quot;rara&quot; con &lt;b&gt;negrita&lt;/b&gt; &amp; más" in resaltado
@@ -65,3 +65,371 @@ def test_eliminar_ticket(client, user_token):
         headers={"Authorization": f"Bearer {user_token}"}
     )
     assert response.status_code == 204
+
+
+def test_listar_tickets_paginado(client, user_token):
+    """Debe paginar por cursor sin repetir ni perder tickets"""
+    headers = {"Authorization": f"Bearer {user_token}"}
+    creados = []
+    for i in range(5):
+        response = client.post(
+            "/api/v1/tickets/",
+            headers=headers,
+            json={"title": f"Ticket paginado {i}", "description": "Descripción de prueba", "priority": "low"}
+        )
+        creados.append(response.json()["id"])
+
+    vistos = []
+    cursor = None
+    paginas = 0
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/v1/tickets/", headers=headers, params=params)
+        assert response.status_code == 200
+        assert len(response.json()) <= 2
+        vistos.extend(t["id"] for t in response.json())
+        paginas += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert paginas == 3
+    assert vistos == sorted(creados, reverse=True)
+
+
+def test_listar_tickets_sin_parametros_devuelve_todos(client, db, user_token):
+    """Sin limit ni cursor el listado sigue devolviendo todos los tickets visibles"""
+    from app.models.ticket import Ticket
+    from app.models.user import User
+
+    usuario = db.query(User).filter(User.email == "user@example.com").one()
+    db.add_all([
+        Ticket(title=f"Ticket {i}", description="Descripción de prueba", creator_id=usuario.id)
+        for i in range(60)
+    ])
+    db.commit()
+
+    headers = {"Authorization": f"Bearer {user_token}"}
+    response = client.get("/api/v1/tickets/", headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()) == 60
+    assert "X-Next-Cursor" not in response.headers
+
+    # Con limit se pagina; seguir el cursor sin limit usa páginas de 50
+    response = client.get("/api/v1/tickets/", headers=headers, params={"limit": 5})
+    assert len(response.json()) == 5
+    response = client.get("/api/v1/tickets/", headers=headers, params={"cursor": response.headers["X-Next-Cursor"]})
+    assert len(response.json()) == 50
+    assert response.headers["X-Next-Cursor"]
+
+
+def test_listar_tickets_filtros(client, user_token):
+    """Debe filtrar por prioridad y rechazar cursores inválidos"""
+    headers = {"Authorization": f"Bearer {user_token}"}
+    for priority in ("low", "high", "high"):
+        client.post(
+            "/api/v1/tickets/",
+            headers=headers,
+            json={"title": "Ticket filtrado", "description": "Descripción de prueba", "priority": priority}
+        )
+
+    response = client.get("/api/v1/tickets/", headers=headers, params={"priority": "high"})
+    assert response.status_code == 200
+    assert [t["priority"] for t in response.json()] == ["high", "high"]
+
+    response = client.get("/api/v1/tickets/", headers=headers, params={"status": "closed"})
+    assert response.json() == []
+
+    response = client.get("/api/v1/tickets/", headers=headers, params={"cursor": "no-es-un-cursor"})
+    assert response.status_code == 400
+
+
+def test_importar_tickets_ndjson(client, db, admin_token, monkeypatch):
+    """Debe importar en bloques y reportar las filas inválidas sin abortar"""
+    from app.models.metric_outbox import MetricOutbox
+    from app.models.ticket_daily_stats import TicketDailyStats
+    from app.services.ticket_import_service import ticket_import_service
+
+    monkeypatch.setattr(ticket_import_service, "chunk_size", 2)
+    lineas = [
+        '{"title": "Ticket importado 1", "description": "Descripción de prueba", "priority": "high"}',
+        '{"title": "Corto", "description": "corta"}',
+        '',
+        '{"title": "Ticket importado 2", "description": "Descripción de prueba"}',
+        'no es json',
+        '{"title": "Ticket importado 3", "description": "Descripción de prueba", "priority": "high"}',
+    ]
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = client.post(
+        "/api/v1/tickets/import",
+        headers=headers,
+        files={"file": ("tickets.ndjson", "\n".join(lineas).encode(), "application/x-ndjson")}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["imported"] == 3
+    assert data["failed"] == 2
+    assert [error["line"] for error in data["errors"]] == [2, 5]
+    assert "description" in data["errors"][0]["error"]
+
+    titulos = sorted(t["title"] for t in client.get("/api/v1/tickets/", headers=headers).json())
+    assert titulos == ["Ticket importado 1", "Ticket importado 2", "Ticket importado 3"]
+
+    # Rollup y métricas agregadas por prioridad
+    conteos = {fila.priority.value: fila.ticket_count for fila in db.query(TicketDailyStats).all()}
+    assert conteos == {"high": 2, "medium": 1}
+    eventos = db.query(MetricOutbox).filter(MetricOutbox.measurement == "ticket_created").all()
+    assert sum(evento.fields["count"] for evento in eventos) == 3
+    assert all(evento.tags["source"] == "import" for evento in eventos)
+
+
+def test_importar_tickets_csv(client, admin_token, user_token):
+    """Debe importar CSV con encabezado y solo permitirlo a admins"""
+    contenido = (
+        "title,description,priority\n"
+        "Ticket desde CSV,\"Descripción, con coma\",low\n"
+        "Otro ticket CSV,Descripción de prueba,\n"
+        "Ticket con prioridad mala,Descripción de prueba,urgente\n"
+    ).encode()
+
+    response = client.post(
+        "/api/v1/tickets/import",
+        headers={"Authorization": f"Bearer {user_token}"},
+        files={"file": ("tickets.csv", contenido, "text/csv")}
+    )
+    assert response.status_code == 403
+
+    response = client.post(
+        "/api/v1/tickets/import",
+        headers={"Authorization": f"Bearer {admin_token}"},
+        files={"file": ("tickets.csv", contenido, "text/csv")}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["imported"], data["failed"]) == (2, 1)
+    assert data["errors"][0]["line"] == 4
+
+    response = client.post(
+        "/api/v1/tickets/import",
+        headers={"Authorization": f"Bearer {admin_token}"},
+        files={"file": ("tickets.txt", contenido, "text/plain")}
+    )
+    assert response.status_code == 415
+
+
+def rollup(db):
+    from app.models.ticket_daily_stats import TicketDailyStats
+    db.expire_all()
+    return {
+        (fila.status, fila.priority, fila.agent_id): (fila.ticket_count, fila.resolution_count, round(fila.resolution_seconds_sum))
+        for fila in db.query(TicketDailyStats).all() if fila.ticket_count
+    }
+
+
+def test_cambios_en_bloque(client, db, admin_token, agent_id):
+    """Debe asignar y cambiar estados de varios tickets en una transacción"""
+    from app.models.metric_outbox import MetricOutbox
+    from app.services.ticket_stats_service import ticket_stats_service
+
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    ids = [
+        client.post("/api/v1/tickets/", headers=headers, json={"title": f"Ticket en bloque {i}", "description": "Descripción de prueba"}).json()["id"]
+        for i in range(3)
+    ]
+    db.query(MetricOutbox).delete()
+    db.commit()
+
+    response = client.patch("/api/v1/tickets/bulk", headers=headers, json={"changes": [
+        {"ticket_id": ids[0], "assigned_agent_id": agent_id},
+        {"ticket_id": ids[1], "assigned_agent_id": agent_id, "status": "resolved"},
+        {"ticket_id": ids[2], "status": "closed"},
+    ]})
+    assert response.status_code == 200
+    data = {t["id"]: t for t in response.json()}
+    assert [(data[i]["status"], data[i]["assigned_agent_id"]) for i in ids] == [
+        ("in_progress", agent_id), ("resolved", agent_id), ("closed", None)
+    ]
+    assert client.get(f"/api/v1/tickets/{ids[1]}", headers=headers).json()["resolved_at"] is not None
+
+    eventos = sorted(evento.measurement for evento in db.query(MetricOutbox).all())
+    assert eventos == ["ticket_assigned", "ticket_assigned", "ticket_resolved", "ticket_status_change", "ticket_status_change"]
+    resuelto = db.query(MetricOutbox).filter(MetricOutbox.measurement == "ticket_resolved").one()
+    assert resuelto.tags == {"ticket_id": str(ids[1]), "agent_id": str(agent_id)}
+
+    # El rollup incremental coincide con reconstruirlo desde tickets
+    incremental = rollup(db)
+    ticket_stats_service.backfill(db)
+    assert incremental == rollup(db)
+
+
+def test_cambios_en_bloque_validaciones(client, db, admin_token, user_token, agent_id):
+    """Un cambio inválido rechaza el lote completo"""
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    ticket_id = client.post("/api/v1/tickets/", headers=headers, json={"title": "Ticket en bloque", "description": "Descripción de prueba"}).json()["id"]
+
+    cambios = {"changes": [{"ticket_id": ticket_id, "status": "closed"}]}
+    response = client.patch("/api/v1/tickets/bulk", headers={"Authorization": f"Bearer {user_token}"}, json=cambios)
+    assert response.status_code == 403
+
+    cambios = {"changes": [{"ticket_id": ticket_id, "status": "closed"}, {"ticket_id": 9999, "status": "closed"}]}
+    response = client.patch("/api/v1/tickets/bulk", headers=headers, json=cambios)
+    assert response.status_code == 404
+
+    cambios = {"changes": [{"ticket_id": ticket_id, "assigned_agent_id": 9999}]}
+    assert client.patch("/api/v1/tickets/bulk", headers=headers, json=cambios).status_code == 404
+
+    cambios = {"changes": [{"ticket_id": ticket_id, "status": "closed"}, {"ticket_id": ticket_id, "status": "open"}]}
+    assert client.patch("/api/v1/tickets/bulk", headers=headers, json=cambios).status_code == 400
+
+    assert client.get(f"/api/v1/tickets/{ticket_id}", headers=headers).json()["status"] == "open"
+
+
+def test_detecta_duplicados_al_crear(client, user_token, admin_token):
+    """Tickets casi iguales se enlazan al original abierto"""
+    headers = {"Authorization": f"Bearer {user_token}"}
+
+    def crear(titulo, descripcion):
+        response = client.post("/api/v1/tickets/", headers=headers, json={"title": titulo, "description": descripcion})
+        assert response.status_code == 201
+        return response.json()
+
+    original = crear("No funciona el correo", "Outlook no envía ni recibe mensajes desde las 9 de la mañana")
+    assert original["duplicate_of_id"] is None
+
+    copia = crear("No funciona el correo!!", "Outlook no envia ni recibe mensajes desde las 9 de la mañana")
+    assert copia["duplicate_of_id"] == original["id"]
+
+    distinto = crear("Impresora atascada", "La impresora del segundo piso tiene papel atascado")
+    assert distinto["duplicate_of_id"] is None
+
+    # Un original cerrado ya no recibe duplicados: el siguiente pasa a ser original
+    client.put(f"/api/v1/tickets/{original['id']}", headers={"Authorization": f"Bearer {admin_token}"}, json={"status": "closed"})
+    nuevo = crear("No funciona el correo", "Outlook no envía ni recibe mensajes desde las 9 de la mañana")
+    assert nuevo["duplicate_of_id"] is None
+    assert crear("No funciona el correo", "Outlook no envía ni recibe mensajes desde las 9 de la mañana!")["duplicate_of_id"] == nuevo["id"]
+
+
+def test_rafaga_de_duplicados_no_crece_el_indice(db, user_token):
+    """Durante una ráfaga solo el original queda indexado"""
+    from app.models.ticket import Ticket
+    from app.models.user import User
+    from app.services.duplicate_service import duplicate_detector
+
+    creador = db.query(User).filter(User.email == "user@example.com").first()
+    enlazados = 0
+    for i in range(60):
+        titulo, descripcion = "VPN caída", f"No puedo conectarme a la VPN desde casa, error de autenticación (reporte {i % 3})"
+        firma = duplicate_detector.signature(titulo, descripcion)
+        duplicado = duplicate_detector.find(db, firma)
+        ticket = Ticket(title=titulo, description=descripcion, creator_id=creador.id, duplicate_of_id=duplicado.ticket_id if duplicado else None)
+        db.add(ticket)
+        db.commit()
+        if duplicado is None:
+            duplicate_detector.add(ticket.id, firma, ticket.created_at)
+        else:
+            enlazados += 1
+
+    assert enlazados == 59
+    assert duplicate_detector.stats()["indexed"] == 1
+
+
+def test_refresh_de_duplicados_no_saltea_tickets(db, user_token, monkeypatch):
+    """Con más tickets nuevos que refresh_batch, los refresh sucesivos los indexan todos"""
+    from app.models.ticket import Ticket
+    from app.models.user import User
+    from app.services.duplicate_service import duplicate_detector
+
+    monkeypatch.setattr(duplicate_detector, "refresh_batch", 3)
+    creador = db.query(User).filter(User.email == "user@example.com").first()
+    db.add_all([
+        Ticket(title=f"Incidente {i}", description=f"Descripción del incidente número {i}", creator_id=creador.id)
+        for i in range(8)
+    ])
+    db.commit()
+
+    for indexados in (3, 6, 8, 8):
+        duplicate_detector.refresh(db)
+        assert duplicate_detector.stats()["indexed"] == indexados
+
+
+def test_detalle_con_include_en_consultas_fijas(client, db, user_token, admin_token, agent_id):
+    """El detalle expandido usa las mismas consultas con 2 o 20 comentarios"""
+    from sqlalchemy import event
+
+    usuario = {"Authorization": f"Bearer {user_token}"}
+    admin = {"Authorization": f"Bearer {admin_token}"}
+    ticket_id = client.post(
+        "/api/v1/tickets/", headers=usuario,
+        json={"title": "Pantalla azul", "description": "La PC se reinicia sola al abrir Excel"}
+    ).json()["id"]
+    client.patch(f"/api/v1/tickets/{ticket_id}/assign", headers=admin, json={"assigned_agent_id": agent_id})
+
+    engine = db.get_bind()
+    statements = []
+
+    def contar(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    def consultas_detalle():
+        statements.clear()
+        response = client.get(f"/api/v1/tickets/{ticket_id}?include=comments,creator,agent", headers=admin)
+        assert response.status_code == 200
+        return response.json(), len(statements)
+
+    def comentar(n):
+        for i in range(n):
+            headers = usuario if i % 2 else admin
+            client.post(f"/api/v1/tickets/{ticket_id}/comments", headers=headers, json={"content": f"Comentario {i}"})
+
+    comentar(2)
+    event.listen(engine, "before_cursor_execute", contar)
+    try:
+        detalle, pocos = consultas_detalle()
+        comentar(18)
+        detalle, muchos = consultas_detalle()
+    finally:
+        event.remove(engine, "before_cursor_execute", contar)
+
+    assert pocos == muchos == 2
+    assert detalle["creator"]["email"] == "user@example.com"
+    assert detalle["assigned_agent"]["id"] == agent_id
+    assert [c["content"] for c in detalle["comments"]] == [f"Comentario {i}" for i in (0, 1)] + [f"Comentario {i}" for i in range(18)]
+    assert detalle["comments"][0]["author"]["email"] == "admin@example.com"
+
+    # Sin include el detalle no cambia; valores desconocidos son un error
+    simple = client.get(f"/api/v1/tickets/{ticket_id}", headers=admin).json()
+    assert simple["creator"] is None and simple["comments"] is None
+    assert client.get(f"/api/v1/tickets/{ticket_id}?include=comments,history", headers=admin).status_code == 400
+
+
+def test_ventana_de_duplicados_usa_created_at(db, user_token, monkeypatch):
+    """Los tickets viejos de otros procesos salen de la ventana por su created_at"""
+    from datetime import datetime, timedelta, timezone
+    from app.models.ticket import Ticket
+    from app.models.user import User
+    from app.services.duplicate_service import duplicate_detector
+
+    creador = db.query(User).filter(User.email == "user@example.com").first()
+    ahora = datetime.now(timezone.utc)
+    ventana = timedelta(seconds=duplicate_detector.window_seconds)
+    reciente = Ticket(title="Teclado roto", description="Varias teclas del teclado dejaron de responder", creator_id=creador.id)
+    viejo = Ticket(title="Monitor parpadea", description="El monitor parpadea cada pocos segundos al encender",
+                   creator_id=creador.id, created_at=ahora - ventana + timedelta(seconds=5))
+    fuera = Ticket(title="Mouse sin respuesta", description="El mouse inalámbrico no responde aunque cambié la pila",
+                   creator_id=creador.id, created_at=ahora - ventana - timedelta(hours=1))
+    db.add_all([fuera, viejo, reciente])
+    db.commit()
+
+    # Otro proceso indexó el reciente; refresh agrega el viejo pero no el que ya salió de la ventana
+    duplicate_detector.add(reciente.id, duplicate_detector.signature(reciente.title, reciente.description), reciente.created_at)
+    duplicate_detector.refresh(db)
+    assert duplicate_detector.stats()["indexed"] == 2
+
+    # Pasada su ventana, el viejo se desaloja aunque se haya indexado después del reciente
+    import time
+    real = time.time
+    monkeypatch.setattr(time, "time", lambda: real() + 10)
+    assert duplicate_detector.find(db, duplicate_detector.signature(viejo.title, viejo.description)) is None
+    assert duplicate_detector.stats()["indexed"] == 1